@@ -1,99 +1,36 @@
 import pandas as pd
 import matplotlib.pyplot as plt
-from scipy.signal import find_peaks
 from collections import Counter
-
-# Load the dataset
-file_path = '../data/scopus.csv'
-data = pd.read_csv(file_path)
-
-# Initial data overview
-print(f"Total publications before filtering: {len(data)}")
-
-# Select publications from 2012 onwards
-data['Year'] = pd.to_numeric(data['Year'], errors='coerce')
-data = data[data['Year'] >= 2012]
-print(f"Total publications from 2012 onwards: {len(data)}")
-
-# Convert 'Cited by' to numeric, handling missing values
-# Ensure 'Year' is numeric and filter for years >= 2012
-data['Cited by'] = pd.to_numeric(data['Cited by'], errors='coerce').fillna(0)
-
-# Print 'References' column of first row to understand the data, do not truncate the text
-pd.set_option('display.max_colwidth', None)
-print(data['References'].iloc[0])
-
-agriculture_keywords = [
-    "agriculture", "farming", "agritech", "precision agriculture", "smart agriculture",
-    "crop monitoring", "crop prediction", "crop disease", "crop yield forecasting",
-    "precision farming", "precision agriculture", "site-specific crop management", "variable rate technology",
-    "sustainable farming", "conservation agriculture", "agroecology", "organic farming",
-    "livestock management", "animal health monitoring", "dairy farming technology", "poultry monitoring",
-    "soil health monitoring", "irrigation management", "water usage efficiency", "nutrient management",
-    "agricultural drones", "farm robotics", "automated harvesting", "robotic weeding",
-    "climate-smart agriculture", "agricultural adaptation to climate change", "weather prediction for farming",
-    "agri-food supply chain", "food traceability", "agricultural logistics", "farm to table",
-    "pesticide application technology", "herbicide resistance management", "fertilizer optimization",
-    "agricultural big data", "farm data analytics", "agricultural informatics", "agricultural decision support systems"
-]
+from utils import bootstrap_citation_intervals, significant_peaks, detect_keyword_bursts, citation_percentiles, percentile_thresholds, dataset_fingerprint, load_or_build_similarity_index, AGRICULTURE_KEYWORDS
 
 # Filter for agriculture-related publications
-def is_agriculture_related(text, keywords=agriculture_keywords):
+def is_agriculture_related(text, keywords=AGRICULTURE_KEYWORDS):
     if pd.isna(text):
         return False
     text = text.lower()
     return any(keyword.lower() in text for keyword in keywords)
 
-data['IsAgriculture'] = data.apply(lambda x: is_agriculture_related(x['Title']) or
-                                    is_agriculture_related(x['Abstract']) or
-                                    is_agriculture_related(x['Author Keywords']) or
-                                    is_agriculture_related(x['Index Keywords']) or
-                                    is_agriculture_related(x['Affiliations']), axis=1)
-print(f"Total agriculture-related publications: {data['IsAgriculture'].sum()}")
-
-
-# Group by year and calculate average citations
-average_citations_per_year = data.groupby('Year')['Cited by'].mean()
-average_citations_per_year_agri = data[data['IsAgriculture']].groupby('Year')['Cited by'].mean()
-
-print("\nAverage citations per year (General):")
-print(average_citations_per_year)
-print("\nAverage citations per year (Agriculture):")
-print(average_citations_per_year_agri)
-
-# Detect peaks
-peaks_general, _ = find_peaks(average_citations_per_year.values)
-peaks_agri, _ = find_peaks(average_citations_per_year_agri.values)
-
-def explain_peak_year(year, is_agri=False):
+# Console explanation of a peak year: its highly cited papers and the papers similar to them, trending and bursting
+# topics and top sources
+def explain_peak_year(data, year, similarity_index, keyword_bursts, is_agri=False):
     year_data = data[(data['Year'] == year) & (data['IsAgriculture'] == is_agri)]
     if not year_data.empty:
-        # Highly cited papers
-        top_cited_paper = year_data.loc[year_data['Cited by'].idxmax()]
-        # Trending topics
-        keywords = ';'.join(year_data['Author Keywords'].fillna('') + ';' + year_data['Index Keywords'].fillna('')).split(';')
-        keyword_counts = Counter(kw.strip().lower() for kw in keywords if kw)
-        trending_topics = ', '.join(kw for kw, _ in keyword_counts.most_common(3))
-        # Top sources
-        top_sources = ', '.join(year_data['Source title'].value_counts().head(3).index.tolist())
-        explanation = f"Top cited: {top_cited_paper['Title'][:50]}..., Topics: {trending_topics}, Sources: {top_sources}"
-    else:
-        explanation = "No data"
-    return explanation
-
-def explain_peak_year(year, is_agri=False):
-    year_data = data[(data['Year'] == year) & (data['IsAgriculture'] == is_agri)]
-    if not year_data.empty:
-        # Sort by 'Cited by' to find highly cited papers
-        sorted_data = year_data.sort_values(by='Cited by', ascending=False).head(3)
+        # Highly cited papers: the top 10% of their year and category, ranked by citation percentile
+        sorted_data = year_data[year_data['Top10']].sort_values(by=['CitationPercentile', 'Cited by'], ascending=False).head(3)
         
-        # Print top 3 cited papers in the console
-        print(f"\nTop 3 cited papers in {year} ({'Agriculture' if is_agri else 'General'}):")
+        # Papers similar to each of them, in one batch query
+        similar_papers = similarity_index.similar_papers(sorted_data.index, k=3)
+
+        # Print top 3 highly cited papers in the console
+        print(f"\nTop 3 highly cited papers in {year} ({'Agriculture' if is_agri else 'General'}), "
+              f"{int(year_data['Top10'].sum())} in the top 10% and {int(year_data['Top1'].sum())} in the top 1%:")
         for i, row in sorted_data.iterrows():
             authors = row['Authors'].split(';')[0] + " et al." if row['Authors'] else "Unknown authors"
             title = row['Title'][:100] + "..." if len(row['Title']) > 100 else row['Title']
             cited_by = row['Cited by']
-            print(f"    - {authors} ({year}). {title}. Cited by: {cited_by}")
+            print(f"    - {authors} ({year}). {title}. Cited by: {cited_by}, percentile {row['CitationPercentile']:.1f}")
+            for paper, similarity in similar_papers.loc[similar_papers['Seed'] == i, ['Paper', 'Similarity']].itertuples(index=False):
+                print(f"        similar ({similarity:.2f}): {data.at[paper, 'Title'][:80]} ({data.at[paper, 'Year']:.0f})")
 
         # Trending topics
         keywords = ';'.join(year_data['Author Keywords'].fillna('') + ';' + year_data['Index Keywords'].fillna('')).split(';')
@@ -101,6 +38,11 @@ def explain_peak_year(year, is_agri=False):
         trending_topics = ', '.join(kw for kw, _ in keyword_counts.most_common(3))
         print(f"Trending topics: {trending_topics}")
 
+        # Emerging topics: keywords inside a burst interval that year
+        bursting = keyword_bursts[(keyword_bursts['Category'] == ('Agriculture' if is_agri else 'Non-Agriculture')) &
+                                  (keyword_bursts['start'] <= year) & (keyword_bursts['end'] >= year)]
+        print(f"Bursting topics: {', '.join(bursting['Keyword'].head(3))}")
+
         # Top sources
         top_sources = ', '.join(year_data['Source title'].value_counts().head(3).index.tolist())
         print(f"Top sources: {top_sources}")
@@ -110,32 +52,91 @@ def explain_peak_year(year, is_agri=False):
         explanation = "No data"
     return explanation
 
-
-# Plotting
-plt.figure(figsize=(14, 7))
-plt.plot(average_citations_per_year.index, average_citations_per_year.values, label='General', marker='o')
-plt.plot(average_citations_per_year_agri.index, average_citations_per_year_agri.values, label='Agriculture', marker='x')
-
-# Annotating peaks with explanations
-for peak in peaks_general:
-    year = average_citations_per_year.index[peak]
-    explanation = explain_peak_year(year)
-    #print(f"Peak year for general publications: {year}: {explanation}")
-    #plt.annotate(explanation, (year, average_citations_per_year.values[peak]),
-    #             textcoords="offset points", xytext=(0,10), ha='center', fontsize=8, arrowprops=dict(arrowstyle="->"))
-
-for peak in peaks_agri:
-    year = average_citations_per_year_agri.index[peak]
-    explanation = explain_peak_year(year, is_agri=True)
-    #print(f"Peak year for agriculture-related publications: {year}: {explanation}")
-    #plt.annotate(explanation, (year, average_citations_per_year_agri.values[peak]),
-    #             textcoords="offset points", xytext=(0,-15), ha='center', fontsize=8, arrowprops=dict(arrowstyle="->"))
-
-plt.title('Average Citations Per Year')
-plt.xlabel('Year')
-plt.ylabel('Average Citations')
-plt.legend()
-plt.grid(True, alpha=0.3)
-plt.tight_layout()
-plt.savefig('average_citations_per_year.png')
-plt.show()
+def main(file_path='../data/scopus.csv', output_path='../data/', start_year=2012, keywords=AGRICULTURE_KEYWORDS):
+    # Load the dataset
+    data = pd.read_csv(file_path)
+
+    # Initial data overview
+    print(f"Total publications before filtering: {len(data)}")
+
+    # Select publications from start_year onwards
+    data['Year'] = pd.to_numeric(data['Year'], errors='coerce')
+    data = data[data['Year'] >= start_year]
+    print(f"Total publications from {start_year} onwards: {len(data)}")
+
+    # Convert 'Cited by' to numeric, handling missing values
+    # Ensure 'Year' is numeric and filter for years >= start_year
+    data['Cited by'] = pd.to_numeric(data['Cited by'], errors='coerce').fillna(0)
+
+    # Print 'References' column of first row to understand the data, do not truncate the text
+    pd.set_option('display.max_colwidth', None)
+    print(data['References'].iloc[0])
+
+    data['IsAgriculture'] = data.apply(lambda x: is_agriculture_related(x['Title'], keywords) or
+                                        is_agriculture_related(x['Abstract'], keywords) or
+                                        is_agriculture_related(x['Author Keywords'], keywords) or
+                                        is_agriculture_related(x['Index Keywords'], keywords) or
+                                        is_agriculture_related(x['Affiliations'], keywords), axis=1)
+    print(f"Total agriculture-related publications: {data['IsAgriculture'].sum()}")
+
+    # Citation percentile of every paper within its year and category, so that highly cited means the same for every year
+    data = data.join(citation_percentiles(data))
+    print(f"\nCitations needed to enter the top 10% and top 1% of each year and category:\n{percentile_thresholds(data)}")
+
+    # TF-IDF index over titles, abstracts and author keywords, to list the papers similar to the highly cited ones
+    similarity_index = load_or_build_similarity_index(data, f"{output_path}/similarity_index.npz", dataset_fingerprint(file_path, start_year, keywords))
+
+    # Group by year and calculate average citations
+    average_citations_per_year = data.groupby('Year')['Cited by'].mean()
+    average_citations_per_year_agri = data[data['IsAgriculture']].groupby('Year')['Cited by'].mean()
+
+    print("\nAverage citations per year (General):")
+    print(average_citations_per_year)
+    print("\nAverage citations per year (Agriculture):")
+    print(average_citations_per_year_agri)
+
+    # Keyword bursts over the years, for the whole corpus and each agriculture split
+    keyword_bursts = detect_keyword_bursts(data)
+
+    # Bootstrap confidence intervals of the yearly averages
+    citation_intervals = bootstrap_citation_intervals(data)
+    intervals_general = citation_intervals.xs('General', level='Category').reindex(average_citations_per_year.index)
+    intervals_agri = citation_intervals.xs('Agriculture', level='Category').reindex(average_citations_per_year_agri.index)
+
+    # Detect peaks that are significant under the confidence intervals
+    peaks_general = significant_peaks(average_citations_per_year.values, intervals_general['mean_low'], intervals_general['mean_high'])
+    peaks_agri = significant_peaks(average_citations_per_year_agri.values, intervals_agri['mean_low'], intervals_agri['mean_high'])
+
+    # Plotting
+    plt.figure(figsize=(14, 7))
+    plt.plot(average_citations_per_year.index, average_citations_per_year.values, label='General', marker='o')
+    plt.plot(average_citations_per_year_agri.index, average_citations_per_year_agri.values, label='Agriculture', marker='x')
+    plt.fill_between(intervals_general.index, intervals_general['mean_low'], intervals_general['mean_high'], color='C0', alpha=0.15)
+    plt.fill_between(intervals_agri.index, intervals_agri['mean_low'], intervals_agri['mean_high'], color='C1', alpha=0.15)
+
+    # Annotating peaks with explanations
+    for peak in peaks_general:
+        year = average_citations_per_year.index[peak]
+        explanation = explain_peak_year(data, year, similarity_index, keyword_bursts)
+        #print(f"Peak year for general publications: {year}: {explanation}")
+        #plt.annotate(explanation, (year, average_citations_per_year.values[peak]),
+        #             textcoords="offset points", xytext=(0,10), ha='center', fontsize=8, arrowprops=dict(arrowstyle="->"))
+
+    for peak in peaks_agri:
+        year = average_citations_per_year_agri.index[peak]
+        explanation = explain_peak_year(data, year, similarity_index, keyword_bursts, is_agri=True)
+        #print(f"Peak year for agriculture-related publications: {year}: {explanation}")
+        #plt.annotate(explanation, (year, average_citations_per_year_agri.values[peak]),
+        #             textcoords="offset points", xytext=(0,-15), ha='center', fontsize=8, arrowprops=dict(arrowstyle="->"))
+
+    plt.title('Average Citations Per Year')
+    plt.xlabel('Year')
+    plt.ylabel('Average Citations')
+    plt.legend()
+    plt.grid(True, alpha=0.3)
+    plt.tight_layout()
+    plt.savefig(f"{output_path}/average_citations_per_year.png")
+    plt.show()
+
+if __name__ == '__main__':
+    main()
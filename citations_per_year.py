@@ -1,49 +1,45 @@
 import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
-from scipy.signal import find_peaks
-from utils import get_cleaned_dataframe_from_csv, Color
-
-# Load the CSV file
-file_path = 'data/scopus.csv'
-output_path = 'data/'
-data = get_cleaned_dataframe_from_csv(file_path)
+from utils import get_cleaned_dataframe_from_csv, Color, bootstrap_citation_intervals, significant_peaks, ResultCache, dataset_fingerprint, get_backend, draw_labels, citation_percentiles, export_result_table, aggregate_csv_shards, AGRICULTURE_KEYWORDS
 
 # Assuming 'Year', 'Cited by', 'IsAgriculture' columns exist after data cleaning
 # Calculate average citations per year for general, agriculture, and non-agriculture
-def average_citations(data):
+def average_citations(data, backend='pandas'):
     data['Cited by'] = pd.to_numeric(data['Cited by'], errors='coerce')
 
-    # Calculate ignored documents due to missing 'Cited by'
+    # Rows where Cited by is NaN are dropped by the backend
+    yearly_data, doc_counts = get_backend(backend, data).yearly_citations()
+
+    return yearly_data, doc_counts
+
+# Calculate ignored documents due to missing 'Cited by'
+def missing_citations(data):
     ignored_general = data['Cited by'].isna().sum()
     ignored_agriculture = data[data['IsAgriculture'] == True]['Cited by'].isna().sum()
     ignored_non_agriculture = data[data['IsAgriculture'] == False]['Cited by'].isna().sum()
-    print(f"Ignored general documents due to missing data: {ignored_general}")
-    print(f"Ignored agriculture documents due to missing data: {ignored_agriculture}")
-    print(f"Ignored non-agriculture documents due to missing data: {ignored_non_agriculture}")
-    
-    # Drop rows where Cited by is NaN
-    data = data.dropna(subset=['Cited by'])
-
-    yearly_data = data.groupby(['Year', 'IsAgriculture'])['Cited by'].mean().unstack(fill_value=0)
-    yearly_data.columns = ['Non-Agriculture', 'Agriculture']
-    yearly_data['General'] = data.groupby('Year')['Cited by'].mean()
+    return ignored_general, ignored_agriculture, ignored_non_agriculture
 
-    doc_counts = data.groupby(['Year', 'IsAgriculture']).size().unstack(fill_value=0)
-    doc_counts.columns = ['Non-Agriculture', 'Agriculture']
-    doc_counts['General'] = data.groupby('Year').size()
-
-    return yearly_data, doc_counts
+# Papers with citations and highly cited papers (top 10% of their year and category) per year and category
+def cited_paper_counts(data):
+    cited = data[data['Cited by'] > 0]
+    categories = {'General': cited, 'Agriculture': cited[cited['IsAgriculture']], 'Non-Agriculture': cited[~cited['IsAgriculture']]}
+    counts = {category: category_data.groupby('Year').agg(papers=('Top10', 'size'), highly_cited=('Top10', 'sum')) for category, category_data in categories.items()}
+    return pd.concat(counts, names=['Category']).swaplevel().sort_index()
 
-def plot_citations(yearly_data, doc_counts):
+def plot_citations(data, yearly_data, doc_counts, intervals, paper_counts, output_path):
     plt.figure(figsize=(14, 8))
     colors = {'General': Color.GENERAL.value, 'Agriculture': Color.AGRICULTURE.value, 'Non-Agriculture': Color.NON_AGRICULTURE.value}
     for column in yearly_data.columns:
         plt.plot(yearly_data.index, yearly_data[column], marker='o', label=f'Avg Citations {column}', color=colors[column])
         #print(f"Yearly data for {column}:\n{yearly_data[column]}")
-    
-        # Peak detection
-        peaks, _ = find_peaks(yearly_data[column], height=0)
+
+        # Bootstrap confidence band of the yearly mean
+        column_intervals = intervals.xs(column, level='Category').reindex(yearly_data.index)
+        plt.fill_between(yearly_data.index, column_intervals['mean_low'], column_intervals['mean_high'], color=colors[column], alpha=0.15)
+
+        # Peak detection, keeping only peaks that stand out of the neighbouring confidence intervals
+        peaks = significant_peaks(yearly_data[column], column_intervals['mean_low'].fillna(0), column_intervals['mean_high'].fillna(np.inf))
         peak_years = yearly_data.index[peaks]
 
         for year in peak_years:
@@ -54,9 +50,12 @@ def plot_citations(yearly_data, doc_counts):
             else:
                 category_data = data[(data['Year'] == year) & (data['Cited by'] > 0)]
 
-            top_papers = category_data.nlargest(3, 'Cited by')
+            # Highly cited papers: the top 10% of their year and category, ranked by citation percentile
+            highly_cited = category_data[category_data['Top10']]
+            top_papers = highly_cited.sort_values(['CitationPercentile', 'Cited by'], ascending=False).head(3)
 
-            print(f"\nTop cited papers in {column} for the year {year} among {len(category_data)} papers:")
+            counts = paper_counts.loc[(year, column)]
+            print(f"\nHighly cited papers (top 10% of their year and category) in {column} for the year {year}: {counts['highly_cited']} among {counts['papers']} papers:")
             for i, paper in enumerate(top_papers.itertuples()):
                 # Checking if authors are present
                 if pd.isna(paper.Authors) or paper.Authors.strip() == "":
@@ -64,16 +63,15 @@ def plot_citations(yearly_data, doc_counts):
                 else:
                     author_text = paper.Authors
 
-                annotation = f"'{paper.Title}' by {author_text}, {paper._13} citations"
+                annotation = f"'{paper.Title}' by {author_text}, {paper._13} citations, percentile {paper.CitationPercentile:.1f}{' (top 1%)' if paper.Top1 else ''}"
                 print(annotation)
-        
-        # Add document counts to the plot
-        for year in yearly_data.index:
-            heights = {'Agriculture': 1, 'Non-Agriculture': 3, 'General': 5}  # baseline heights for annotations
-            for category in ['Agriculture', 'Non-Agriculture', 'General']:
-                doc_count = doc_counts.at[year, category] if year in doc_counts.index else 0
-                plt.annotate(str(doc_count), (year, heights[category]), color=colors[category], ha='center', va='bottom', fontsize=15)
-                #print(f"Document count for {category} in {year}: {doc_count}")
+
+    # Add document counts to the plot, once per category
+    heights = {'Agriculture': 1, 'Non-Agriculture': 3, 'General': 5}  # baseline heights for annotations
+    for category in ['Agriculture', 'Non-Agriculture', 'General']:
+        category_counts = doc_counts[category].reindex(yearly_data.index, fill_value=0)
+        draw_labels(plt.gca(), yearly_data.index, np.full(len(yearly_data.index), heights[category]), category_counts.values,
+                    color=colors[category], fontsize=15, va='bottom')
 
 
     plt.title('Average Citations per Year')
@@ -87,6 +85,48 @@ def plot_citations(yearly_data, doc_counts):
     # plt.show()
 
 
-# Run analysis and plotting
-yearly_citations, doc_counts = average_citations(data)
-plot_citations(yearly_citations, doc_counts)
+# One row per (year, category) with the mean citations, document count and bootstrap interval of the mean
+def yearly_citations_table(yearly_citations, doc_counts, citation_intervals):
+    table = pd.DataFrame({
+        'mean_citations': yearly_citations.rename_axis('Category', axis=1).stack(),
+        'documents': doc_counts.rename_axis('Category', axis=1).stack(),
+    })
+    table = table.join(citation_intervals[['mean_low', 'mean_high']])
+    return table.rename_axis(['year', 'category']).reset_index()
+
+def main(file_path='data/scopus.csv', output_path='data/', use_cache=True, backend='pandas', shards=None, keywords=AGRICULTURE_KEYWORDS):
+    if shards:
+        # Aggregate row ranges of the CSV file in parallel; only the most cited papers of every shard are kept as rows
+        aggregates = aggregate_csv_shards(file_path, ['citations'], shards, keywords=keywords)
+        data = aggregates.highly_cited_candidates()
+        paper_counts = aggregates.cited_paper_counts()
+        ignored = aggregates.missing_citations()
+        compute_averages = lambda: aggregates.yearly_citations()
+        compute_intervals = lambda: bootstrap_citation_intervals(aggregates.citation_values())
+    else:
+        # Load the CSV file
+        data = get_cleaned_dataframe_from_csv(file_path, keywords=keywords)
+        data['Cited by'] = pd.to_numeric(data['Cited by'], errors='coerce')
+        data = data.join(citation_percentiles(data))
+        paper_counts = cited_paper_counts(data)
+        ignored = missing_citations(data)
+        compute_averages = lambda: average_citations(data, backend)
+        compute_intervals = lambda: bootstrap_citation_intervals(data)
+
+    ignored_general, ignored_agriculture, ignored_non_agriculture = ignored
+    print(f"Ignored general documents due to missing data: {ignored_general}")
+    print(f"Ignored agriculture documents due to missing data: {ignored_agriculture}")
+    print(f"Ignored non-agriculture documents due to missing data: {ignored_non_agriculture}")
+
+    # Run analysis and plotting, reusing cached aggregates of an unchanged dataset
+    cache = ResultCache(f"{output_path}/.cache", enabled=use_cache)
+    fingerprint = dataset_fingerprint(file_path, keywords=keywords)
+    yearly_citations, doc_counts = cache.get_or_compute('citations_per_year.average_citations', fingerprint, {}, compute_averages)
+    citation_intervals = cache.get_or_compute('citations_per_year.bootstrap_citation_intervals', fingerprint, {}, compute_intervals)
+    print(f"Bootstrap confidence intervals of yearly citations:\n{citation_intervals}")
+    export_result_table('yearly_citations', yearly_citations_table(yearly_citations, doc_counts, citation_intervals), output_path)
+    plot_citations(data, yearly_citations, doc_counts, citation_intervals, paper_counts, output_path)
+
+if __name__ == '__main__':
+    main()
+
@@ -0,0 +1,192 @@
+import time
+
+_START = time.perf_counter()
+
+import argparse
+import sys
+
+# Only the standard library is imported at startup; every analysis imports its heavy dependencies when it runs
+STARTUP_BUDGET_SECONDS = 0.3
+HEAVY_MODULES = ['pandas', 'numpy', 'matplotlib', 'scipy', 'pycountry', 'plotly']
+
+# Agriculture keywords of the run: those passed by the watch mode, else those of the --keywords file, else the built-in list
+def agriculture_keywords(args):
+    from utils import AGRICULTURE_KEYWORDS, read_keywords
+    if args.agriculture_keywords is not None:
+        return args.agriculture_keywords
+    return read_keywords(args.keywords) if args.keywords else AGRICULTURE_KEYWORDS
+
+def run_volume(args):
+    from volume_per_year import main
+    main(args.input, args.output, backend=args.backend, start_year=args.start_year, shards=args.shards, keywords=agriculture_keywords(args))
+
+def run_citations(args):
+    from citations_per_year import main
+    main(args.input, args.output, use_cache=not args.no_cache, backend=args.backend, shards=args.shards, keywords=agriculture_keywords(args))
+
+def run_authors(args):
+    from top_authors import main
+    main(args.input, args.output, args.top_n, use_cache=not args.no_cache, workers=args.workers, shards=args.shards, keywords=agriculture_keywords(args))
+
+def run_sources(args):
+    from top_sources import main
+    main(args.input, args.output, args.top_n, use_cache=not args.no_cache, shards=args.shards, keywords=agriculture_keywords(args))
+
+def run_countries(args):
+    if args.kind == 'combined':
+        from top_countries import main
+        main(args.input, args.output, use_cache=not args.no_cache, shards=args.shards, keywords=agriculture_keywords(args))
+    elif args.kind == 'publications':
+        from top_countries_publications import main
+        main(args.input, args.output, args.top_n, use_cache=not args.no_cache, backend=args.backend, keywords=agriculture_keywords(args))
+    else:
+        from top_countries_citations import main
+        main(args.input, args.output, args.top_n, use_cache=not args.no_cache, backend=args.backend, keywords=agriculture_keywords(args))
+
+def run_contributors(args):
+    from top_contributors_bars import main
+    main(args.input, args.output, args.top_n)
+
+def run_linked_authors(args):
+    from top_authors_linked_bars import main
+    main(args.input, args.output, args.top_n, keywords=agriculture_keywords(args))
+
+def run_dashboard(args):
+    from dashboard import main
+    main(args.input, args.output, args.top_n, keywords=agriculture_keywords(args))
+
+def run_trends(args):
+    from growth_trends import main
+    main(args.input, args.output, args.top_n, args.min_publications, args.sort_by, keywords=agriculture_keywords(args))
+
+def run_bursts(args):
+    from emerging_topics import main
+    main(args.input, args.output, args.top_n, args.s, args.gamma, keywords=agriculture_keywords(args))
+
+def run_keyword_clusters(args):
+    from keyword_clusters import main
+    main(args.input, args.output, args.min_occurrences, args.min_cooccurrences, args.top_n, keywords=agriculture_keywords(args))
+
+def run_duplicates(args):
+    from find_duplicates import main
+    main(args.input, args.output, args.threshold)
+
+def run_institutions(args):
+    from top_institutions import main
+    main(args.input, args.output, args.top_n, not args.no_cache, keywords=agriculture_keywords(args))
+
+def run_collaboration(args):
+    from country_collaboration import main
+    main(args.input, args.output, args.top_n, args.fractional, keywords=agriculture_keywords(args))
+
+def run_sweep(args):
+    from start_year_scenarios import main
+    main(args.input, args.output, args.start_years, args.top_n, not args.no_figures, keywords=agriculture_keywords(args))
+
+def run_preview(args):
+    from preview import main
+    main(args.input, args.output, args.fraction, args.top_n, args.seed, keywords=agriculture_keywords(args))
+
+def run_laws(args):
+    from productivity_laws import main
+    main(args.input, args.output, args.zones, not args.no_figures, keywords=agriculture_keywords(args))
+
+def run_watch(args):
+    from utils import DatasetWatcher
+    options = ['--backend', args.backend] + (['--no-cache'] if args.no_cache else []) + (['--shards', str(args.shards)] if args.shards else [])
+    watcher = DatasetWatcher(args.input, args.keywords, args.analyses, args.interval, agriculture_keywords(args))
+    watcher.run(lambda name, keywords: main([*options, name, '-i', args.input, '-o', args.output], keywords))
+
+def run_similar(args):
+    from similar_papers import main
+    main(args.input, args.output, args.top_n, args.k, args.query, keywords=agriculture_keywords(args))
+
+def run_clear_cache(args):
+    from utils.result_cache import ResultCache
+    ResultCache(f"{args.output}/.cache").clear(args.function)
+
+def build_parser():
+    parser = argparse.ArgumentParser(description='Bibliometric analyses of Scopus exports.')
+    parser.add_argument('--startup-time', action='store_true', help='report the startup time and the heavy modules loaded before the analysis')
+    parser.add_argument('--no-cache', action='store_true', help='recompute every aggregation instead of reading cached results')
+    parser.add_argument('--backend', choices=['pandas', 'duckdb'], default='pandas', help='engine used for the yearly and per-country aggregations (default: %(default)s)')
+    parser.add_argument('--keywords', help='file with one agriculture keyword per line, replacing the built-in list')
+    parser.add_argument('--shards', type=int, help='aggregate this many row ranges of the export in parallel processes (volume, citations, authors, sources and combined countries)')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    def add_command(name, handler, help_text, top_n=None):
+        subparser = subparsers.add_parser(name, help=help_text)
+        subparser.add_argument('-i', '--input', default='../data/scopus.csv', help='Scopus CSV export (default: %(default)s)')
+        subparser.add_argument('-o', '--output', default='../data/', help='directory for the figures (default: %(default)s)')
+        if top_n is not None:
+            subparser.add_argument('-n', '--top-n', type=int, default=top_n, help='number of top entities (default: %(default)s)')
+        subparser.set_defaults(handler=handler)
+        return subparser
+
+    volume = add_command('volume', run_volume, 'publications per year with trends')
+    volume.add_argument('--start-year', type=int, default=2012, help='first year of the timeline (default: %(default)s)')
+    add_command('citations', run_citations, 'average citations per year')
+    authors = add_command('authors', run_authors, 'top authors with H-index and co-authorship centrality', top_n=30)
+    authors.add_argument('--workers', type=int, help='processes sampling the betweenness (default: one per CPU)')
+    add_command('sources', run_sources, 'top sources with H-index', top_n=15)
+    countries = add_command('countries', run_countries, 'top countries by publications and citations', top_n=15)
+    countries.add_argument('--kind', choices=['combined', 'publications', 'citations'], default='combined', help='report to produce (default: %(default)s)')
+    add_command('contributors', run_contributors, 'top countries, authors and sources bars', top_n=10)
+    add_command('linked-authors', run_linked_authors, 'Sankey diagram of top authors by category', top_n=30)
+    add_command('dashboard', run_dashboard, 'interactive offline HTML dashboard', top_n=15)
+    trends = add_command('trends', run_trends, 'fastest-growing countries, sources, authors and keywords', top_n=20)
+    trends.add_argument('--min-publications', type=int, default=5, help='ignore entities with fewer publications (default: %(default)s)')
+    trends.add_argument('--sort-by', choices=['slope', 'r_squared', 'cagr', 'average_growth', 'window_growth'], default='slope', help='ranking statistic (default: %(default)s)')
+    bursts = add_command('bursts', run_bursts, 'emerging keywords detected as Kleinberg bursts', top_n=20)
+    bursts.add_argument('--s', type=float, default=2.0, help='rate multiplier of the burst state (default: %(default)s)')
+    bursts.add_argument('--gamma', type=float, default=1.0, help='cost of entering a burst (default: %(default)s)')
+    keyword_clusters = add_command('keyword-clusters', run_keyword_clusters, 'keyword co-occurrence networks and topic clusters', top_n=10)
+    keyword_clusters.add_argument('--min-occurrences', type=int, default=5, help='minimum occurrences of a keyword (default: %(default)s)')
+    keyword_clusters.add_argument('--min-cooccurrences', type=int, default=2, help='minimum co-occurrences of an edge (default: %(default)s)')
+    duplicates = add_command('duplicates', run_duplicates, 'near-duplicate records (MinHash-LSH) and a collapsed export')
+    duplicates.add_argument('--threshold', type=float, default=0.8, help='minimum estimated Jaccard similarity (default: %(default)s)')
+    add_command('institutions', run_institutions, 'top institutions parsed from the affiliations', top_n=15)
+    collaboration = add_command('collaboration', run_collaboration, 'international co-publication matrix between countries', top_n=20)
+    collaboration.add_argument('--fractional', action='store_true', help='also weight each co-publication fractionally by the number of partner countries')
+    sweep = add_command('sweep', run_sweep, 'volume, citations and top entities for several start years in one run', top_n=10)
+    sweep.add_argument('--start-years', type=int, nargs='+', default=[2008, 2010, 2012, 2014, 2016], help='start years to compare (default: %(default)s)')
+    sweep.add_argument('--no-figures', action='store_true', help='only write the result tables')
+    preview = add_command('preview', run_preview, 'fast estimates on a stratified sample with margins of error', top_n=10)
+    preview.add_argument('--fraction', type=float, default=0.1, help='share of every (year, category) stratum to sample (default: %(default)s)')
+    preview.add_argument('--seed', type=int, help='random seed of the sample')
+    laws = add_command('laws', run_laws, "Lotka's law of author productivity and Bradford zones of the sources")
+    laws.add_argument('--zones', type=int, default=3, help='number of Bradford zones (default: %(default)s)')
+    laws.add_argument('--no-figures', action='store_true', help='only write the result tables')
+    watch = add_command('watch', run_watch, 'keep the export in memory and re-run the analyses whose inputs change')
+    watch.add_argument('--keywords', default=argparse.SUPPRESS, help='file with one agriculture keyword per line, watched along with the export')
+    watch.add_argument('--analyses', nargs='+', help='subcommands to keep up to date (default: all of them)')
+    watch.add_argument('--interval', type=float, default=2.0, help='seconds between two polls of the watched files (default: %(default)s)')
+    similar = add_command('similar', run_similar, 'papers similar to the most cited ones or to a text, from a TF-IDF index', top_n=10)
+    similar.add_argument('-k', type=int, default=5, help='similar papers per seed (default: %(default)s)')
+    similar.add_argument('--query', nargs='+', help='free-text queries to search instead of the most cited papers')
+
+    clear_cache = subparsers.add_parser('clear-cache', help='invalidate cached analysis results')
+    clear_cache.add_argument('-o', '--output', default='../data/', help='directory holding the .cache folder (default: %(default)s)')
+    clear_cache.add_argument('--function', help='only clear the results of this function, e.g. top_authors.aggregate_contributions_and_h_index')
+    clear_cache.set_defaults(handler=run_clear_cache)
+    return parser
+
+# Time spent before the analysis starts, and the heavy modules already imported at that point
+def check_startup():
+    elapsed = time.perf_counter() - _START
+    loaded = [module for module in HEAVY_MODULES if module in sys.modules]
+    print(f"Startup time: {elapsed * 1000:.1f} ms (budget {STARTUP_BUDGET_SECONDS * 1000:.0f} ms), heavy modules loaded: {loaded or 'none'}")
+    if elapsed > STARTUP_BUDGET_SECONDS or loaded:
+        print("Warning: startup is over budget", file=sys.stderr)
+    return elapsed
+
+# keywords, when given, replaces the keyword list of the run, e.g. the list loaded by the watch mode
+def main(argv=None, keywords=None):
+    args = build_parser().parse_args(argv)
+    args.agriculture_keywords = keywords
+    if args.startup_time:
+        check_startup()
+    args.handler(args)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,29 @@
+from utils import get_cleaned_dataframe_from_csv, extract_countries, paper_country_matrix, collaboration_pairs, international_rates, collaboration_by_year, export_chord_data, AGRICULTURE_KEYWORDS
+
+# International collaboration between countries: co-publication pairs, collaboration rates and chord diagram data
+def main(file_path='../data/scopus.csv', output_path='../data/', top_n=20, fractional=False, keywords=AGRICULTURE_KEYWORDS):
+    # Load the CSV file
+    data = get_cleaned_dataframe_from_csv(file_path, keywords=keywords)
+    data['Country'] = data['Affiliations'].apply(extract_countries)
+
+    incidence, countries = paper_country_matrix(data)
+    overall, per_country = international_rates(incidence, countries)
+    print(f"\nInternational collaboration rate: {overall:.2f}% of the papers with an identified country")
+    print(per_country.head(top_n).to_string(float_format='{:.2f}'.format))
+
+    pairs = collaboration_pairs(incidence, countries, fractional)
+    print(f"\nTop {top_n} collaborating country pairs:")
+    print(pairs.head(top_n).to_string(index=False, float_format='{:.3f}'.format))
+
+    yearly_pairs, yearly_rates = collaboration_by_year(data, fractional)
+    print("\nInternational collaboration rate per year (%):")
+    print(yearly_rates.pivot(index='Year', columns='Category', values='international_rate').to_string(float_format='{:.2f}'.format))
+
+    per_country.to_csv(f"{output_path}/collaboration_countries.csv")
+    pairs.to_csv(f"{output_path}/collaboration_pairs.csv", index=False)
+    yearly_pairs.to_csv(f"{output_path}/collaboration_pairs_per_year.csv", index=False)
+    yearly_rates.to_csv(f"{output_path}/collaboration_rates_per_year.csv", index=False)
+    export_chord_data(incidence, countries, f"{output_path}/collaboration_chord.json", top_n, fractional)
+
+if __name__ == '__main__':
+    main()
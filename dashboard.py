@@ -0,0 +1,11 @@
+from utils import get_cleaned_dataframe_from_csv, export_dashboard, AGRICULTURE_KEYWORDS
+
+def main(file_path='../data/scopus.csv', output_path='../data/', top_n=15, keywords=AGRICULTURE_KEYWORDS):
+    # Load the CSV file
+    data = get_cleaned_dataframe_from_csv(file_path, keywords=keywords)
+
+    # Export the interactive dashboard as a single offline HTML file
+    export_dashboard(data, f"{output_path}/dashboard.html", top_n)
+
+if __name__ == '__main__':
+    main()
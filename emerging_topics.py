@@ -0,0 +1,16 @@
+from utils import get_cleaned_dataframe_from_csv, detect_keyword_bursts, AGRICULTURE_KEYWORDS
+
+# Detect emerging topics as bursts of normalized keywords across years
+def main(file_path='../data/scopus.csv', output_path='../data/', top_n=20, s=2.0, gamma=1.0, keywords=AGRICULTURE_KEYWORDS):
+    # Load the CSV file
+    data = get_cleaned_dataframe_from_csv(file_path, keywords=keywords)
+
+    bursts = detect_keyword_bursts(data, s=s, gamma=gamma)
+    for category, category_bursts in bursts.groupby('Category', sort=False):
+        print(f"\nStrongest keyword bursts ({category}):")
+        print(category_bursts.head(top_n).to_string(index=False, float_format='{:.2f}'.format))
+
+    bursts.to_csv(f"{output_path}/keyword_bursts.csv", index=False)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,23 @@
+import os
+from utils import find_near_duplicates, collapse_duplicates, read_export
+
+# Detect near-duplicate records and write a collapsed copy of the export for the other analyses
+def main(file_path='../data/scopus.csv', output_path='../data/', threshold=0.8):
+    # Load the CSV file
+    data = read_export(file_path)
+
+    clusters = find_near_duplicates(data, threshold=threshold)
+    duplicated = clusters.duplicated(keep=False)
+    duplicates = data.loc[duplicated, ['Title', 'Year', 'Source title', 'Cited by']].assign(DuplicateCluster=clusters[duplicated])
+    duplicates = duplicates.sort_values(['DuplicateCluster', 'Year'])
+    print(duplicates.head(20).to_string())
+    duplicates.to_csv(f"{output_path}/duplicate_clusters.csv", index=False)
+
+    # The collapsed export keeps the most cited version of every cluster
+    deduplicated = collapse_duplicates(data, clusters)
+    name, extension = os.path.splitext(os.path.basename(file_path))
+    deduplicated.to_csv(f"{output_path}/{name}_deduplicated{extension}", index=False)
+    print(f"Kept {len(deduplicated)} of {len(data)} records in {output_path}/{name}_deduplicated{extension}")
+
+if __name__ == '__main__':
+    main()
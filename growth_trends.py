@@ -0,0 +1,16 @@
+from utils import get_cleaned_dataframe_from_csv, extract_countries, entity_trends, AGRICULTURE_KEYWORDS
+
+# Rank the fastest-growing entities of every kind by their publication trend
+def main(file_path='../data/scopus.csv', output_path='../data/', top_n=20, min_publications=5, sort_by='slope', keywords=AGRICULTURE_KEYWORDS):
+    # Load the CSV file
+    data = get_cleaned_dataframe_from_csv(file_path, keywords=keywords)
+    data['Country'] = data['Affiliations'].apply(extract_countries)
+
+    for entity_column in ['Country', 'Source title', 'Authors', 'Keyword']:
+        trends = entity_trends(data, entity_column, min_publications=min_publications, sort_by=sort_by)
+        print(f"\nFastest-growing {entity_column} by {sort_by} ({len(trends)} with at least {min_publications} publications):")
+        print(trends.head(top_n).to_string(float_format='{:.2f}'.format))
+        trends.to_csv(f"{output_path}/trends_{entity_column.lower().replace(' ', '_')}.csv")
+
+if __name__ == '__main__':
+    main()
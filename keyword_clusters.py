@@ -0,0 +1,22 @@
+from utils import get_cleaned_dataframe_from_csv, build_keyword_networks_by_category, AGRICULTURE_KEYWORDS
+
+# Keyword co-occurrence networks and topic clusters for agriculture and non-agriculture publications
+def main(file_path='../data/scopus.csv', output_path='../data/', min_occurrences=5, min_cooccurrences=2, top_n=10, keywords=AGRICULTURE_KEYWORDS):
+    # Load the CSV file
+    data = get_cleaned_dataframe_from_csv(file_path, keywords=keywords)
+
+    networks = build_keyword_networks_by_category(data, min_occurrences=min_occurrences, min_cooccurrences=min_cooccurrences)
+    for category, (nodes, edges) in networks.items():
+        print(f"\n{category}: {len(nodes)} keywords, {len(edges)} edges, {nodes['cluster'].nunique()} clusters")
+        for cluster, cluster_nodes in nodes.groupby('cluster'):
+            if cluster >= top_n:
+                break
+            print(f"Cluster {cluster} ({len(cluster_nodes)} keywords): {', '.join(cluster_nodes['Keyword'].head(8))}")
+
+        # Export node and edge tables for external network tools
+        suffix = category.lower().replace('-', '_')
+        nodes.to_csv(f"{output_path}/keyword_nodes_{suffix}.csv", index=False)
+        edges.to_csv(f"{output_path}/keyword_edges_{suffix}.csv", index=False)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,24 @@
+from utils import get_cleaned_dataframe_from_csv, extract_countries, estimate_yearly_volume, estimate_yearly_citations, top_n_stability, AGRICULTURE_KEYWORDS
+
+# Quick preview of the volume, citation and top-N analyses on a stratified sample, scaled back with margins of error
+def main(file_path='../data/scopus.csv', output_path='../data/', fraction=0.1, top_n=10, random_state=None, keywords=AGRICULTURE_KEYWORDS):
+    # Stream the CSV file into a stratified sample by year and agriculture category
+    data = get_cleaned_dataframe_from_csv(file_path, sample_fraction=fraction, random_state=random_state, keywords=keywords)
+    data['Country'] = data['Affiliations'].apply(extract_countries)
+
+    volume = estimate_yearly_volume(data)
+    print(f"\nEstimated publications per year (exact: the sample is stratified by year):\n{volume}")
+
+    citations = estimate_yearly_citations(data)
+    print(f"\nEstimated average citations per year (± 95% margin):\n{citations.to_string(float_format='{:.2f}'.format)}")
+    citations.to_csv(f"{output_path}/preview_citations_per_year.csv")
+
+    for entity_column in ['Authors', 'Source title', 'Country']:
+        top = top_n_stability(data, entity_column, top_n, random_state=random_state)
+        print(f"\nEstimated top {top_n} {entity_column} (± 95% margin, share of bootstrap replicates keeping them in the top {top_n}):")
+        for entity, values in top.iterrows():
+            print(f"{entity}: {values['estimate']:.0f} ± {values['margin']:.0f} publications, stability={values['stability']:.0%}")
+        top.to_csv(f"{output_path}/preview_top_{entity_column.lower().replace(' ', '_')}.csv")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+import numpy as np
+import matplotlib.pyplot as plt
+from utils import get_cleaned_dataframe_from_csv, Color, lotka_by_category, bradford_by_category, AGRICULTURE_KEYWORDS
+
+COLORS = {'General': Color.GENERAL.value, 'Agriculture': Color.AGRICULTURE.value, 'Non-Agriculture': Color.NON_AGRICULTURE.value}
+
+# Plotting function for the author productivity distribution against Lotka's law and the Bradford curve of the sources
+def plot_laws(fits, frequencies, sources, output_path):
+    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(14, 6))
+    for category, color in COLORS.items():
+        observed = frequencies[frequencies['Category'] == category]
+        alpha, constant = fits.loc[category, 'alpha_mle'], fits.loc[category, 'constant']
+        ax1.scatter(observed['publications'], observed['share'], color=color, label=f"{category} (alpha={alpha:.2f})")
+        ax1.plot(observed['publications'], constant / observed['publications'] ** alpha, color=color, linestyle='--')
+
+        counts = np.sort(sources[category].to_numpy())[::-1]
+        counts = counts[counts > 0]
+        ax2.plot(np.arange(1, len(counts) + 1), np.cumsum(counts), color=color, label=category)
+
+    ax1.set_xscale('log')
+    ax1.set_yscale('log')
+    ax1.set_title("Author Productivity and Lotka's Law")
+    ax1.set_xlabel('Publications per Author')
+    ax1.set_ylabel('Share of Authors')
+    ax2.set_xscale('log')
+    ax2.set_title('Bradford Curve of the Sources')
+    ax2.set_xlabel('Source Rank')
+    ax2.set_ylabel('Cumulative Publications')
+    for ax in (ax1, ax2):
+        ax.grid(True, alpha=0.3)
+        ax.legend()
+
+    plt.tight_layout()
+    plt.savefig(f"{output_path}/productivity_laws.png")
+    plt.close()
+
+# Lotka's law over the author publication counts and Bradford zones over the sources, for every agriculture split
+def main(file_path='../data/scopus.csv', output_path='../data/', n_zones=3, figures=True, keywords=AGRICULTURE_KEYWORDS):
+    # Load the CSV file
+    data = get_cleaned_dataframe_from_csv(file_path, keywords=keywords)
+
+    fits, frequencies = lotka_by_category(data, 'Authors')
+    print("\nLotka's law fitted on the author publication counts:")
+    print(fits.to_string(float_format='{:.3f}'.format))
+
+    zones, sources = bradford_by_category(data, 'Source title', n_zones)
+    print(f"\nBradford zones of the sources ({n_zones} zones with equal shares of the publications):")
+    print(zones.to_string(index=False, float_format='{:.2f}'.format))
+    for category in zones['Category'].unique():
+        core = sources[sources[f'{category} zone'] == 1].sort_values(category, ascending=False, kind='stable').index
+        print(f"\nCore sources in {category}: {len(core)}: {', '.join(core[:10])}{', ...' if len(core) > 10 else ''}")
+
+    fits.to_csv(f"{output_path}/lotka_fit.csv")
+    frequencies.to_csv(f"{output_path}/lotka_frequencies.csv", index=False)
+    zones.to_csv(f"{output_path}/bradford_zones.csv", index=False)
+    sources.to_csv(f"{output_path}/bradford_sources.csv")
+
+    if figures:
+        plot_laws(fits, frequencies, sources, output_path)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,26 @@
+import pandas as pd
+from utils import get_cleaned_dataframe_from_csv, dataset_fingerprint, load_or_build_similarity_index, AGRICULTURE_KEYWORDS
+
+# Papers similar to the most cited papers of the corpus, or to free-text queries, from the persisted TF-IDF index
+def main(file_path='../data/scopus.csv', output_path='../data/', top_n=10, k=5, queries=None, keywords=AGRICULTURE_KEYWORDS):
+    # Load the CSV file
+    data = get_cleaned_dataframe_from_csv(file_path, keywords=keywords)
+    index = load_or_build_similarity_index(data, f"{output_path}/similarity_index.npz", dataset_fingerprint(file_path, keywords=keywords))
+
+    if queries:
+        results = index.search(queries, k)
+        results.insert(0, 'Seed', pd.Index(queries)[results.pop('Query')])
+    else:
+        seeds = pd.to_numeric(data['Cited by'], errors='coerce').nlargest(top_n).index
+        results = index.similar_papers(seeds, k)
+        results['Seed'] = data.loc[results['Seed'], 'Title'].to_numpy()
+    results = results.join(data[['Title', 'Year', 'Source title', 'Cited by']], on='Paper')
+
+    for seed, similar in results.groupby('Seed', sort=False):
+        print(f"\nPapers similar to '{seed[:100]}':")
+        for row in similar.to_dict(orient='records'):
+            print(f"    {row['Rank']}. ({row['Similarity']:.2f}) {row['Title'][:100]} ({row['Year']}), cited by {row['Cited by']}")
+    results.to_csv(f"{output_path}/similar_papers.csv", index=False)
+
+if __name__ == '__main__':
+    main()
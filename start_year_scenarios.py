@@ -0,0 +1,47 @@
+import pandas as pd
+import matplotlib.pyplot as plt
+from utils import get_cleaned_dataframe_from_csv, Color, extract_countries, sweep_start_years, sweep_top_entities, AGRICULTURE_KEYWORDS
+
+# Plotting function for the volume and mean citations of every start year
+def plot_sweep(results, output_path):
+    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(14, 6))
+    categories = {'total': ('Total', Color.GENERAL.value), 'agric': ('Agriculture', Color.AGRICULTURE.value), 'non_agric': ('Non-Agriculture', Color.NON_AGRICULTURE.value)}
+    for split, (label, color) in categories.items():
+        ax1.plot(results.index, results[split], 'o-', label=label, color=color)
+        ax2.plot(results.index, results[f'{split}_mean_citations'], 'o-', label=label, color=color)
+
+    ax1.set_title('Publications per Start Year')
+    ax1.set_ylabel('Number of Publications')
+    ax2.set_title('Average Citations per Start Year')
+    ax2.set_ylabel('Average Citations')
+    for ax in (ax1, ax2):
+        ax.set_xlabel('Start Year')
+        ax.set_xticks(results.index)
+        ax.grid(True, alpha=0.3)
+        ax.legend()
+
+    plt.tight_layout()
+    plt.savefig(f"{output_path}/start_year_sweep.png")
+    plt.close()
+
+# Results of the volume, citation and top-entity analyses for several cut-off years, from a single load of the dataset
+def main(file_path='../data/scopus.csv', output_path='../data/', start_years=(2008, 2010, 2012, 2014, 2016), top_n=10, figures=True, keywords=AGRICULTURE_KEYWORDS):
+    # Load the CSV file without any start year filter
+    data = get_cleaned_dataframe_from_csv(file_path, start_year=None, keywords=keywords)
+    data['Country'] = data['Affiliations'].apply(extract_countries)
+
+    results = sweep_start_years(data, start_years)
+    print(f"\nResults per start year:\n{results.T.to_string(float_format='{:.2f}'.format)}")
+    results.to_csv(f"{output_path}/start_year_sweep.csv")
+
+    top_entities = [sweep_top_entities(data, column, start_years, top_n) for column in ['Authors', 'Source title', 'Country']]
+    for table in top_entities:
+        for start_year, ranking in table.groupby('StartYear'):
+            print(f"\nTop {top_n} {table['Column'].iat[0]} from {start_year}: {', '.join(f'{entity} ({total})' for entity, total in zip(ranking['Entity'], ranking['total']))}")
+    pd.concat(top_entities, ignore_index=True).to_csv(f"{output_path}/start_year_sweep_top_entities.csv", index=False)
+
+    if figures:
+        plot_sweep(results, output_path)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,30 @@
+import pandas as pd
+
+from utils.deduplication import shingle_hashes, find_near_duplicates
+
+def test_identical_short_titles_share_their_shingle():
+    data = pd.DataFrame({
+        'Title': ['Deep learning', 'Crop yield prediction with satellite imagery', 'Deep learning', 'Soil moisture sensors'],
+        'Abstract': [None, None, None, None],
+    })
+    documents, shingles = shingle_hashes(data)
+    assert list(shingles[documents == 0]) == list(shingles[documents == 2])
+    assert len(shingles[documents == 0]) == 1
+
+def test_identical_short_titles_are_duplicates():
+    data = pd.DataFrame({
+        'Title': ['Deep learning', 'Crop yield prediction with satellite imagery', 'Deep learning', 'Soil moisture sensors'],
+        'Abstract': [None, None, None, None],
+    })
+    clusters = find_near_duplicates(data)
+    assert clusters[0] == clusters[2]
+    assert clusters.nunique() == 3
+
+def test_large_groups_of_copies_are_duplicates():
+    data = pd.DataFrame({
+        'Title': ['Deep learning for crop yield prediction'] * 150 + ['Soil moisture sensors for irrigation management'],
+        'Abstract': [None] * 151,
+    })
+    clusters = find_near_duplicates(data)
+    assert clusters[:150].nunique() == 1
+    assert clusters.nunique() == 2
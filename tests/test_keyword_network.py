@@ -0,0 +1,26 @@
+import numpy as np
+from scipy import sparse
+
+from utils.keyword_network import label_propagation
+
+# Two 6-cliques joined by a single edge between node 5 and node 6
+def two_cliques():
+    blocks = np.zeros((12, 12))
+    blocks[:6, :6] = 1
+    blocks[6:, 6:] = 1
+    blocks[5, 6] = blocks[6, 5] = 1
+    np.fill_diagonal(blocks, 0)
+    return sparse.csr_matrix(blocks)
+
+def test_label_propagation_finds_the_two_cliques():
+    graph = two_cliques()
+    for seed in range(50):
+        labels = label_propagation(graph, random_state=seed)
+        assert len(np.unique(labels[:6])) == 1
+        assert len(np.unique(labels[6:])) == 1
+        assert labels[0] != labels[6]
+
+def test_label_propagation_keeps_isolated_nodes_apart():
+    graph = sparse.block_diag([two_cliques(), sparse.csr_matrix((2, 2))]).tocsr()
+    labels = label_propagation(graph, random_state=0)
+    assert len(np.unique(labels)) == 4
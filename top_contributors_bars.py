@@ -3,11 +3,7 @@ import numpy as np
 import matplotlib.pyplot as plt
 from collections import Counter
 import pycountry
-
-# Load the CSV file
-file_path = '../data/scopus.csv'
-output_path = '../data/'
-data = pd.read_csv(file_path)
+from utils import draw_bars, draw_labels, read_export
 
 # Define agriculture-related keywords
 agriculture_keywords = [
@@ -31,12 +27,6 @@ def is_agriculture_related(text, keywords=agriculture_keywords):
     text = text.lower()
     return any(keyword.lower() in text for keyword in keywords)
 
-data['IsAgriculture'] = data.apply(lambda x: is_agriculture_related(x['Title']) or
-                                    is_agriculture_related(x['Abstract']) or
-                                    is_agriculture_related(x['Author Keywords']) or
-                                    is_agriculture_related(x['Index Keywords']) or
-                                    is_agriculture_related(x['Affiliations']), axis=1)
-
 # Extraction of contributions
 # Simplified extraction of countries from 'Affiliations' column
 # This requires a predefined list or heuristic for identifying countries within affiliation strings
@@ -65,8 +55,6 @@ def extract_countries(affiliations):
     
     return 'Unknown'
 
-data['Country'] = data['Affiliations'].apply(extract_countries)
-
 # Aggregating contributions for each category
 def aggregate_contributions(data, column_name, top_n=10):
     if column_name == 'Authors':
@@ -98,12 +86,12 @@ def aggregate_contributions(data, column_name, top_n=10):
     agri_categories, agri_values = zip(*agri_sorted) if agri_sorted else ([], [])
     return general_categories, general_values, agri_categories, agri_values, ignored_general, ignored_agri
 
-def plot_individual_horizontal_bar_chart(categories, data, title, xlabel, top_n):
+def plot_individual_horizontal_bar_chart(categories, data, title, xlabel, top_n, output_path):
     y = np.arange(len(categories))  # Position for each category on the y-axis
     
     # Adjust the figure size if necessary to accommodate long category names
     fig, ax = plt.subplots(figsize=(20, 0.5 * len(categories)))
-    rects = ax.barh(y, data, height=0.35, label=title, alpha=0.8, color='royalblue' if 'General' in title else 'darkorange')
+    draw_bars(ax, y, data, 0.35, horizontal=True, label=title, alpha=0.8, color='royalblue' if 'General' in title else 'darkorange')
 
     ax.set_xlabel('Publications', fontsize=12)
     ax.set_title(f"Top {top_n} {title}", fontsize=14)
@@ -111,19 +99,8 @@ def plot_individual_horizontal_bar_chart(categories, data, title, xlabel, top_n)
     ax.set_yticklabels(categories, fontsize=10)
     ax.legend()
     
-    # Function to auto-label the bars with their count value
-    def autolabel(rects):
-        """Attach a text label beside each bar in *rects*, displaying its width."""
-        for rect in rects:
-            width = rect.get_width()
-            ax.annotate('{}'.format(width),
-                        xy=(width, rect.get_y() + rect.get_height() / 2),
-                        xytext=(3, 0),  # 3 points horizontal offset
-                        textcoords="offset points",
-                        ha='left', va='center')
-
-    # Call the autolabel function for each set of bars
-    autolabel(rects)
+    # Label the bars with their count value beside each bar, 3 points horizontal offset, as a single artist
+    draw_labels(ax, data, y, data, ha='left', va='center', offset=(3, 0))
 
     # Additional plot customizations
     plt.ylabel(xlabel, fontsize=12)  # xlabel now serves as ylabel in a horizontal bar chart
@@ -131,14 +108,14 @@ def plot_individual_horizontal_bar_chart(categories, data, title, xlabel, top_n)
     plt.savefig(f"{output_path}/top_{'general' if 'General' in title else 'agriculture'}_{xlabel.lower().replace(' ', '_')}.png")  # Saving the figure as a file
 
 
-def plot_individual_vertical_bar_chart(categories, data, title, xlabel, top_n):
+def plot_individual_vertical_bar_chart(categories, data, title, xlabel, top_n, output_path):
     # Determine positions for each bar
     x = np.arange(len(categories))  # label locations
     width = 0.35  # bar width
     
     # Plot bars for general and agriculture-related data
     fig, ax = plt.subplots(figsize=(10, 8))
-    rects = ax.bar(x, data, width, label=title, alpha=0.8, color='royalblue' if 'General' in title else 'darkorange')
+    draw_bars(ax, x, data, width, label=title, alpha=0.8, color='royalblue' if 'General' in title else 'darkorange')
 
     ax.set_ylabel('Publications', fontsize=12)
     ax.set_title(f"Top {top_n} {title}", fontsize=14)
@@ -146,19 +123,8 @@ def plot_individual_vertical_bar_chart(categories, data, title, xlabel, top_n):
     ax.set_xticklabels(categories, rotation=45, ha="right", fontsize=10)
     ax.legend()
     
-    # Function to auto-label the bars with their count value
-    def autolabel(rects):
-        """Attach a text label above each bar in *rects*, displaying its height."""
-        for rect in rects:
-            height = rect.get_height()
-            ax.annotate('{}'.format(height),
-                        xy=(rect.get_x() + rect.get_width() / 2, height),
-                        xytext=(0, 3),  # 3 points vertical offset
-                        textcoords="offset points",
-                        ha='center', va='bottom')
-
-    # Call the autolabel function for each set of bars
-    autolabel(rects)
+    # Label the bars with their count value above each bar, 3 points vertical offset, as a single artist
+    draw_labels(ax, x, data, data, ha='center', va='bottom', offset=(0, 3))
 
     # Additional plot customizations 
     plt.xlabel(xlabel, fontsize=12)
@@ -174,23 +140,37 @@ def print_discussion_points(categories_general, values_general, categories_agri,
     print(f"Ignored in General due to NaN or Unknown: {ignored_general}")
     print(f"Ignored in Agriculture due to NaN or Unknown: {ignored_agri}")
 
-# Plotting contributions separately
-top_n = 10  # Adjust this to change the number of top contributors displayed
-for category in ['Country', 'Authors', 'Source title']:
-    print(f"----------------\nPlotting contributions by {category}...")
-    general_categories, general_values, agri_categories, agri_values, ignored_general, ignored_agri  = aggregate_contributions(data, category, top_n)
+def main(file_path='../data/scopus.csv', output_path='../data/', top_n=10):
+    # Load the CSV file
+    data = read_export(file_path)
 
-    # Prepare discussion points
-    print_discussion_points(general_categories, general_values, agri_categories, agri_values, ignored_general, ignored_agri, category)
+    data['IsAgriculture'] = data.apply(lambda x: is_agriculture_related(x['Title']) or
+                                        is_agriculture_related(x['Abstract']) or
+                                        is_agriculture_related(x['Author Keywords']) or
+                                        is_agriculture_related(x['Index Keywords']) or
+                                        is_agriculture_related(x['Affiliations']), axis=1)
 
-    if general_values:  # Check if there's data to plot
-        if category == 'Source title':
-            plot_individual_horizontal_bar_chart(general_categories, general_values, f'General Contributions by {category}', category, top_n)
-        else:
-            plot_individual_vertical_bar_chart(general_categories, general_values, f'General Contributions by {category}', category, top_n)
-    
-    if agri_values:  # Check if there's data to plot
-        if category == 'Source title':
-            plot_individual_horizontal_bar_chart(agri_categories, agri_values, f'Agriculture Contributions by {category}', category, top_n)
-        else:
-            plot_individual_vertical_bar_chart(agri_categories, agri_values, f'Agriculture Contributions by {category}', category, top_n)
\ No newline at end of file
+    data['Country'] = data['Affiliations'].apply(extract_countries)
+
+    # Plotting contributions separately
+    for category in ['Country', 'Authors', 'Source title']:
+        print(f"----------------\nPlotting contributions by {category}...")
+        general_categories, general_values, agri_categories, agri_values, ignored_general, ignored_agri  = aggregate_contributions(data, category, top_n)
+
+        # Prepare discussion points
+        print_discussion_points(general_categories, general_values, agri_categories, agri_values, ignored_general, ignored_agri, category)
+
+        if general_values:  # Check if there's data to plot
+            if category == 'Source title':
+                plot_individual_horizontal_bar_chart(general_categories, general_values, f'General Contributions by {category}', category, top_n, output_path)
+            else:
+                plot_individual_vertical_bar_chart(general_categories, general_values, f'General Contributions by {category}', category, top_n, output_path)
+
+        if agri_values:  # Check if there's data to plot
+            if category == 'Source title':
+                plot_individual_horizontal_bar_chart(agri_categories, agri_values, f'Agriculture Contributions by {category}', category, top_n, output_path)
+            else:
+                plot_individual_vertical_bar_chart(agri_categories, agri_values, f'Agriculture Contributions by {category}', category, top_n, output_path)
+
+if __name__ == '__main__':
+    main()
@@ -1,53 +1,40 @@
 import numpy as np
+import pandas as pd
 import matplotlib.pyplot as plt
-from collections import Counter
-from utils import get_cleaned_dataframe_from_csv, Color, extract_countries
-
-# Load the CSV file
-file_path = '../data/scopus.csv'
-output_path = '../data/'
-data = get_cleaned_dataframe_from_csv(file_path)
-
-# Apply the function to extract countries
-data['Country'] = data['Affiliations'].apply(extract_countries)
-# Print the number of ignored rows due to missing countries
-print(f"Ignored documents dut to missing affiliation (countries): {data['Country'].isna().sum()}")
-# Print the number of ignored rows due to missing countries for Agriculture
-print(f"Ignored agriculture documents due to missing data: {data[data['IsAgriculture'] & data['Country'].isna()].shape[0]}")
-# Print the number of ignored rows due to missing countries for Non-Agriculture
-print(f"Ignored non-agriculture documents due to missing data: {data[~data['IsAgriculture'] & data['Country'].isna()].shape[0]}")
-data = data.dropna(subset=['Country']).explode('Country')
-
-# Function to aggregate data for plotting
-def aggregate_data(data, is_citations=False):
+from utils import get_cleaned_dataframe_from_csv, Color, extract_countries, ResultCache, dataset_fingerprint, citation_percentiles, export_result_table, aggregate_csv_shards, AGRICULTURE_KEYWORDS, INSTITUTIONS_FILE
+
+# Papers, citation sums and top 10% papers of every (country, category)
+def country_totals(data):
+    return data.groupby(['Country', 'IsAgriculture']).agg(papers=('IsAgriculture', 'size'), citations=('Cited by', 'sum'), top10=('Top10', 'sum'))
+
+# Function to aggregate data for plotting, from the totals of country_totals
+def aggregate_data(totals, is_citations=False):
     if is_citations:
-        data_grouped = data.groupby('Country').agg({'Cited by': 'sum', 'IsAgriculture': 'sum'}).rename(columns={'Cited by': 'total'})
+        is_agri = totals.index.get_level_values('IsAgriculture').to_numpy(dtype=bool)
+        data_grouped = pd.DataFrame({'total': totals['citations'].groupby('Country').sum(), 'IsAgriculture': totals['papers'].where(is_agri, 0).groupby('Country').sum()})
         data_grouped['non_agric'] = data_grouped['total'] - data_grouped['IsAgriculture']
         data_grouped['agric'] = data_grouped.pop('IsAgriculture')
     else:
-        data_grouped = data.groupby(['Country', 'IsAgriculture']).size().unstack(fill_value=0)
+        data_grouped = totals['papers'].unstack(fill_value=0)
         data_grouped.columns = ['non_agric', 'agric']
         data_grouped['total'] = data_grouped['agric'] + data_grouped['non_agric']
+        data_grouped['top10_share'] = totals['top10'].groupby('Country').sum() / data_grouped['total'] * 100
 
     data_grouped['agric_ratio'] = data_grouped['agric'] / data_grouped['total'] * 100
     data_grouped['non_agric_ratio'] = data_grouped['non_agric'] / data_grouped['total'] * 100
 
     # Citations per publication calculation if applicable
     if is_citations:
-        publication_data_temp = aggregate_data(data, is_citations=False)
+        publication_data_temp = aggregate_data(totals, is_citations=False)
         data_grouped['citations_per_publication'] = data_grouped['total'] / publication_data_temp['total']
     
     top_countries = data_grouped.sort_values(by='total', ascending=False).head(15)
     print("\nDetailed Country Stats:\n" + f"is_citations={is_citations}\n", top_countries)  # Printing detailed stats
-    return top_countries[['total', 'agric', 'non_agric', 'agric_ratio', 'non_agric_ratio', 'citations_per_publication'] if is_citations else ['total', 'agric', 'non_agric', 'agric_ratio', 'non_agric_ratio']]
-
+    return top_countries[['total', 'agric', 'non_agric', 'agric_ratio', 'non_agric_ratio', 'citations_per_publication'] if is_citations else ['total', 'agric', 'non_agric', 'agric_ratio', 'non_agric_ratio', 'top10_share']]
 
-# Aggregate publication and citation data
-publication_data = aggregate_data(data.copy(), is_citations=False)
-citation_data = aggregate_data(data.copy(), is_citations=True)
 
 # Plotting function for countries with their publication and citation counts
-def plot_combined_data(publication_data, citation_data, title, output_filename):
+def plot_combined_data(publication_data, citation_data, title, output_filename, output_path):
     countries = publication_data.index
     x = np.arange(len(countries))  # the label locations
     width = 0.35  # the width of the bars
@@ -78,4 +65,59 @@ def plot_combined_data(publication_data, citation_data, title, output_filename):
     plt.savefig(f"{output_path}/{output_filename}.png")
     #plt.show()
 
-plot_combined_data(publication_data, citation_data, 'Top Countries: Publications and Citations by Research Focus', 'top_countries_combined')
+# Publication and citation rankings stacked in one table, one row per (measure, country)
+def combined_table(publication_data, citation_data):
+    tables = []
+    for measure, table in {'publications': publication_data, 'citations': citation_data}.items():
+        table = table.rename_axis('entity').reset_index()
+        table.insert(1, 'rank', range(1, len(table) + 1))
+        tables.append(table.assign(measure=measure))
+    return pd.concat(tables, ignore_index=True)
+
+# Load the CSV file and expand it to one row per (paper, country), with the agriculture and non-agriculture documents
+# ignored due to missing countries
+def load_country_data(file_path, keywords=AGRICULTURE_KEYWORDS):
+    data = get_cleaned_dataframe_from_csv(file_path, keywords=keywords)
+    # Flag the top 10% most cited papers of every year and category before splitting papers across countries
+    data = data.join(citation_percentiles(data))
+
+    # Apply the function to extract countries
+    data['Country'] = data['Affiliations'].apply(extract_countries)
+    ignored_agriculture = data[data['IsAgriculture'] & data['Country'].isna()].shape[0]
+    ignored_non_agriculture = data[~data['IsAgriculture'] & data['Country'].isna()].shape[0]
+    return data.dropna(subset=['Country']).explode('Country'), (ignored_agriculture, ignored_non_agriculture)
+
+# Country totals of the CSV file, from its rows or from the partial aggregates of shards processed in parallel
+def load_country_totals(file_path, shards=None, keywords=AGRICULTURE_KEYWORDS):
+    if not shards:
+        data, ignored = load_country_data(file_path, keywords)
+        return country_totals(data), ignored
+    aggregates = aggregate_csv_shards(file_path, ['countries'], shards, keywords=keywords)
+    return aggregates.entity_totals('Country'), aggregates.ignored('Country', require_citations=False)
+
+# Print the ignored documents, whether the country totals were computed or read from the cache
+def print_ignored(ignored):
+    ignored_agriculture, ignored_non_agriculture = ignored
+    # Print the number of ignored rows due to missing countries
+    print(f"Ignored documents dut to missing affiliation (countries): {ignored_agriculture + ignored_non_agriculture}")
+    # Print the number of ignored rows due to missing countries for Agriculture
+    print(f"Ignored agriculture documents due to missing data: {ignored_agriculture}")
+    # Print the number of ignored rows due to missing countries for Non-Agriculture
+    print(f"Ignored non-agriculture documents due to missing data: {ignored_non_agriculture}")
+
+def main(file_path='../data/scopus.csv', output_path='../data/', use_cache=True, shards=None, keywords=AGRICULTURE_KEYWORDS):
+    # The CSV file is only loaded when the country totals are not cached yet; the aggregations of the small totals
+    # table are recomputed on every run
+    result_cache = ResultCache(f"{output_path}/.cache", enabled=use_cache)
+    totals, ignored = result_cache.get_or_compute('top_countries.load_country_totals', dataset_fingerprint(file_path, keywords=keywords, data_files=[INSTITUTIONS_FILE]), {},
+                                                  lambda: load_country_totals(file_path, shards, keywords))
+    print_ignored(ignored)
+
+    # Aggregate publication and citation data
+    publication_data = aggregate_data(totals, is_citations=False)
+    citation_data = aggregate_data(totals, is_citations=True)
+    export_result_table('top_countries_combined', combined_table(publication_data, citation_data), output_path)
+    plot_combined_data(publication_data, citation_data, 'Top Countries: Publications and Citations by Research Focus', 'top_countries_combined', output_path)
+
+if __name__ == '__main__':
+    main()
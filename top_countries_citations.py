@@ -1,64 +1,37 @@
 import numpy as np
 import matplotlib.pyplot as plt
-from utils import get_cleaned_dataframe_from_csv, Color, extract_countries
-
-# Load the CSV file
-file_path = '../data/scopus.csv'
-output_path = '../data/'
-
-# Assuming that the 'Cited by' column represents the citation counts
-data = get_cleaned_dataframe_from_csv(file_path)
-
-# Use the existing function for extracting countries, modified to handle multiple countries per affiliation correctly
-data['Country'] = data['Affiliations'].apply(extract_countries)
-
-# Print the number of ignored rows due to missing countries
-print(f"Ignored documents dut to missing affiliation (countries): {data['Country'].isna().sum()}")
-
-# Remove rows with missing countries
-data = data.dropna(subset=['Country'])
+from utils import get_cleaned_dataframe_from_csv, Color, draw_bars, extract_countries, ResultCache, dataset_fingerprint, get_backend, entity_table, export_result_table, AGRICULTURE_KEYWORDS, INSTITUTIONS_FILE
 
 # Aggregating citation counts for each country
-def aggregate(data, top_n=10):
-    exploded_data = data.explode('Country')
-    
-    # Sum citation counts by country
-    total = exploded_data.groupby('Country')['Cited by'].sum()
-    agric = exploded_data[exploded_data['IsAgriculture']].groupby('Country')['Cited by'].sum()
-    non_agric = exploded_data[~exploded_data['IsAgriculture']].groupby('Country')['Cited by'].sum()
+def aggregate(data, top_n=10, backend='pandas'):
+    # Sum citation counts by country with the selected backend
+    totals = get_backend(backend, data).entity_totals('Country')
 
     # Select top N countries based on total citation counts
-    top_countries = dict(sorted(total.items(), key=lambda x: x[1], reverse=True)[:top_n])
+    top_countries = totals.sort_values('total_citations', ascending=False, kind='stable').head(top_n)
 
     # Gather citation data for top countries
-    top_data = {
-        country: {
-            'total': total.get(country, 0),
-            'agric': agric.get(country, 0),
-            'non_agric': non_agric.get(country, 0),
-        } for country in top_countries
-    }
+    return top_countries[['total_citations', 'agric_citations', 'non_agric_citations']].set_axis(['total', 'agric', 'non_agric'], axis=1).to_dict(orient='index')
+
+# Print the ignored documents and the details of the top countries, whether they were computed or read from the cache
+def print_top_countries(top_data, ignored):
+    print(f"Ignored documents dut to missing affiliation (countries): {ignored}")
 
     # Print details for top countries
     for country, values in top_data.items():
         print(f"{country}: Total Citations={values['total']}, Agriculture={values['agric']}, Non-Agriculture={values['non_agric']}")
 
-    return top_data
-
-top_n = 15
-top_countries_data = aggregate(data, top_n)
-
 # Plotting function for countries and their citation counts
-def plot_top_countries(top_countries_data, title, output_filename):
+def plot_top_countries(top_countries_data, title, output_filename, output_path):
     countries = list(top_countries_data.keys())
     x = np.arange(len(countries))
     
     fig, ax = plt.subplots(figsize=(14, 8))
     
     # Plotting citation data
-    ax.barh(x - 0.2, [top_countries_data[country]['total'] for country in countries], 0.2, color=Color.GENERAL.value, label='Total Citations')
-    ax.barh(x, [top_countries_data[country]['agric'] for country in countries], 0.2, color=Color.AGRICULTURE.value, label='Agricultural Citations')
-    ax.barh(x + 0.2, [top_countries_data[country]['non_agric'] for country in countries], 0.2, color=Color.NON_AGRICULTURE.value, label='Non-Agricultural Citations')
+    draw_bars(ax, x - 0.2, [top_countries_data[country]['total'] for country in countries], 0.2, horizontal=True, color=Color.GENERAL.value, label='Total Citations')
+    draw_bars(ax, x, [top_countries_data[country]['agric'] for country in countries], 0.2, horizontal=True, color=Color.AGRICULTURE.value, label='Agricultural Citations')
+    draw_bars(ax, x + 0.2, [top_countries_data[country]['non_agric'] for country in countries], 0.2, horizontal=True, color=Color.NON_AGRICULTURE.value, label='Non-Agricultural Citations')
     
     ax.set_xlabel('Citations')
     ax.set_title(title)
@@ -72,4 +45,34 @@ def plot_top_countries(top_countries_data, title, output_filename):
     plt.savefig(f"{output_path}/{output_filename}.png")
     plt.close()
 
-plot_top_countries(top_countries_data, 'Top Countries: Citations by Research Focus', 'top_countries_citations')
+# Load the CSV file and attach the list of countries of every paper, with the number of documents ignored due to
+# missing countries
+def load_country_data(file_path, keywords=AGRICULTURE_KEYWORDS):
+    # Assuming that the 'Cited by' column represents the citation counts
+    data = get_cleaned_dataframe_from_csv(file_path, keywords=keywords)
+
+    # Use the existing function for extracting countries, modified to handle multiple countries per affiliation correctly
+    data['Country'] = data['Affiliations'].apply(extract_countries)
+    ignored = data['Country'].isna().sum()
+
+    # Remove rows with missing countries
+    data = data.dropna(subset=['Country'])
+    return data, ignored
+
+# Aggregation of the countries of the CSV file, with the number of documents ignored due to missing countries
+def aggregate_file(file_path, top_n=10, backend='pandas', keywords=AGRICULTURE_KEYWORDS):
+    data, ignored = load_country_data(file_path, keywords)
+    return aggregate(data, top_n, backend), ignored
+
+def main(file_path='../data/scopus.csv', output_path='../data/', top_n=15, use_cache=True, backend='pandas', keywords=AGRICULTURE_KEYWORDS):
+    # The CSV file is only loaded when the aggregation is not cached yet
+    cache = ResultCache(f"{output_path}/.cache", enabled=use_cache)
+    top_countries_data, ignored = cache.get_or_compute(
+        'top_countries_citations.aggregate', dataset_fingerprint(file_path, keywords=keywords, data_files=[INSTITUTIONS_FILE]), {'top_n': top_n},
+        lambda: aggregate_file(file_path, top_n, backend, keywords), version=2)
+    print_top_countries(top_countries_data, ignored)
+    export_result_table('top_countries_citations', entity_table(top_countries_data), output_path)
+    plot_top_countries(top_countries_data, 'Top Countries: Citations by Research Focus', 'top_countries_citations', output_path)
+
+if __name__ == '__main__':
+    main()
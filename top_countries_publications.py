@@ -1,64 +1,34 @@
 import numpy as np
 import matplotlib.pyplot as plt
-from collections import Counter
-from utils import get_cleaned_dataframe_from_csv, Color, extract_countries
-
-# Load the CSV file
-file_path = '../data/scopus.csv'
-output_path = '../data/'
-data = get_cleaned_dataframe_from_csv(file_path)
-
-# Example usage:
-data['Country'] = data['Affiliations'].apply(extract_countries)
-
-# Print the number of ignored rows due to missing countries
-print(f"Ignored documents dut to missing affiliation (countries): {data['Country'].isna().sum()}")
-
-# Remove rows with missing countries
-data = data.dropna(subset=['Country'])
+from utils import get_cleaned_dataframe_from_csv, Color, draw_bars, extract_countries, ResultCache, dataset_fingerprint, get_backend, citation_percentiles, top10_shares, entity_table, export_result_table, AGRICULTURE_KEYWORDS, INSTITUTIONS_FILE
 
 # Aggregating contributions for each country
-def aggregate_contributions(data, top_n=10):
-    # Explode the country list into separate rows
-    exploded_data = data.explode('Country')
-    
-    # Count total, agricultural, and non-agricultural publications for each country
-    total_counts = Counter(exploded_data['Country'])
-    agric_counts = Counter(exploded_data[exploded_data['IsAgriculture']]['Country'])
-    non_agric_counts = Counter(exploded_data[~exploded_data['IsAgriculture']]['Country'])
+def aggregate_contributions(data, top_n=10, backend='pandas'):
+    # Count total, agricultural, and non-agricultural publications for each country with the selected backend
+    totals = get_backend(backend, data).entity_totals('Country')
 
-    # Select top N countries based on total counts
-    top_countries = dict(sorted(total_counts.items(), key=lambda x: x[1], reverse=True)[:top_n])
+    # Gather counts for the top N countries based on total counts, with their share of highly-cited papers
+    return totals[['total', 'agric', 'non_agric']].head(top_n).join(top10_shares(data, 'Country')).to_dict(orient='index')
 
-    # Gather counts for top countries
-    top_data = {
-        country: {
-            'total': total_counts[country],
-            'agric': agric_counts.get(country, 0),
-            'non_agric': non_agric_counts.get(country, 0),
-        } for country in top_countries
-    }
+# Print the ignored documents and the details of the top countries, whether they were computed or read from the cache
+def print_top_countries(top_data, ignored):
+    print(f"Ignored documents dut to missing affiliation (countries): {ignored}")
 
     # Print details for top countries
     for country, values in top_data.items():
-        print(f"{country}: Total={values['total']}, Agriculture={values['agric']}, Non-Agriculture={values['non_agric']}")
-
-    return top_data
-
-top_n = 15
-top_countries_data = aggregate_contributions(data, top_n)
+        print(f"{country}: Total={values['total']}, Agriculture={values['agric']}, Non-Agriculture={values['non_agric']}, Top-10% share={values['top10_share']:.1f}%")
 
 # Plotting function for countries and their publication counts
-def plot_top_countries_data(top_countries_data, title, output_filename):
+def plot_top_countries_data(top_countries_data, title, output_filename, output_path):
     countries = list(top_countries_data.keys())
     x = np.arange(len(countries))
     
     fig, ax = plt.subplots(figsize=(14, 8))
     
     # Plotting the total, agricultural, and non-agricultural publications
-    ax.barh(x - 0.2, [top_countries_data[country]['total'] for country in countries], 0.2, color=Color.GENERAL.value, label='Total Publications')
-    ax.barh(x, [top_countries_data[country]['agric'] for country in countries], 0.2, color=Color.AGRICULTURE.value, label='Agricultural')
-    ax.barh(x + 0.2, [top_countries_data[country]['non_agric'] for country in countries], 0.2, color=Color.NON_AGRICULTURE.value, label='Non-Agricultural')
+    draw_bars(ax, x - 0.2, [top_countries_data[country]['total'] for country in countries], 0.2, horizontal=True, color=Color.GENERAL.value, label='Total Publications')
+    draw_bars(ax, x, [top_countries_data[country]['agric'] for country in countries], 0.2, horizontal=True, color=Color.AGRICULTURE.value, label='Agricultural')
+    draw_bars(ax, x + 0.2, [top_countries_data[country]['non_agric'] for country in countries], 0.2, horizontal=True, color=Color.NON_AGRICULTURE.value, label='Non-Agricultural')
     
     ax.set_xlabel('Publications')
     ax.set_title(title)
@@ -72,4 +42,35 @@ def plot_top_countries_data(top_countries_data, title, output_filename):
     plt.savefig(f"{output_path}/{output_filename}.png")
     plt.close()
 
-plot_top_countries_data(top_countries_data, 'Top Countries: Publications by Research Focus', 'top_countries_publications')
+# Load the CSV file and attach the list of countries of every paper, with the number of documents ignored due to
+# missing countries
+def load_country_data(file_path, keywords=AGRICULTURE_KEYWORDS):
+    data = get_cleaned_dataframe_from_csv(file_path, keywords=keywords)
+    # Flag the top 10% most cited papers of every year and category before dropping the papers without countries
+    data = data.join(citation_percentiles(data))
+
+    # Example usage:
+    data['Country'] = data['Affiliations'].apply(extract_countries)
+    ignored = data['Country'].isna().sum()
+
+    # Remove rows with missing countries
+    data = data.dropna(subset=['Country'])
+    return data, ignored
+
+# Aggregation of the countries of the CSV file, with the number of documents ignored due to missing countries
+def aggregate_file(file_path, top_n=10, backend='pandas', keywords=AGRICULTURE_KEYWORDS):
+    data, ignored = load_country_data(file_path, keywords)
+    return aggregate_contributions(data, top_n, backend), ignored
+
+def main(file_path='../data/scopus.csv', output_path='../data/', top_n=15, use_cache=True, backend='pandas', keywords=AGRICULTURE_KEYWORDS):
+    # The CSV file is only loaded when the aggregation is not cached yet
+    cache = ResultCache(f"{output_path}/.cache", enabled=use_cache)
+    top_countries_data, ignored = cache.get_or_compute(
+        'top_countries_publications.aggregate_contributions', dataset_fingerprint(file_path, keywords=keywords, data_files=[INSTITUTIONS_FILE]), {'top_n': top_n},
+        lambda: aggregate_file(file_path, top_n, backend, keywords), version=3)
+    print_top_countries(top_countries_data, ignored)
+    export_result_table('top_countries_publications', entity_table(top_countries_data), output_path)
+    plot_top_countries_data(top_countries_data, 'Top Countries: Publications by Research Focus', 'top_countries_publications', output_path)
+
+if __name__ == '__main__':
+    main()
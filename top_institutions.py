@@ -0,0 +1,62 @@
+import numpy as np
+import matplotlib.pyplot as plt
+from utils import get_cleaned_dataframe_from_csv, Color, draw_bars, draw_markers, legend_with_marker, institution_metrics, top_entities, ResultCache, dataset_fingerprint, entity_table, export_result_table, AGRICULTURE_KEYWORDS, INSTITUTIONS_FILE
+
+# Ranking institutions parsed from the affiliations by publications, citations and H-index, from their metrics table
+def aggregate_institutions(metrics, output_path, top_n=15):
+    metrics.to_csv(f"{output_path}/top_institutions.csv")
+
+    top_data = {
+        (institution[:50] + '...' if len(institution) > 50 else institution): values  # Truncate institution names to 50 characters
+        for institution, values in top_entities(metrics, top_n).items()
+    }
+    for institution, values in top_data.items():
+        print(f"{institution}: Total={values['total']}, Agriculture={values['agric']}, Non-Agriculture={values['non_agric']}, "
+              f"Citations={values['total_citations']:.0f}, Total H-index={values['total_h_index']}, "
+              f"Agriculture H-index={values['agric_h_index']}, Non-Agriculture H-index={values['non_agric_h_index']}, "
+              f"Top-10% share={values['total_top10_share']:.1f}%")
+
+    return top_data
+
+# Plotting function for institutions and their H-index
+def plot_top_institutions_data(top_institutions_data, title, output_filename, output_path):
+    institutions = list(top_institutions_data.keys())
+    y = np.arange(len(institutions))
+
+    fig, ax = plt.subplots(figsize=(14, 8))
+
+    # Plotting the total, agricultural, and non-agricultural publications
+    draw_bars(ax, y - 0.2, [top_institutions_data[institution]['total'] for institution in institutions], 0.2, horizontal=True, color=Color.GENERAL.value, label='Total Publications')
+    draw_bars(ax, y, [top_institutions_data[institution]['agric'] for institution in institutions], 0.2, horizontal=True, color=Color.AGRICULTURE.value, label='Agricultural')
+    draw_bars(ax, y + 0.2, [top_institutions_data[institution]['non_agric'] for institution in institutions], 0.2, horizontal=True, color=Color.NON_AGRICULTURE.value, label='Non-Agricultural')
+
+    # Add H-index markers, one artist per series
+    draw_markers(ax, [top_institutions_data[institution]['total_h_index'] for institution in institutions], y - 0.2, size=3, edgewidth=8)
+    draw_markers(ax, [top_institutions_data[institution]['agric_h_index'] for institution in institutions], y, size=3, edgewidth=8)
+    draw_markers(ax, [top_institutions_data[institution]['non_agric_h_index'] for institution in institutions], y + 0.2, size=3, edgewidth=8)
+
+    ax.set_xlabel('Count')
+    ax.set_ylabel('Institution')
+    ax.set_title(title)
+    ax.set_yticks(y)
+    ax.set_yticklabels(institutions)
+
+    # Use a proxy artist for H-index legend entry
+    legend_with_marker(ax, 'H-index')
+
+    plt.tight_layout()
+    plt.savefig(f"{output_path}/{output_filename}.png")
+    plt.close()
+
+def main(file_path='../data/scopus.csv', output_path='../data/', top_n=15, use_cache=True, keywords=AGRICULTURE_KEYWORDS):
+    # The CSV file is only loaded when the metrics of the institutions are not cached yet
+    cache = ResultCache(f"{output_path}/.cache", enabled=use_cache)
+    metrics = cache.get_or_compute(
+        'top_institutions.institution_metrics', dataset_fingerprint(file_path, keywords=keywords, data_files=[INSTITUTIONS_FILE]), {},
+        lambda: institution_metrics(get_cleaned_dataframe_from_csv(file_path, keywords=keywords)))
+    top_institutions_data = aggregate_institutions(metrics, output_path, top_n)
+    export_result_table('top_institutions', entity_table(top_institutions_data), output_path)
+    plot_top_institutions_data(top_institutions_data, 'Top Institutions: Publications and H-index', 'top_institutions_h_index', output_path)
+
+if __name__ == '__main__':
+    main()
@@ -1,87 +1,58 @@
-import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
-from matplotlib.lines import Line2D
-from collections import Counter
-from utils import get_cleaned_dataframe_from_csv, Color
+from utils import get_cleaned_dataframe_from_csv, Color, draw_bars, draw_markers, legend_with_marker, compute_citation_metrics, top_entities, ResultCache, dataset_fingerprint, entity_table, export_result_table, aggregate_csv_shards, AGRICULTURE_KEYWORDS
 
-# Load the CSV file
-file_path = '../data/scopus.csv'
-output_path = '../data/'
-data = pd.read_csv(file_path)
-
-data = get_cleaned_dataframe_from_csv(file_path)
-
-# Function to calculate the H-index for a list of citation counts
-def calculate_h_index(citations):
-    citations.sort(reverse=True)
-    h_index = 0
-    for citation in citations:
-        if citation >= h_index + 1:
-            h_index += 1
-        else:
-            break
-    return h_index
-
-# Aggregating contributions for each category based on source title
+# Aggregating contributions for each category based on source title, with the agriculture and non-agriculture documents
+# ignored due to missing data
 def aggregate_contributions_and_h_index(data, top_n=10):
     ignored_agriculture = data[data['IsAgriculture'] & (data['Source title'].isna() | data['Cited by'].isna())].shape[0]
     ignored_non_agriculture = data[~data['IsAgriculture'] & (data['Source title'].isna() | data['Cited by'].isna())].shape[0]
-    print(f"Ignored agriculture documents due to missing data: {ignored_agriculture}")
-    print(f"Ignored non-agriculture documents due to missing data: {ignored_non_agriculture}")
-
-    # Calculate H-index for each source title
-    total_h_index = data.groupby('Source title')['Cited by'].apply(lambda x: calculate_h_index(list(x))).to_dict()
-    agric_h_index = data[data['IsAgriculture']].groupby('Source title')['Cited by'].apply(lambda x: calculate_h_index(list(x))).to_dict()
-    non_agric_h_index = data[~data['IsAgriculture']].groupby('Source title')['Cited by'].apply(lambda x: calculate_h_index(list(x))).to_dict()
 
-    # Count total, agricultural, and non-agricultural publications for each source
-    total_counts = Counter(data['Source title'])
-    agric_counts = Counter(data[data['IsAgriculture']]['Source title'])
-    non_agric_counts = Counter(data[~data['IsAgriculture']]['Source title'])
+    # Publication counts, H-index and the extended metrics of every source, computed in one pass
+    source_metrics = compute_citation_metrics(data, 'Source title')
+    return top_sources(source_metrics, top_n), (ignored_agriculture, ignored_non_agriculture)
 
-    # Select top N sources based on total counts
-    top_sources = dict(sorted(total_counts.items(), key=lambda x: x[1], reverse=True)[:top_n])
+# Same aggregation from the partial aggregates of the shards of the CSV file
+def aggregate_shards(aggregates, top_n=10):
+    return top_sources(aggregates.citation_metrics('Source title'), top_n), aggregates.ignored('Source title')
 
-    # Gather counts and H-index for top sources
-    top_data = {
-        (source[:50] + '...' if len(source) > 50 else source) : {  # Truncate source title to 50 characters
-            'total': total_counts[source],
-            'agric': agric_counts.get(source, 0),
-            'non_agric': non_agric_counts.get(source, 0),
-            'total_h_index': total_h_index.get(source, 0),
-            'agric_h_index': agric_h_index.get(source, 0),
-            'non_agric_h_index': non_agric_h_index.get(source, 0),
-        } for source in top_sources
+# Top N sources of the metrics table, by total publications
+def top_sources(source_metrics, top_n=10):
+    # Gather counts and metrics for the top N sources based on total counts
+    return {
+        (source[:50] + '...' if len(source) > 50 else source): values  # Truncate source title to 50 characters
+        for source, values in top_entities(source_metrics, top_n).items()
     }
-    
-    # Print details for top authors
-    for source, values in top_data.items():
-        print(f"{source}: Total={values['total']}, Agriculture={values['agric']}, Non-Agriculture={values['non_agric']}, "
-              f"Total H-index={values['total_h_index']}, Agriculture H-index={values['agric_h_index']}, Non-Agriculture H-index={values['non_agric_h_index']}")
 
-    return top_data
+# Print the ignored documents and the details of the top sources, whether they were computed or read from the cache
+def print_top_sources(top_data, ignored):
+    ignored_agriculture, ignored_non_agriculture = ignored
+    print(f"Ignored agriculture documents due to missing data: {ignored_agriculture}")
+    print(f"Ignored non-agriculture documents due to missing data: {ignored_non_agriculture}")
 
-top_n = 15
-top_sources_data = aggregate_contributions_and_h_index(data, top_n)
+    # Print details for top sources
+    for source, values in top_data.items():
+        print(f"{source}: Total={values['total']}, Agriculture={values['agric']}, Non-Agriculture={values['non_agric']}, "
+              f"Total H-index={values['total_h_index']}, Agriculture H-index={values['agric_h_index']}, Non-Agriculture H-index={values['non_agric_h_index']}, "
+              f"G-index={values['total_g_index']}, i10-index={values['total_i10_index']}, M-quotient={values['total_m_quotient']:.2f}, "
+              f"Normalized citations={values['total_normalized_citations']:.2f}, Top-10% share={values['total_top10_share']:.1f}%")
 
 # Plotting function for sources and their H-index
-def plot_top_sources_data(top_sources_data, title, output_filename):
+def plot_top_sources_data(top_sources_data, title, output_filename, output_path):
     sources = list(top_sources_data.keys())
     y = np.arange(len(sources))
     
     fig, ax = plt.subplots(figsize=(14, 8))
     
     # Plotting the total, agricultural, and non-agricultural publications
-    ax.barh(y - 0.2, [top_sources_data[source]['total'] for source in sources], 0.2, color=Color.GENERAL.value, label='Total Publications')
-    ax.barh(y, [top_sources_data[source]['agric'] for source in sources], 0.2, color=Color.AGRICULTURE.value, label='Agricultural')
-    ax.barh(y + 0.2, [top_sources_data[source]['non_agric'] for source in sources], 0.2, color=Color.NON_AGRICULTURE.value, label='Non-Agricultural')
+    draw_bars(ax, y - 0.2, [top_sources_data[source]['total'] for source in sources], 0.2, horizontal=True, color=Color.GENERAL.value, label='Total Publications')
+    draw_bars(ax, y, [top_sources_data[source]['agric'] for source in sources], 0.2, horizontal=True, color=Color.AGRICULTURE.value, label='Agricultural')
+    draw_bars(ax, y + 0.2, [top_sources_data[source]['non_agric'] for source in sources], 0.2, horizontal=True, color=Color.NON_AGRICULTURE.value, label='Non-Agricultural')
 
-    # Add H-index markers
-    for i, source in enumerate(sources):
-        ax.plot(top_sources_data[source]['total_h_index'], y[i] - 0.2, 'k_', markersize=3, markeredgewidth=8)
-        ax.plot(top_sources_data[source]['agric_h_index'], y[i], 'k_', markersize=3, markeredgewidth=8)
-        ax.plot(top_sources_data[source]['non_agric_h_index'], y[i] + 0.2, 'k_', markersize=3, markeredgewidth=8)
+    # Add H-index markers, one artist per series
+    draw_markers(ax, [top_sources_data[source]['total_h_index'] for source in sources], y - 0.2, size=3, edgewidth=8)
+    draw_markers(ax, [top_sources_data[source]['agric_h_index'] for source in sources], y, size=3, edgewidth=8)
+    draw_markers(ax, [top_sources_data[source]['non_agric_h_index'] for source in sources], y + 0.2, size=3, edgewidth=8)
     
     ax.set_xlabel('Count')
     ax.set_ylabel('Source')
@@ -90,13 +61,23 @@ def plot_top_sources_data(top_sources_data, title, output_filename):
     ax.set_yticklabels(sources)
 
     # Use a proxy artist for H-index legend entry
-    handles, labels = ax.get_legend_handles_labels()
-    h_index_legend = Line2D([0], [0], color='k', marker='_', linestyle='None', markersize=10, label='H-index')
-    handles.append(h_index_legend)  # Add the custom legend entry
-    ax.legend(handles=handles)
+    legend_with_marker(ax, 'H-index')
 
     plt.tight_layout()
     plt.savefig(f"{output_path}/{output_filename}.png")
     plt.close()
 
-plot_top_sources_data(top_sources_data, 'Top Journals: Publications and H-index', 'top_journals_h_index')
+def main(file_path='../data/scopus.csv', output_path='../data/', top_n=15, use_cache=True, shards=None, keywords=AGRICULTURE_KEYWORDS):
+    # The CSV file is only loaded when the aggregation is not cached yet, whole or as shards aggregated in parallel
+    cache = ResultCache(f"{output_path}/.cache", enabled=use_cache)
+    top_sources_data, ignored = cache.get_or_compute(
+        'top_sources.aggregate_contributions_and_h_index', dataset_fingerprint(file_path, keywords=keywords), {'top_n': top_n},
+        lambda: aggregate_shards(aggregate_csv_shards(file_path, ['sources'], shards, keywords=keywords), top_n) if shards
+        else aggregate_contributions_and_h_index(get_cleaned_dataframe_from_csv(file_path, keywords=keywords), top_n), version=2)
+    print_top_sources(top_sources_data, ignored)
+    export_result_table('top_sources', entity_table(top_sources_data), output_path)
+    plot_top_sources_data(top_sources_data, 'Top Journals: Publications and H-index', 'top_journals_h_index', output_path)
+
+if __name__ == '__main__':
+    main()
+
@@ -1,3 +1,25 @@
-from .get_cleaned_dataframe_from_csv import get_cleaned_dataframe_from_csv
+from .get_cleaned_dataframe_from_csv import AGRICULTURE_KEYWORDS, get_cleaned_dataframe_from_csv, read_export, keep_resident
 from .enums import Color
-from .extract_countries import extract_countries
\ No newline at end of file
+from .extract_countries import extract_countries, INSTITUTIONS_FILE
+from .bootstrap_citations import bootstrap_citation_intervals, significant_peaks
+from .citation_metrics import compute_citation_metrics, top_entities, top10_shares
+from .dashboard import build_dashboard_panels, export_dashboard
+from .result_cache import ResultCache, dataset_fingerprint
+from .aggregation_backends import PandasBackend, DuckDBBackend, get_backend, write_parquet_snapshot
+from .keywords import explode_keywords
+from .trends import entity_year_matrix, compute_trends, entity_trends
+from .bursts import kleinberg_bursts, burst_intervals, detect_keyword_bursts
+from .keyword_network import paper_keyword_matrix, cooccurrence_matrix, association_strength, label_propagation, build_keyword_network, build_keyword_networks_by_category
+from .deduplication import shingle_hashes, minhash_signatures, lsh_candidate_pairs, find_near_duplicates, collapse_duplicates
+from .affiliations import InstitutionTrie, parse_affiliation, parse_affiliations, institution_metrics
+from .collaboration import paper_country_matrix, collaboration_matrix, collaboration_pairs, international_rates, collaboration_by_year, export_chord_data
+from .plotting import draw_bars, draw_markers, draw_labels, legend_with_marker
+from .start_year_sweep import yearly_base_aggregates, suffix_sums, suffix_argmax, sweep_start_years, sweep_top_entities
+from .sampling import stratified_reservoir_sample, estimate_yearly_volume, estimate_yearly_citations, estimate_entity_totals, top_n_stability
+from .citation_percentiles import citation_percentiles, percentile_thresholds
+from .bibliometric_laws import entity_publication_counts, frequency_of_frequencies, fit_lotka, bradford_zones, lotka_by_category, bradford_by_category
+from .watch import ANALYSIS_COLUMNS, read_keywords, column_hashes, stale_analyses, DatasetWatcher
+from .similarity import tokenize, count_terms, SimilarityIndex, index_tag, load_or_build_similarity_index
+from .coauthorship import paper_author_matrix, coauthorship_counts, weighted_graph, coauthorship_graph, pagerank, sampled_betweenness, graph_centrality, coauthorship_split_counts, coauthorship_graphs, centrality_by_scope, coauthorship_centrality
+from .sharded_aggregation import SHARDED_ANALYSES, csv_shards, read_csv_shard, ShardAggregates, aggregate_csv_shards
+from .result_tables import SCHEMA_VERSION, TABLE_SCHEMAS, table_schema, entity_table, export_result_table, read_result_table
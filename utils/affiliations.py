@@ -0,0 +1,96 @@
+import re
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from .citation_metrics import compute_citation_metrics
+from .extract_countries import country_of_affiliation, load_institutions, _country_lookup
+
+# Words that mark an affiliation component as an organisation rather than a department, city or country
+INSTITUTION_MARKERS = re.compile(
+    r'\b(universit\w*|institut\w*|college|school|academy|laborator\w*|labs?|cent(?:er|re)|hospital|'
+    r'inc|ltd|llc|gmbh|corporation|company|research|foundation|fondazione|polytechnic|politecnico)\b',
+    re.IGNORECASE,
+)
+TOKEN = re.compile(r'\w+')
+
+# Token-level prefix trie of known institution names, matched at every token of an affiliation
+class InstitutionTrie:
+    END = object()
+
+    def __init__(self, names):
+        self.root = {}
+        for name in names:
+            node = self.root
+            for token in TOKEN.findall(name.lower()):
+                node = node.setdefault(token, {})
+            node[self.END] = name
+
+    # Longest known institution found anywhere in the affiliation, or None
+    def longest_match(self, affiliation):
+        tokens = TOKEN.findall(affiliation.lower())
+        best, best_length = None, 0
+        for start in range(len(tokens)):
+            node = self.root
+            for position in range(start, len(tokens)):
+                node = node.get(tokens[position])
+                if node is None:
+                    break
+                if self.END in node and position - start + 1 > best_length:
+                    best, best_length = node[self.END], position - start + 1
+        return best
+
+@lru_cache(maxsize=None)
+def _default_trie():
+    return InstitutionTrie(load_institutions())
+
+# Forget the known institutions and every lookup built from them, so that the next parse reads the current data file
+def reload_institutions():
+    for cached in (load_institutions, _country_lookup, _default_trie, parse_affiliation):
+        cached.cache_clear()
+
+# Split one affiliation ("Department, Institution, City, Country") into its institution, city and country
+@lru_cache(maxsize=1_000_000)
+def parse_affiliation(affiliation):
+    components = [component.strip() for component in affiliation.split(',') if component.strip()]
+    if not components:
+        return None, None, None
+
+    # The country is the last component; otherwise it is inferred from the whole string
+    country = country_of_affiliation(components[-1])
+    has_country_component = country is not None
+    if country is None:
+        country = country_of_affiliation(affiliation)
+
+    # A known institution wins; otherwise the organisation-like component closest to the city
+    institution = _default_trie().longest_match(affiliation)
+    if institution is None:
+        candidates = components[:-2] if has_country_component and len(components) > 2 else components
+        marked = [component for component in candidates if INSTITUTION_MARKERS.search(component)]
+        institution = marked[-1] if marked else candidates[-1] if len(candidates) < len(components) else components[0]
+
+    city = components[-2] if has_country_component and len(components) > 1 else None
+    return institution, city, country
+
+# One row per (paper, affiliation) with its parsed components; each distinct affiliation string is parsed once
+def parse_affiliations(affiliations):
+    parts = affiliations.dropna().str.split(';').explode().str.strip()
+    parts = parts[parts != '']
+
+    codes, unique_parts = pd.factorize(parts)
+    parsed = np.array([parse_affiliation(part) for part in unique_parts], dtype=object).reshape(-1, 3)
+    return pd.DataFrame({
+        'Paper': parts.index,
+        'Affiliation': parts.to_numpy(),
+        'Institution': parsed[codes, 0] if len(parsed) else [],
+        'City': parsed[codes, 1] if len(parsed) else [],
+        'Country': parsed[codes, 2] if len(parsed) else [],
+    })
+
+# Publications, citations and H-index of every institution, per agriculture split
+def institution_metrics(data):
+    parsed = parse_affiliations(data['Affiliations'])
+    institutions = parsed.dropna(subset=['Institution']).drop_duplicates(['Paper', 'Institution'])
+    data = data.assign(Institution=institutions.groupby('Paper')['Institution'].agg(list).reindex(data.index))
+    return compute_citation_metrics(data, 'Institution')
@@ -0,0 +1,149 @@
+import pandas as pd
+
+SPLIT_COLUMNS = ['total', 'agric', 'non_agric']
+
+# Plain pandas implementation of the shared aggregations, run in memory on one core
+class PandasBackend:
+    name = 'pandas'
+
+    def __init__(self, data):
+        self.data = data
+
+    # Number of publications per year, in total and per agriculture split
+    def yearly_volume(self):
+        counts = self.data.groupby(['Year', 'IsAgriculture']).size().unstack(fill_value=0)
+        counts = counts.reindex(columns=[True, False], fill_value=0)
+        counts.columns = ['agric', 'non_agric']
+        counts.insert(0, 'total', counts['agric'] + counts['non_agric'])
+        return counts.sort_index()
+
+    # Mean citations and document counts per year, ignoring documents without 'Cited by'
+    def yearly_citations(self):
+        data = self.data.assign(**{'Cited by': pd.to_numeric(self.data['Cited by'], errors='coerce')}).dropna(subset=['Cited by'])
+
+        yearly_data = data.groupby(['Year', 'IsAgriculture'])['Cited by'].mean().unstack(fill_value=0)
+        yearly_data = yearly_data.reindex(columns=[False, True], fill_value=0)
+        yearly_data.columns = ['Non-Agriculture', 'Agriculture']
+        yearly_data['General'] = data.groupby('Year')['Cited by'].mean()
+
+        doc_counts = data.groupby(['Year', 'IsAgriculture']).size().unstack(fill_value=0)
+        doc_counts = doc_counts.reindex(columns=[False, True], fill_value=0)
+        doc_counts.columns = ['Non-Agriculture', 'Agriculture']
+        doc_counts['General'] = data.groupby('Year').size()
+        return yearly_data, doc_counts
+
+    # Publication counts and citation sums per entity, sorted by total publications. List columns (e.g. countries) and
+    # the '; ' separated authors give one entity per item, other columns one entity per paper; empty entities are dropped
+    def entity_totals(self, entity_column):
+        data = self.data[[entity_column, 'Cited by', 'IsAgriculture']].dropna(subset=[entity_column]).copy()
+        if entity_column == 'Authors':
+            data['Authors'] = data['Authors'].str.split('; ')
+        data = data.explode(entity_column).dropna(subset=[entity_column])
+        data = data[data[entity_column] != '']
+        data['Cited by'] = pd.to_numeric(data['Cited by'], errors='coerce').fillna(0)
+
+        grouped = data.groupby([entity_column, 'IsAgriculture'])['Cited by'].agg(['size', 'sum']).unstack(fill_value=0)
+        grouped = grouped.reindex(columns=pd.MultiIndex.from_product([['size', 'sum'], [True, False]]), fill_value=0)
+        totals = pd.DataFrame({
+            'agric': grouped[('size', True)],
+            'non_agric': grouped[('size', False)],
+            'agric_citations': grouped[('sum', True)],
+            'non_agric_citations': grouped[('sum', False)],
+        })
+        totals.insert(0, 'total', totals['agric'] + totals['non_agric'])
+        totals['total_citations'] = totals['agric_citations'] + totals['non_agric_citations']
+        return _sort_totals(totals.rename_axis(entity_column))
+
+# Embedded DuckDB engine: the dataset is registered (or read from a Parquet snapshot) and aggregated with SQL on all cores.
+# List columns (e.g. countries) stay DuckDB lists, so that only they are unnested
+class DuckDBBackend:
+    name = 'duckdb'
+
+    def __init__(self, data=None, parquet_path=None):
+        import duckdb
+
+        self.connection = duckdb.connect()
+        if parquet_path is not None:
+            self.connection.read_parquet(parquet_path).create_view('papers')
+        else:
+            self.connection.register('papers', data)
+
+    def _query(self, sql):
+        return self.connection.execute(sql).df()
+
+    # SQL expression giving one row per entity of a column, with the same splitting as PandasBackend.entity_totals
+    def _entities(self, entity_column):
+        column_types = self._query("DESCRIBE papers").set_index('column_name')['column_type']
+        if column_types[entity_column].endswith('[]'):
+            return f'unnest("{entity_column}")'
+        if entity_column == 'Authors':
+            return "unnest(string_split(\"Authors\", '; '))"
+        return f'"{entity_column}"'
+
+    def yearly_volume(self):
+        volume = self._query("""
+            SELECT "Year",
+                   count(*) AS total,
+                   count(*) FILTER (WHERE "IsAgriculture") AS agric,
+                   count(*) FILTER (WHERE NOT "IsAgriculture") AS non_agric
+            FROM papers GROUP BY "Year" ORDER BY "Year"
+        """).set_index('Year')
+        return volume.astype('int64')
+
+    def yearly_citations(self):
+        rows = self._query("""
+            SELECT "Year",
+                   coalesce(avg(cited) FILTER (WHERE NOT "IsAgriculture"), 0) AS "Non-Agriculture",
+                   coalesce(avg(cited) FILTER (WHERE "IsAgriculture"), 0) AS "Agriculture",
+                   avg(cited) AS "General",
+                   count(*) FILTER (WHERE NOT "IsAgriculture") AS "Non-Agriculture count",
+                   count(*) FILTER (WHERE "IsAgriculture") AS "Agriculture count",
+                   count(*) AS "General count"
+            FROM (SELECT "Year", "IsAgriculture", TRY_CAST("Cited by" AS DOUBLE) AS cited FROM papers)
+            WHERE cited IS NOT NULL
+            GROUP BY "Year" ORDER BY "Year"
+        """).set_index('Year')
+        yearly_data = rows[['Non-Agriculture', 'Agriculture', 'General']]
+        doc_counts = rows[['Non-Agriculture count', 'Agriculture count', 'General count']].astype('int64')
+        doc_counts.columns = ['Non-Agriculture', 'Agriculture', 'General']
+        return yearly_data, doc_counts
+
+    def entity_totals(self, entity_column):
+        totals = self._query(f"""
+            SELECT entity AS "{entity_column}",
+                   count(*) AS total,
+                   count(*) FILTER (WHERE "IsAgriculture") AS agric,
+                   count(*) FILTER (WHERE NOT "IsAgriculture") AS non_agric,
+                   coalesce(sum(cited) FILTER (WHERE "IsAgriculture"), 0) AS agric_citations,
+                   coalesce(sum(cited) FILTER (WHERE NOT "IsAgriculture"), 0) AS non_agric_citations,
+                   coalesce(sum(cited), 0) AS total_citations
+            FROM (
+                SELECT {self._entities(entity_column)} AS entity, "IsAgriculture",
+                       coalesce(TRY_CAST("Cited by" AS DOUBLE), 0) AS cited
+                FROM papers WHERE "{entity_column}" IS NOT NULL
+            )
+            WHERE entity <> ''
+            GROUP BY entity
+        """).set_index(entity_column)
+        totals[['total', 'agric', 'non_agric']] = totals[['total', 'agric', 'non_agric']].astype('int64')
+        return _sort_totals(totals[['total', 'agric', 'non_agric', 'agric_citations', 'non_agric_citations', 'total_citations']])
+
+# Both backends break ties on the entity name so that their top-N selections agree
+def _sort_totals(totals):
+    return totals.sort_index().sort_values('total', ascending=False, kind='stable')
+
+# Write the cleaned dataset as a Parquet snapshot that the DuckDB backend can query out-of-core; list columns are stored
+# as Parquet lists
+def write_parquet_snapshot(data, parquet_path):
+    data.to_parquet(parquet_path, index=False)
+    print(f"Parquet snapshot written to {parquet_path}")
+    return parquet_path
+
+BACKENDS = {'pandas': PandasBackend, 'duckdb': DuckDBBackend}
+
+def get_backend(name, data=None, parquet_path=None):
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown backend '{name}', expected one of {list(BACKENDS)}")
+    if name == 'pandas':
+        return PandasBackend(data if data is not None else pd.read_parquet(parquet_path))
+    return DuckDBBackend(data, parquet_path)
@@ -0,0 +1,131 @@
+import numpy as np
+import pandas as pd
+from scipy.optimize import minimize_scalar
+from scipy.special import zeta
+
+from .citation_metrics import explode_entities
+
+CATEGORIES = ['General', 'Agriculture', 'Non-Agriculture']
+
+# Publications of every entity of a column in every agriculture split, as integer arrays from one factorization
+def entity_publication_counts(data, entity_column):
+    expanded_data = explode_entities(data, entity_column, columns=('IsAgriculture',))
+    # An entity listed twice on the same paper still counts once
+    expanded_data = expanded_data.reset_index().drop_duplicates()
+
+    entity_codes, entities = pd.factorize(expanded_data['Entity'], sort=True)
+    is_agri = expanded_data['IsAgriculture'].to_numpy(dtype=bool)
+    return pd.DataFrame({
+        'General': np.bincount(entity_codes, minlength=len(entities)),
+        'Agriculture': np.bincount(entity_codes[is_agri], minlength=len(entities)),
+        'Non-Agriculture': np.bincount(entity_codes[~is_agri], minlength=len(entities)),
+    }, index=pd.Index(entities, name=entity_column))
+
+# Number of entities with exactly x publications, for every x that occurs
+def frequency_of_frequencies(counts):
+    counts = np.asarray(counts, dtype=np.int64)
+    frequencies = np.bincount(counts[counts > 0])
+    publications = np.flatnonzero(frequencies)
+    return pd.DataFrame({
+        'publications': publications,
+        'entities': frequencies[publications],
+        'share': frequencies[publications] / max(frequencies.sum(), 1),
+    })
+
+# Lotka's law f(x) = C / x^alpha: maximum-likelihood and log-log least-squares exponents, with a Kolmogorov-Smirnov test
+def fit_lotka(counts):
+    counts = np.asarray(counts, dtype=np.int64)
+    frequencies = np.bincount(counts[counts > 0], minlength=2)
+    publications = np.flatnonzero(frequencies)
+    entities = frequencies[publications]
+    n = int(entities.sum())
+    if n == 0:
+        return {'entities': 0, 'publications': 0, 'alpha_mle': np.nan, 'alpha_ls': np.nan, 'constant': np.nan,
+                'r_squared': np.nan, 'single_share': np.nan, 'ks_statistic': np.nan, 'ks_critical': np.nan, 'fits': False}
+
+    # The log-likelihood of the zeta distribution only needs the frequency table
+    log_sum = (entities * np.log(publications)).sum()
+    result = minimize_scalar(lambda alpha: alpha * log_sum + n * np.log(zeta(alpha)), bounds=(1.01, 6), method='bounded')
+    alpha_mle = result.x
+
+    # Least squares on the log-log share of entities with at least x publications, which decays as x^(1 - alpha)
+    # and is not dominated by the noisy single-entity frequencies of the tail
+    if len(publications) > 1:
+        log_x, log_f = np.log(publications), np.log(np.cumsum(entities[::-1])[::-1] / n)
+        slope, intercept = np.polyfit(log_x, log_f, 1)
+        residuals = log_f - (slope * log_x + intercept)
+        r_squared = 1 - (residuals ** 2).sum() / max(((log_f - log_f.mean()) ** 2).sum(), np.finfo(float).tiny)
+        alpha_ls = 1 - slope
+    else:
+        alpha_ls = r_squared = np.nan
+
+    # Largest gap between the observed and fitted cumulative distributions; 1.63 / sqrt(n) is the 1% critical value
+    support = np.arange(1, len(frequencies))
+    expected = np.cumsum(support ** -alpha_mle) / zeta(alpha_mle)
+    ks_statistic = np.abs(np.cumsum(frequencies[1:]) / n - expected).max()
+    ks_critical = 1.63 / np.sqrt(n)
+    return {
+        'entities': n,
+        'publications': int((entities * publications).sum()),
+        'alpha_mle': alpha_mle,
+        'alpha_ls': alpha_ls,
+        'constant': 1 / zeta(alpha_mle),
+        'r_squared': r_squared,
+        'single_share': frequencies[1] / n,
+        'ks_statistic': ks_statistic,
+        'ks_critical': ks_critical,
+        'fits': bool(ks_statistic < ks_critical),
+    }
+
+# Bradford zones: sources ranked by publications and cut into zones holding equal shares of the articles.
+# Returns the zone of every source (0 when it has no articles) and the size of every zone against Bradford's law
+def bradford_zones(counts, n_zones=3):
+    counts = np.asarray(counts, dtype=np.int64)
+    order = np.argsort(-counts, kind='stable')
+    sorted_counts = counts[order]
+    cumulative = np.cumsum(sorted_counts)
+    total = max(int(cumulative[-1]) if len(cumulative) else 0, 1)
+
+    # A source belongs to the zone in which its first article falls
+    zone = np.empty(len(counts), dtype=np.int64)
+    zone[order] = np.where(sorted_counts > 0, np.minimum((cumulative - sorted_counts) * n_zones // total, n_zones - 1) + 1, 0)
+
+    sources = np.bincount(zone, minlength=n_zones + 1)[1:]
+    articles = np.bincount(zone, weights=counts, minlength=n_zones + 1)[1:].astype(int)
+    zones = pd.DataFrame({'sources': sources, 'articles': articles, 'article_share': articles / total * 100},
+                         index=pd.RangeIndex(1, n_zones + 1, name='Zone'))
+
+    # Bradford's law: the number of sources grows geometrically from zone to zone, 1 : k : k^2
+    with np.errstate(divide='ignore', invalid='ignore'):
+        zones['multiplier'] = zones['sources'] / zones['sources'].shift()
+        filled = sources > 0
+        if filled.sum() > 1:
+            slope, intercept = np.polyfit(zones.index[filled], np.log(sources[filled]), 1)
+            zones['expected_sources'] = np.exp(intercept + slope * zones.index.to_numpy())
+        else:
+            zones['expected_sources'] = np.nan
+        zones['error'] = (zones['sources'] - zones['expected_sources']).abs() / zones['sources'] * 100
+    return zone, zones
+
+# Lotka fits and frequency-of-frequencies tables of an entity column for every agriculture split
+def lotka_by_category(data, entity_column='Authors'):
+    counts = entity_publication_counts(data, entity_column)
+    fits = pd.DataFrame.from_dict({category: fit_lotka(counts[category].to_numpy()) for category in CATEGORIES}, orient='index')
+    frequencies = pd.concat(
+        [frequency_of_frequencies(counts[category].to_numpy()).assign(Category=category) for category in CATEGORIES],
+        ignore_index=True,
+    )
+    fits.index.name = 'Category'
+    return fits, frequencies[['Category', 'publications', 'entities', 'share']]
+
+# Bradford zones of a source column for every agriculture split, with the zone of every source
+def bradford_by_category(data, source_column='Source title', n_zones=3):
+    counts = entity_publication_counts(data, source_column)
+    sources = counts.copy()
+    zones = []
+    for category in CATEGORIES:
+        sources[f'{category} zone'], category_zones = bradford_zones(counts[category].to_numpy(), n_zones)
+        zones.append(category_zones.reset_index().assign(Category=category))
+    zones = pd.concat(zones, ignore_index=True)
+    sources = sources.sort_values('General', ascending=False, kind='stable')
+    return zones[['Category', *[column for column in zones.columns if column != 'Category']]], sources
@@ -0,0 +1,97 @@
+import numpy as np
+import pandas as pd
+
+CATEGORIES = ['General', 'Agriculture', 'Non-Agriculture']
+
+# Stack the citations of every (Year, category) group into one flat array, sorted by group
+def _stack_groups(data):
+    data = data.dropna(subset=['Cited by'])
+    frames = [
+        data[['Year', 'Cited by']].assign(Category='General'),
+        data[data['IsAgriculture']][['Year', 'Cited by']].assign(Category='Agriculture'),
+        data[~data['IsAgriculture']][['Year', 'Cited by']].assign(Category='Non-Agriculture'),
+    ]
+    stacked = pd.concat(frames, ignore_index=True)
+    stacked['Category'] = pd.Categorical(stacked['Category'], categories=CATEGORIES)
+    stacked = stacked.sort_values(['Year', 'Category'], kind='stable')
+
+    groups = stacked.groupby(['Year', 'Category'], observed=True).size()
+    values = stacked['Cited by'].to_numpy(dtype=float)
+    return groups.index, groups.to_numpy(), values
+
+# Bootstrap means and medians of one group. A resample of the group is a multinomial draw of counts over its distinct
+# values, so each resample costs one pass over the distinct citation counts rather than a sort of the whole group, and a
+# batch holds at most max_batch_cells counts
+def _resample_group(rng, group_values, n_resamples, max_batch_cells):
+    distinct, counts = np.unique(group_values, return_counts=True)
+    size = int(counts.sum())
+    means = np.empty(n_resamples)
+    medians = np.empty(n_resamples)
+    batch = max(1, min(n_resamples, max_batch_cells // len(distinct)))
+    for start in range(0, n_resamples, batch):
+        stop = min(start + batch, n_resamples)
+        drawn = rng.multinomial(size, counts / size, size=stop - start)
+        means[start:stop] = drawn @ distinct / size
+
+        # The value at a sorted position is the first distinct value whose cumulated count exceeds the position
+        cumulated = np.cumsum(drawn, axis=1)
+        lower = (cumulated <= (size - 1) // 2).sum(axis=1)
+        upper = (cumulated <= size // 2).sum(axis=1)
+        medians[start:stop] = (distinct[lower] + distinct[upper]) / 2
+    return means, medians
+
+# Bootstrap confidence intervals of the mean and median citations per (Year, category)
+def bootstrap_citation_intervals(data, n_resamples=2000, confidence=0.95, random_state=None, max_batch_cells=5_000_000):
+    data = data.copy()
+    data['Cited by'] = pd.to_numeric(data['Cited by'], errors='coerce')
+    index, sizes, values = _stack_groups(data)
+    if len(values) == 0:
+        return pd.DataFrame(columns=['count', 'mean', 'mean_low', 'mean_high', 'median', 'median_low', 'median_high'])
+
+    rng = np.random.default_rng(random_state)
+    offsets = np.concatenate(([0], np.cumsum(sizes)[:-1]))
+    group_ids = np.repeat(np.arange(len(sizes)), sizes)
+
+    # Composite key keeps the groups in place when sorting all the values, so medians are read at fixed positions
+    value_span = values.max() - values.min() + 1
+    group_keys = group_ids * value_span
+    lower_mid = offsets + (sizes - 1) // 2
+    upper_mid = offsets + sizes // 2
+
+    means = np.empty((n_resamples, len(sizes)))
+    medians = np.empty((n_resamples, len(sizes)))
+    for group, (offset, size) in enumerate(zip(offsets, sizes)):
+        means[:, group], medians[:, group] = _resample_group(rng, values[offset:offset + size], n_resamples, max_batch_cells)
+
+    alpha = (1 - confidence) / 2
+    mean_low, mean_high = np.quantile(means, [alpha, 1 - alpha], axis=0)
+    median_low, median_high = np.quantile(medians, [alpha, 1 - alpha], axis=0)
+
+    point_means = np.add.reduceat(values, offsets) / sizes
+    sorted_values = np.sort(values + group_keys) - group_keys
+    point_medians = (sorted_values[lower_mid] + sorted_values[upper_mid]) / 2
+
+    intervals = pd.DataFrame({
+        'count': sizes,
+        'mean': point_means,
+        'mean_low': mean_low,
+        'mean_high': mean_high,
+        'median': point_medians,
+        'median_low': median_low,
+        'median_high': median_high,
+    }, index=index)
+    intervals.index = intervals.index.set_names(['Year', 'Category'])
+    return intervals
+
+# Keep only the local maxima whose lower bound lies above the upper bound of both neighbouring years
+def significant_peaks(estimate, low, high):
+    estimate = np.asarray(estimate, dtype=float)
+    low = np.asarray(low, dtype=float)
+    high = np.asarray(high, dtype=float)
+    if len(estimate) < 3:
+        return np.array([], dtype=int)
+
+    middle = slice(1, -1)
+    is_local_max = (estimate[middle] > estimate[:-2]) & (estimate[middle] > estimate[2:])
+    is_separated = (low[middle] > high[:-2]) & (low[middle] > high[2:])
+    return np.flatnonzero(is_local_max & is_separated) + 1
@@ -0,0 +1,81 @@
+import numpy as np
+import pandas as pd
+
+from .trends import entity_year_matrix
+
+# Cost of observing r relevant documents out of d under rate p (the binomial coefficient is shared by both states)
+def _state_cost(relevant, documents, rate):
+    return -(relevant * np.log(rate) + (documents - relevant) * np.log1p(-rate))
+
+# Two-state Kleinberg burst model, run as one Viterbi pass over every row of a (keyword x year) matrix
+def kleinberg_bursts(relevant, documents, s=2.0, gamma=1.0):
+    relevant = np.asarray(relevant, dtype=float)
+    documents = np.broadcast_to(np.asarray(documents, dtype=float), relevant.shape)
+    n_rows, n_years = relevant.shape
+
+    base_rate = relevant.sum(axis=1) / np.maximum(documents.sum(axis=1), 1)
+    base_rate = np.clip(base_rate, 1e-12, 1 - 1e-12)[:, None]
+    burst_rate = np.minimum(base_rate * s, 1 - 1e-12)
+
+    cost_base = _state_cost(relevant, documents, base_rate)
+    cost_burst = _state_cost(relevant, documents, burst_rate)
+    transition = gamma * np.log(n_years)
+
+    # Forward pass; the loop runs over years only, every keyword is updated at once
+    total_base = cost_base[:, 0].copy()
+    total_burst = cost_burst[:, 0] + transition
+    from_burst_to_base = np.zeros((n_rows, n_years), dtype=bool)
+    from_burst_to_burst = np.zeros((n_rows, n_years), dtype=bool)
+    for t in range(1, n_years):
+        from_burst_to_base[:, t] = total_burst < total_base
+        from_burst_to_burst[:, t] = total_burst < total_base + transition
+        new_base = np.minimum(total_base, total_burst) + cost_base[:, t]
+        new_burst = np.minimum(total_base + transition, total_burst) + cost_burst[:, t]
+        total_base, total_burst = new_base, new_burst
+
+    # Backtrack the optimal state sequence
+    states = np.zeros((n_rows, n_years), dtype=bool)
+    states[:, -1] = total_burst < total_base
+    for t in range(n_years - 1, 0, -1):
+        states[:, t - 1] = np.where(states[:, t], from_burst_to_burst[:, t], from_burst_to_base[:, t])
+
+    # Strength of a burst year is the cost saved by the burst state
+    return states, np.where(states, cost_base - cost_burst, 0.0)
+
+# Collapse burst states into (row, start, end, strength) intervals
+def burst_intervals(states, weights, labels, years):
+    padded = np.pad(states.astype(np.int8), ((0, 0), (1, 1)))
+    edges = np.diff(padded, axis=1)
+    rows, starts = np.nonzero(edges == 1)
+    _, ends = np.nonzero(edges == -1)
+
+    cumulated = np.concatenate([np.zeros((len(weights), 1)), np.cumsum(weights, axis=1)], axis=1)
+    strength = cumulated[rows, ends] - cumulated[rows, starts]
+    return pd.DataFrame({
+        'Keyword': np.asarray(labels)[rows],
+        'start': np.asarray(years)[starts],
+        'end': np.asarray(years)[ends - 1],
+        'strength': strength,
+    })
+
+# Bursting keywords of the whole corpus and of each agriculture split
+def detect_keyword_bursts(data, s=2.0, gamma=1.0, min_publications=5):
+    splits = {
+        'General': data,
+        'Agriculture': data[data['IsAgriculture']],
+        'Non-Agriculture': data[~data['IsAgriculture']],
+    }
+    start_year, end_year = int(data['Year'].min()), int(data['Year'].max())
+
+    results = []
+    for split, split_data in splits.items():
+        keywords, years, counts = entity_year_matrix(split_data, 'Keyword', start_year, end_year)
+        keep = counts.sum(axis=1) >= min_publications
+        documents = np.bincount(split_data['Year'].to_numpy(dtype=np.int64) - start_year, minlength=len(years))
+
+        states, weights = kleinberg_bursts(counts[keep], documents, s, gamma)
+        bursts = burst_intervals(states, weights, keywords[keep], years)
+        results.append(bursts.assign(Category=split))
+
+    bursts = pd.concat(results, ignore_index=True)
+    return bursts[['Category', 'Keyword', 'start', 'end', 'strength']].sort_values('strength', ascending=False, ignore_index=True)
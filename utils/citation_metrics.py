@@ -0,0 +1,110 @@
+import numpy as np
+import pandas as pd
+
+from .citation_percentiles import citation_percentiles
+
+SCOPES = ['total', 'agric', 'non_agric']
+METRICS = ['publications', 'citations', 'h_index', 'g_index', 'i10_index', 'm_quotient', 'normalized_citations', 'top10_share']
+
+# Expand an entity column into one row per (paper, entity)
+def explode_entities(data, entity_column, columns=('Year', 'Cited by', 'IsAgriculture')):
+    expanded_data = data[[entity_column, *columns]].dropna(subset=[entity_column]).copy()
+    if entity_column == 'Authors':
+        expanded_data['Authors'] = expanded_data['Authors'].str.split('; ')
+    expanded_data = expanded_data.explode(entity_column).dropna(subset=[entity_column])
+    return expanded_data.rename(columns={entity_column: 'Entity'})
+
+# Citations divided by the mean citations of papers from the same year and agriculture category
+def field_normalized_citations(data):
+    citations = pd.to_numeric(data['Cited by'], errors='coerce').fillna(0)
+    expected = citations.groupby([data['Year'], data['IsAgriculture']]).transform('mean')
+    return (citations / expected.replace(0, np.nan)).fillna(0)
+
+# Compute every metric for every entity of one column in a single sorted pass
+def compute_citation_metrics(data, entity_column, current_year=None):
+    if current_year is None:
+        current_year = int(data['Year'].max())
+
+    data = data.assign(**{'Cited by': pd.to_numeric(data['Cited by'], errors='coerce').fillna(0)})
+    data = data.assign(NormalizedCitations=field_normalized_citations(data), Top10=citation_percentiles(data)['Top10'])
+    expanded_data = explode_entities(data, entity_column, columns=('Year', 'Cited by', 'IsAgriculture', 'NormalizedCitations', 'Top10'))
+    return entity_metrics_table(expanded_data, entity_column, current_year)
+
+# Metrics of every entity from its (paper, entity) rows, which carry the normalized citations and top 10% flag of the paper
+def entity_metrics_table(expanded_data, entity_column, current_year):
+    entity_codes, entities = pd.factorize(expanded_data['Entity'], sort=True)
+    n_entities = len(entities)
+    is_agri = expanded_data['IsAgriculture'].to_numpy(dtype=bool)
+
+    # Stack the total scope with the agriculture split so that one sort covers all three scopes
+    scope_codes = np.concatenate([np.zeros(len(entity_codes), dtype=np.int64), np.where(is_agri, 1, 2)])
+    group_codes = scope_codes * n_entities + np.concatenate([entity_codes, entity_codes])
+    citations = np.tile(expanded_data['Cited by'].to_numpy(dtype=float), 2)
+    normalized = np.tile(expanded_data['NormalizedCitations'].to_numpy(dtype=float), 2)
+    top10 = np.tile(expanded_data['Top10'].to_numpy(dtype=float), 2)
+    years = np.tile(expanded_data['Year'].to_numpy(dtype=np.int64), 2)
+
+    # Sort by group, then by citations in descending order; ties are ordered by normalized citations so that the sums
+    # below do not depend on the order of the rows (the sharded mode rebuilds these rows from counters)
+    order = np.lexsort((normalized, -citations, group_codes))
+    group_codes = group_codes[order]
+    citations = citations[order]
+
+    n_groups = len(SCOPES) * n_entities
+    sizes = np.bincount(group_codes, minlength=n_groups)
+    starts = np.concatenate(([0], np.cumsum(sizes)[:-1]))
+    rank = np.arange(len(group_codes)) - starts[group_codes] + 1
+
+    # The rank-th most cited paper of a group has at least rank citations exactly for ranks up to h
+    h_index = np.bincount(group_codes, weights=citations >= rank, minlength=n_groups)
+
+    # g is the largest rank whose cumulated citations reach rank squared
+    cumulated = np.cumsum(citations)
+    cumulated -= np.concatenate(([0], cumulated))[starts][group_codes]
+    g_index = np.bincount(group_codes, weights=cumulated >= rank ** 2, minlength=n_groups)
+
+    i10_index = np.bincount(group_codes, weights=citations >= 10, minlength=n_groups)
+    total_citations = np.bincount(group_codes, weights=citations, minlength=n_groups)
+    normalized_sums = np.bincount(group_codes, weights=normalized[order], minlength=n_groups)
+    top10_papers = np.bincount(group_codes, weights=top10[order], minlength=n_groups)
+
+    first_year = np.full(n_groups, current_year, dtype=np.int64)
+    np.minimum.at(first_year, group_codes, years[order])
+    career_years = current_year - first_year + 1
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        m_quotient = np.where(sizes > 0, h_index / career_years, 0)
+        normalized_citations = np.where(sizes > 0, normalized_sums / sizes, 0)
+        top10_share = np.where(sizes > 0, top10_papers / sizes * 100, 0)
+
+    metrics = {
+        'publications': sizes,
+        'citations': total_citations,
+        'h_index': h_index.astype(int),
+        'g_index': g_index.astype(int),
+        'i10_index': i10_index.astype(int),
+        'm_quotient': m_quotient,
+        'normalized_citations': normalized_citations,
+        'top10_share': top10_share,
+    }
+
+    # One row per entity, one column per (scope, metric); publications keep the plain scope name
+    table = pd.DataFrame(index=pd.Index(entities, name=entity_column))
+    for scope_index, scope in enumerate(SCOPES):
+        scope_slice = slice(scope_index * n_entities, (scope_index + 1) * n_entities)
+        for metric in METRICS:
+            column = scope if metric == 'publications' else f"{scope}_{metric}"
+            table[column] = metrics[metric][scope_slice]
+    return table.sort_values('total', ascending=False, kind='stable')
+
+# Share of the papers of every entity that are in the top 10% most cited of their year and agriculture category. An
+# existing Top10 column is kept, so that papers flagged before rows were dropped keep the flags of the whole dataset
+def top10_shares(data, entity_column):
+    if 'Top10' not in data:
+        data = data.assign(Top10=citation_percentiles(data)['Top10'])
+    expanded_data = explode_entities(data, entity_column, columns=('Top10',))
+    return (expanded_data.groupby('Entity')['Top10'].mean() * 100).rename_axis(entity_column).rename('top10_share')
+
+# Convert the first rows of a metrics table to the {entity: {column: value}} layout used by the plotting functions
+def top_entities(metrics_table, top_n=10):
+    return metrics_table.head(top_n).to_dict(orient='index')
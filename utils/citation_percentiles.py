@@ -0,0 +1,54 @@
+import numpy as np
+import pandas as pd
+
+GROUPS = ['Year', 'IsAgriculture']
+
+# Sort every paper by (group, citations) in one lexsort, with the group of every position and where each group starts
+def _sorted_groups(data, group_columns=GROUPS):
+    citations = pd.to_numeric(data['Cited by'], errors='coerce').fillna(0).to_numpy(dtype=float)
+    group_codes, groups = pd.MultiIndex.from_frame(data[list(group_columns)]).factorize()
+    groups = pd.MultiIndex.from_tuples(groups, names=list(group_columns))
+
+    order = np.lexsort((citations, group_codes))
+    sizes = np.bincount(group_codes, minlength=len(groups))
+    starts = np.concatenate(([0], np.cumsum(sizes)[:-1]))
+    return citations, group_codes, groups, order, sizes, starts
+
+# Percentile rank of every paper within its (Year, IsAgriculture) group, with the top 10% and top 1% flags.
+# Ties share the mid-rank, so uncited papers never reach a top class
+def citation_percentiles(data, group_columns=GROUPS):
+    citations, group_codes, _, order, sizes, starts = _sorted_groups(data, group_columns)
+    sorted_codes, sorted_citations = group_codes[order], citations[order]
+
+    # Runs of equal (group, citations); papers in a run are cited less than the run's end and more than its start
+    new_run = np.concatenate(([True], (sorted_codes[1:] != sorted_codes[:-1]) | (sorted_citations[1:] != sorted_citations[:-1])))
+    run_ids = np.cumsum(new_run) - 1
+    run_starts = np.flatnonzero(new_run)
+    run_ends = np.concatenate((run_starts[1:], [len(order)]))
+
+    below = run_starts[run_ids] - starts[sorted_codes]
+    ties = (run_ends - run_starts)[run_ids]
+    percentile = np.empty(len(order))
+    percentile[order] = (below + ties / 2) / sizes[sorted_codes] * 100
+
+    thresholds = _thresholds(sorted_citations, sizes, starts)
+    top10 = thresholds['top10_threshold'][group_codes]
+    top1 = thresholds['top1_threshold'][group_codes]
+    return pd.DataFrame({
+        'CitationPercentile': percentile,
+        'Top10': (citations >= top10) & (citations > 0),
+        'Top1': (citations >= top1) & (citations > 0),
+    }, index=data.index)
+
+# Citations of the k-th most cited paper of every group, k being the top share of the group size (at least one paper)
+def _thresholds(sorted_citations, sizes, starts):
+    thresholds = {}
+    for name, share in {'top10_threshold': 0.1, 'top1_threshold': 0.01}.items():
+        positions = starts + sizes - np.maximum(np.floor(share * sizes).astype(np.int64), 1)
+        thresholds[name] = sorted_citations[np.minimum(positions, len(sorted_citations) - 1)] if len(sorted_citations) else np.zeros(len(sizes))
+    return thresholds
+
+# Citation count needed to enter the top 10% and the top 1% of every (Year, IsAgriculture) group
+def percentile_thresholds(data, group_columns=GROUPS):
+    citations, _, groups, order, sizes, starts = _sorted_groups(data, group_columns)
+    return pd.DataFrame({'papers': sizes, **_thresholds(citations[order], sizes, starts)}, index=groups).sort_index()
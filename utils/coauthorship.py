@@ -0,0 +1,195 @@
+import os
+from contextlib import nullcontext
+from multiprocessing import Pool
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from .citation_metrics import SCOPES, explode_entities
+
+# Binary paper x author incidence matrix in CSR format, from the '; ' separated author lists
+def paper_author_matrix(data):
+    expanded_data = explode_entities(data.reset_index(drop=True), 'Authors', columns=())
+    paper_codes = expanded_data.index.to_numpy()
+    author_codes, authors = pd.factorize(expanded_data['Entity'], sort=True)
+    incidence = sparse.csr_matrix(
+        (np.ones(len(paper_codes)), (paper_codes, author_codes)),
+        shape=(len(data), len(authors)),
+    )
+    incidence.data[:] = 1  # An author listed twice on a paper still counts once
+    return incidence, pd.Index(authors, name='Authors')
+
+# Papers co-authored by every pair of authors, counted separately for every number of authors of the paper.
+# The counts are exact integers, so that the counts of several parts of the corpus simply add up
+def coauthorship_counts(incidence):
+    n_authors = np.diff(incidence.indptr)
+    counts = {}
+    for size in np.unique(n_authors[n_authors > 1]):
+        team = incidence[n_authors == size]
+        counts[int(size)] = (team.T @ team).tocsr()
+    return counts
+
+# Weighted author x author graph: each paper adds 1 / (authors - 1) to every pair of its co-authors (Newman's weighting),
+# so that every author of a multi-author paper gets one unit of collaboration strength from it. Every pair sums its
+# weights by increasing number of authors, so the graph does not depend on how the counts were gathered
+def weighted_graph(counts, n_authors):
+    if not counts:
+        return sparse.csr_matrix((n_authors, n_authors))
+    matrices = {size: matrix.tocoo() for size, matrix in counts.items()}
+    rows = np.concatenate([matrix.row for matrix in matrices.values()]).astype(np.int64)
+    columns = np.concatenate([matrix.col for matrix in matrices.values()]).astype(np.int64)
+    weights = np.concatenate([matrix.data / (size - 1) for size, matrix in matrices.items()])
+    sizes = np.concatenate([np.full(matrix.nnz, size) for size, matrix in matrices.items()])
+
+    order = np.lexsort((sizes, columns, rows))
+    rows, columns, weights = rows[order], columns[order], weights[order]
+    first = np.flatnonzero(np.concatenate(([True], (rows[1:] != rows[:-1]) | (columns[1:] != columns[:-1]))))
+    graph = sparse.csr_matrix((np.add.reduceat(weights, first), (rows[first], columns[first])), shape=(n_authors, n_authors))
+    graph.setdiag(0)
+    graph.eliminate_zeros()
+    return graph
+
+# Co-authorship graph of the papers of an incidence matrix
+def coauthorship_graph(incidence):
+    return weighted_graph(coauthorship_counts(incidence), incidence.shape[1])
+
+# Weighted PageRank by power iteration; the rank of authors without co-authors is spread uniformly
+def pagerank(graph, damping=0.85, tol=1e-10, max_iter=200):
+    n = graph.shape[0]
+    if n == 0:
+        return np.empty(0)
+    strength = np.asarray(graph.sum(axis=1)).ravel()
+    dangling = strength == 0
+    transition = (sparse.diags(np.where(dangling, 0, 1 / np.where(dangling, 1, strength))) @ graph).T.tocsr()
+
+    rank = np.full(n, 1 / n)
+    for _ in range(max_iter):
+        updated = damping * (transition @ rank + rank[dangling].sum() / n) + (1 - damping) / n
+        converged = np.abs(updated - rank).sum() < tol
+        rank = updated
+        if converged:
+            break
+    return rank
+
+# Brandes dependencies of every node on the shortest paths from one source, with a level-synchronous BFS
+# where every level is expanded with array operations over the CSR neighbour lists
+def _source_dependencies(indptr, indices, source):
+    n = len(indptr) - 1
+    distance = np.full(n, -1, dtype=np.int64)
+    distance[source] = 0
+    sigma = np.zeros(n)
+    sigma[source] = 1
+    frontier = np.array([source])
+    levels = []
+
+    depth = 0
+    while len(frontier):
+        starts = indptr[frontier]
+        counts = indptr[frontier + 1] - starts
+        edge_sources = np.repeat(frontier, counts)
+        offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts) + np.repeat(starts, counts)
+        edge_targets = indices[offsets]
+
+        # The next frontier, deduplicated with a mask rather than a sort
+        reached = np.zeros(n, dtype=bool)
+        reached[edge_targets[distance[edge_targets] == -1]] = True
+        frontier = np.flatnonzero(reached)
+        distance[frontier] = depth + 1
+        # Edges to the next level carry the shortest-path counts forward
+        on_path = distance[edge_targets] == depth + 1
+        edge_sources, edge_targets = edge_sources[on_path], edge_targets[on_path]
+        sigma += np.bincount(edge_targets, weights=sigma[edge_sources], minlength=n)
+        levels.append((edge_sources, edge_targets))
+        depth += 1
+
+    delta = np.zeros(n)
+    for edge_sources, edge_targets in reversed(levels):
+        delta += np.bincount(edge_sources, weights=sigma[edge_sources] / sigma[edge_targets] * (1 + delta[edge_targets]), minlength=n)
+    delta[source] = 0
+    return delta
+
+# Sampled sources times edges of a betweenness estimate below which it runs in the calling process: starting and
+# feeding worker processes takes longer than the few BFS of a small graph
+MIN_PARALLEL_WORK = 5_000_000
+
+def _sum_dependencies(task):
+    indptr, indices, sources = task
+    total = np.zeros(len(indptr) - 1)
+    for source in sources:
+        total += _source_dependencies(indptr, indices, source)
+    return total
+
+# Whether the betweenness of a graph is worth sharing among worker processes
+def _needs_pool(graph, n_samples, workers):
+    return workers > 1 and min(n_samples, graph.shape[0]) * graph.nnz >= MIN_PARALLEL_WORK
+
+# Betweenness estimated from the shortest paths of n_samples random sources, normalized to [0, 1] like the exact
+# undirected betweenness; the sources of a large graph are shared among worker processes, those of pool when given
+def sampled_betweenness(graph, n_samples=128, workers=None, random_state=0, pool=None):
+    n = graph.shape[0]
+    if n < 3:
+        return np.zeros(n)
+    rng = np.random.default_rng(random_state)
+    sources = rng.choice(n, min(n_samples, n), replace=False)
+    workers = min(workers or os.cpu_count() or 1, len(sources))
+
+    if _needs_pool(graph, n_samples, workers):
+        tasks = [(graph.indptr, graph.indices, chunk) for chunk in np.array_split(sources, workers)]
+        if pool is not None:
+            dependencies = sum(pool.map(_sum_dependencies, tasks))
+        else:
+            with Pool(workers) as pool:
+                dependencies = sum(pool.map(_sum_dependencies, tasks))
+    else:
+        dependencies = _sum_dependencies((graph.indptr, graph.indices, sources))
+
+    # Each undirected path is seen from both ends, hence the division by two before scaling the sample to n sources
+    betweenness = dependencies * n / len(sources) / 2
+    return betweenness / ((n - 1) * (n - 2) / 2)
+
+# Degree, collaboration strength, PageRank and sampled betweenness of one co-authorship graph
+def graph_centrality(graph, n_samples=128, workers=None, random_state=0, pool=None):
+    return pd.DataFrame({
+        'degree': np.diff(graph.indptr),
+        'strength': np.asarray(graph.sum(axis=1)).ravel(),
+        'pagerank': pagerank(graph),
+        'betweenness': sampled_betweenness(graph, n_samples, workers, random_state, pool),
+    })
+
+# Co-authorship counts of the whole corpus and of each agriculture split, each over the authors with papers in it
+def coauthorship_split_counts(data, scopes=SCOPES):
+    incidence, authors = paper_author_matrix(data)
+    is_agri = data['IsAgriculture'].to_numpy(dtype=bool)
+    splits = {'total': np.ones(len(data), dtype=bool), 'agric': is_agri, 'non_agric': ~is_agri}
+
+    split_counts = {}
+    for scope in scopes:
+        split_incidence = incidence[splits[scope]]
+        active = np.flatnonzero(np.diff(split_incidence.tocsc().indptr) > 0)
+        split_counts[scope] = (authors[active], coauthorship_counts(split_incidence[:, active]))
+    return authors, split_counts
+
+# Co-authorship graph of the whole corpus and of each agriculture split, each over the authors with papers in it
+def coauthorship_graphs(data, scopes=SCOPES):
+    authors, split_counts = coauthorship_split_counts(data, scopes)
+    return authors, {scope: (scope_authors, weighted_graph(counts, len(scope_authors))) for scope, (scope_authors, counts) in split_counts.items()}
+
+# Centrality of every author in the graph of every scope; authors missing from a graph get no centrality in it.
+# One pool of workers serves the betweenness of every scope, and is only started when a graph is large enough
+def centrality_by_scope(authors, graphs, n_samples=128, workers=None, random_state=0):
+    workers = workers or os.cpu_count() or 1
+    parallel = any(_needs_pool(graph, n_samples, workers) for _, graph in graphs.values())
+    tables = []
+    with (Pool(workers) if parallel else nullcontext()) as pool:
+        for scope, (scope_authors, graph) in graphs.items():
+            centrality = graph_centrality(graph, n_samples, workers, random_state, pool)
+            centrality.index = scope_authors
+            tables.append(centrality.add_prefix(f'{scope}_'))
+    return pd.concat(tables, axis=1).reindex(authors)
+
+# Centrality of every author in the co-authorship graphs of the whole corpus and of each agriculture split.
+# Each split graph only holds the authors of that split; the others get no centrality in it
+def coauthorship_centrality(data, n_samples=128, workers=None, random_state=0):
+    authors, graphs = coauthorship_graphs(data)
+    return centrality_by_scope(authors, graphs, n_samples, workers, random_state)
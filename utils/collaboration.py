@@ -0,0 +1,95 @@
+import json
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+# Binary paper x country incidence matrix in CSR format, from the per-paper country lists
+def paper_country_matrix(data, country_column='Country'):
+    expanded_data = data[country_column].reset_index(drop=True).explode().dropna()
+    paper_codes = expanded_data.index.to_numpy()
+    country_codes, countries = pd.factorize(expanded_data, sort=True)
+    incidence = sparse.csr_matrix(
+        (np.ones(len(paper_codes)), (paper_codes, country_codes)),
+        shape=(len(data), len(countries)),
+    )
+    incidence.data[:] = 1  # A country listed twice for a paper still counts once
+    return incidence, pd.Index(countries, name='Country')
+
+# Country x country co-publication counts; with fractional counting each country of a paper spreads one unit over its partners
+def collaboration_matrix(incidence, fractional=False):
+    n_countries = np.diff(incidence.indptr)
+    if fractional:
+        weights = np.where(n_countries > 1, 1 / np.maximum(n_countries - 1, 1), 0.0)
+    else:
+        weights = np.ones(incidence.shape[0])
+
+    collaborations = (incidence.T @ sparse.diags(weights) @ incidence).tocsr()
+    collaborations.setdiag(0)
+    collaborations.eliminate_zeros()
+    occurrences = np.asarray(incidence.sum(axis=0)).ravel()
+    return collaborations, occurrences
+
+# Each country pair once, with its co-publications and Salton / Jaccard normalizations on full counts
+def collaboration_pairs(incidence, countries, fractional=False):
+    full, occurrences = collaboration_matrix(incidence)
+    full = sparse.triu(full, k=1).tocsr().tocoo()
+    source, target = occurrences[full.row], occurrences[full.col]
+
+    pairs = pd.DataFrame({
+        'source': countries[full.row],
+        'target': countries[full.col],
+        'copublications': full.data.astype(int),
+        'salton': full.data / np.sqrt(source * target),
+        'jaccard': full.data / (source + target - full.data),
+    })
+    if fractional:
+        # Fractional weights share the sparsity pattern of the full counts, hence the same entry order
+        pairs['fractional'] = sparse.triu(collaboration_matrix(incidence, fractional=True)[0], k=1).tocsr().tocoo().data
+    return pairs.sort_values('copublications', ascending=False, ignore_index=True)
+
+# Share of papers written with at least two countries, overall and per country, for one set of papers
+def international_rates(incidence, countries):
+    international = np.diff(incidence.indptr) > 1
+    publications = np.asarray(incidence.sum(axis=0)).ravel()
+    international_publications = np.asarray(incidence[international].sum(axis=0)).ravel()
+    per_country = pd.DataFrame({
+        'publications': publications.astype(int),
+        'international': international_publications.astype(int),
+        'international_rate': international_publications / np.maximum(publications, 1) * 100,
+    }, index=countries)
+    with_countries = np.diff(incidence.indptr) > 0
+    overall = international.sum() / max(with_countries.sum(), 1) * 100
+    return overall, per_country.sort_values('publications', ascending=False)
+
+# Collaboration pairs and international rates per year and agriculture split, from one incidence matrix
+def collaboration_by_year(data, fractional=False):
+    incidence, countries = paper_country_matrix(data)
+    splits = {
+        'General': np.ones(len(data), dtype=bool),
+        'Agriculture': data['IsAgriculture'].to_numpy(dtype=bool),
+        'Non-Agriculture': ~data['IsAgriculture'].to_numpy(dtype=bool),
+    }
+    years = data['Year'].to_numpy()
+
+    pairs, rates = [], []
+    for split, in_split in splits.items():
+        for year in np.unique(years[in_split]):
+            rows = incidence[in_split & (years == year)]
+            pairs.append(collaboration_pairs(rows, countries, fractional).assign(Category=split, Year=year))
+            overall, _ = international_rates(rows, countries)
+            rates.append({'Category': split, 'Year': year, 'papers': rows.shape[0], 'international_rate': overall})
+
+    pairs = pd.concat(pairs, ignore_index=True)
+    leading = ['Category', 'Year']
+    return pairs[leading + [column for column in pairs.columns if column not in leading]], pd.DataFrame(rates)
+
+# Square matrix of the top collaborating countries, in the {names, matrix} layout of chord diagram libraries
+def export_chord_data(incidence, countries, output_file, top_n=20, fractional=False):
+    collaborations, _ = collaboration_matrix(incidence, fractional)
+    strength = np.asarray(collaborations.sum(axis=1)).ravel()
+    top = np.argsort(-strength, kind='stable')[:top_n]
+    matrix = collaborations[top][:, top].toarray()
+    with open(output_file, 'w') as file:
+        json.dump({'names': list(countries[top]), 'matrix': matrix.round(4).tolist()}, file)
+    return pd.DataFrame(matrix, index=countries[top], columns=countries[top])
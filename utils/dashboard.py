@@ -0,0 +1,159 @@
+import json
+from collections import Counter
+from itertools import combinations
+
+import pandas as pd
+
+from .citation_metrics import compute_citation_metrics
+from .extract_countries import extract_countries
+
+# Round floats and convert numpy scalars so that the embedded JSON stays compact
+def _compact(values, digits=2):
+    return [round(float(value), digits) if isinstance(value, float) else int(value) for value in values]
+
+def _volume_panel(data):
+    counts = data.groupby(['Year', 'IsAgriculture']).size().unstack(fill_value=0).reindex(columns=[False, True], fill_value=0)
+    return {
+        'years': _compact(counts.index),
+        'total': _compact(counts.sum(axis=1)),
+        'agric': _compact(counts[True]),
+        'non_agric': _compact(counts[False]),
+    }
+
+def _citations_panel(data):
+    cited = data.dropna(subset=['Cited by'])
+    means = cited.groupby(['Year', 'IsAgriculture'])['Cited by'].mean().unstack().reindex(columns=[False, True])
+    general = cited.groupby('Year')['Cited by'].mean().reindex(means.index)
+    return {
+        'years': _compact(means.index),
+        'total': _compact(general.fillna(0)),
+        'agric': _compact(means[True].fillna(0)),
+        'non_agric': _compact(means[False].fillna(0)),
+    }
+
+def _top_entities_panel(metrics_table, top_n):
+    top = metrics_table.head(top_n)
+    return {
+        'names': [str(name) for name in top.index],
+        'total': _compact(top['total']),
+        'agric': _compact(top['agric']),
+        'non_agric': _compact(top['non_agric']),
+        'h_index': _compact(top['total_h_index']),
+        'citations': _compact(top['total_citations']),
+    }
+
+def _collaboration_panel(countries, top_n):
+    pair_counts = Counter()
+    for paper_countries in countries:
+        pair_counts.update(combinations(sorted(set(paper_countries)), 2))
+
+    country_counts = Counter(country for paper_countries in countries for country in set(paper_countries))
+    top_countries = [country for country, _ in country_counts.most_common(top_n)]
+    position = {country: i for i, country in enumerate(top_countries)}
+
+    matrix = [[0] * len(top_countries) for _ in top_countries]
+    for (first, second), count in pair_counts.items():
+        if first in position and second in position:
+            matrix[position[first]][position[second]] = count
+            matrix[position[second]][position[first]] = count
+    return {'names': top_countries, 'matrix': matrix}
+
+# Pre-aggregate every dashboard panel; only these small tables end up in the HTML file
+def build_dashboard_panels(data, top_n=15):
+    data = data.copy()
+    data['Cited by'] = pd.to_numeric(data['Cited by'], errors='coerce')
+    if 'Country' not in data.columns:
+        data['Country'] = data['Affiliations'].apply(extract_countries)
+    countries = data['Country'].dropna()
+
+    return {
+        'volume': _volume_panel(data),
+        'citations': _citations_panel(data),
+        'authors': _top_entities_panel(compute_citation_metrics(data, 'Authors'), top_n),
+        'sources': _top_entities_panel(compute_citation_metrics(data, 'Source title'), top_n),
+        'countries': _top_entities_panel(compute_citation_metrics(data.dropna(subset=['Country']), 'Country'), top_n),
+        'collaboration': _collaboration_panel(countries, top_n),
+    }
+
+PANEL_TITLES = {
+    'volume': 'Volume of Publications per Year',
+    'citations': 'Average Citations per Year',
+    'authors': 'Top Authors: Publications and H-index',
+    'sources': 'Top Journals: Publications and H-index',
+    'countries': 'Top Countries: Publications and H-index',
+    'collaboration': 'Country Collaboration',
+}
+
+# Each panel is rendered from its JSON block only when it scrolls into view
+DASHBOARD_SCRIPT = """
+const COLORS = {total: '%(general)s', agric: '%(agriculture)s', non_agric: '%(non_agriculture)s'};
+const LABELS = {total: 'Total', agric: 'Agriculture', non_agric: 'Non-Agriculture'};
+const SERIES = ['total', 'agric', 'non_agric'];
+
+function lines(panel, yTitle) {
+  return [SERIES.map(s => ({x: panel.years, y: panel[s], name: LABELS[s], mode: 'lines+markers', line: {color: COLORS[s]}})),
+          {xaxis: {title: 'Year'}, yaxis: {title: yTitle}}];
+}
+function bars(panel) {
+  const traces = SERIES.map(s => ({x: panel.names, y: panel[s], name: LABELS[s], type: 'bar', marker: {color: COLORS[s]}}));
+  traces.push({x: panel.names, y: panel.h_index, name: 'H-index', mode: 'markers', marker: {color: 'black', symbol: 'line-ew-open', size: 14}});
+  return [traces, {barmode: 'group', xaxis: {tickangle: -45, automargin: true}, yaxis: {title: 'Count'}}];
+}
+const RENDERERS = {
+  volume: p => lines(p, 'Number of Publications'),
+  citations: p => lines(p, 'Average Citations'),
+  authors: bars, sources: bars, countries: bars,
+  collaboration: p => [[{z: p.matrix, x: p.names, y: p.names, type: 'heatmap', colorscale: 'Blues'}],
+                       {xaxis: {automargin: true}, yaxis: {automargin: true}}],
+};
+
+const observer = new IntersectionObserver(entries => entries.forEach(entry => {
+  if (!entry.isIntersecting) return;
+  const element = entry.target;
+  observer.unobserve(element);
+  const panel = JSON.parse(document.getElementById('data-' + element.dataset.panel).textContent);
+  const [traces, layout] = RENDERERS[element.dataset.panel](panel);
+  layout.title = element.dataset.title;
+  Plotly.newPlot(element, traces, layout, {responsive: true});
+}), {rootMargin: '200px'});
+document.querySelectorAll('.panel').forEach(element => observer.observe(element));
+"""
+
+# Write a self-contained offline HTML dashboard from the pre-aggregated panels
+def export_dashboard(data, output_file, top_n=15, title='Scopus Bibliometric Dashboard'):
+    from plotly.offline import get_plotlyjs
+    from .enums import Color
+
+    panels = build_dashboard_panels(data, top_n)
+    script = DASHBOARD_SCRIPT % {
+        'general': Color.GENERAL.value,
+        'agriculture': Color.AGRICULTURE.value,
+        'non_agriculture': Color.NON_AGRICULTURE.value,
+    }
+
+    sections = []
+    for name, panel in panels.items():
+        # Escape "</" so that names from the dataset can never close the script block
+        payload = json.dumps(panel, separators=(',', ':')).replace('</', '<\\/')
+        sections.append(f'<script type="application/json" id="data-{name}">{payload}</script>')
+        sections.append(f'<div class="panel" data-panel="{name}" data-title="{PANEL_TITLES[name]}"></div>')
+
+    html = f"""<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>{title}</title>
+<style>body {{font-family: sans-serif; margin: 2em;}} .panel {{height: 600px; margin-bottom: 2em;}}</style>
+<script>{get_plotlyjs()}</script>
+</head>
+<body>
+<h1>{title}</h1>
+{chr(10).join(sections)}
+<script>{script}</script>
+</body>
+</html>
+"""
+    with open(output_file, 'w', encoding='utf-8') as f:
+        f.write(html)
+    print(f"Dashboard written to {output_file}")
+    return panels
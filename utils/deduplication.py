@@ -0,0 +1,117 @@
+import re
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from scipy.sparse.csgraph import connected_components
+
+# Word shingles of the normalized Title + Abstract, as 32-bit hashes sorted by document
+def shingle_hashes(data, shingle_size=3):
+    # Tokenize the whole corpus with a single regex pass; a newline separates consecutive documents
+    text = (data['Title'].fillna('') + ' ' + data['Abstract'].fillna('')).str.replace('\n', ' ')
+    tokens = np.array(re.findall(r'[a-z0-9]+|\n', '\n'.join(text).lower() + '\n'), dtype=object)
+    is_separator = tokens == '\n'
+    documents = np.cumsum(is_separator)[~is_separator]
+    token_ids = pd.factorize(tokens[~is_separator])[0].astype(np.uint64)
+
+    # Combine each token with the next shingle_size - 1 tokens of the same document
+    shingles = token_ids.copy()
+    valid = np.ones(len(token_ids), dtype=bool)
+    for offset in range(1, shingle_size):
+        shifted = np.concatenate([token_ids[offset:], np.zeros(offset, dtype=np.uint64)])
+        same_document = np.concatenate([documents[offset:] == documents[:-offset], np.zeros(offset, dtype=bool)])
+        # Tokens of the next document are left out, so that a short document's shingle only depends on its own tokens
+        shingles = shingles * np.uint64(1_000_003) + np.where(same_document, shifted, np.uint64(0))
+        valid &= same_document
+
+    # Short documents keep their single shingle made of all their tokens
+    first_of_document = np.concatenate([[True], documents[1:] != documents[:-1]])
+    has_valid = np.bincount(documents[valid], minlength=len(data)) > 0
+    valid |= first_of_document & ~has_valid[documents]
+
+    shingles = (shingles[valid] & np.uint64(0xFFFFFFFF))
+    return documents[valid], shingles
+
+# SplitMix64 finalizer, applied element-wise to a uint64 array
+def _mix64(values):
+    z = values + np.uint64(0x9E3779B97F4A7C15)
+    z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return z ^ (z >> np.uint64(31))
+
+# MinHash signatures with one-permutation hashing: each shingle is hashed once, its hash picks a bin and
+# the signature keeps the minimum per (document, bin); empty bins are filled by rotation densification
+def minhash_signatures(documents, shingles, n_documents, num_perm=128, random_state=0):
+    hashed = _mix64(shingles ^ np.uint64(random_state))
+    bins = (hashed % np.uint64(num_perm)).astype(np.int64)
+    values = (hashed >> np.uint64(32)).astype(np.uint32)
+
+    empty = np.iinfo(np.uint32).max
+    signatures = np.full(n_documents * num_perm, empty, dtype=np.uint32)
+    np.minimum.at(signatures, documents * num_perm + bins, values)
+    signatures = signatures.reshape(n_documents, num_perm)
+
+    # Each empty bin borrows the next non-empty bin to its right (circularly), shifted by the distance
+    filled = np.tile(signatures != empty, 2)
+    positions = np.where(filled, np.arange(2 * num_perm), 2 * num_perm)
+    next_filled = np.minimum.accumulate(positions[:, ::-1], axis=1)[:, ::-1][:, :num_perm]
+    has_shingles = filled.any(axis=1)
+    next_filled[~has_shingles] = np.arange(num_perm)
+
+    distance = (next_filled - np.arange(num_perm)).astype(np.uint32)
+    borrowed = np.take_along_axis(signatures, next_filled % num_perm, axis=1)
+    return np.where(signatures == empty, borrowed + distance * np.uint32(0x9E3779B1), signatures)
+
+# Candidate pairs: documents sharing every row of at least one band. Every bucket is kept, however large: linking its
+# members to its first document is linear, and a large group of copies is the case most worth collapsing
+def lsh_candidate_pairs(signatures, bands=32):
+    n_documents, num_perm = signatures.shape
+    rows = num_perm // bands
+    pairs = []
+    for band in range(bands):
+        band_keys = np.ascontiguousarray(signatures[:, band * rows:(band + 1) * rows]).view(np.dtype((np.void, signatures.itemsize * rows))).ravel()
+        _, bucket, sizes = np.unique(band_keys, return_inverse=True, return_counts=True)
+        members = np.flatnonzero(sizes[bucket] > 1)
+        if len(members) == 0:
+            continue
+
+        # Link each member to the first document of its bucket; connected components recover the full groups
+        member_buckets = bucket[members]
+        order = np.argsort(member_buckets, kind='stable')
+        members, member_buckets = members[order], member_buckets[order]
+        heads = np.concatenate([[True], member_buckets[1:] != member_buckets[:-1]])
+        head_of = members[heads][np.cumsum(heads) - 1]
+        pairs.append(head_of[~heads].astype(np.int64) * n_documents + members[~heads])
+
+    # Pairs are deduplicated as single integer keys, much faster than unique rows
+    keys = np.unique(np.concatenate(pairs)) if pairs else np.empty(0, dtype=np.int64)
+    return np.column_stack([keys // n_documents, keys % n_documents])
+
+# Near-duplicate clusters; every paper gets a cluster id and singletons are their own cluster
+def find_near_duplicates(data, threshold=0.8, shingle_size=3, num_perm=128, bands=32, random_state=0):
+    documents, shingles = shingle_hashes(data, shingle_size)
+    signatures = minhash_signatures(documents, shingles, len(data), num_perm, random_state)
+    pairs = lsh_candidate_pairs(signatures, bands)
+
+    # Papers without title nor abstract share the same empty signature and are never duplicates
+    has_text = np.bincount(documents, minlength=len(data)) > 0
+    pairs = pairs[has_text[pairs[:, 0]] & has_text[pairs[:, 1]]]
+
+    # Keep the candidates whose estimated Jaccard similarity reaches the threshold
+    similarity = (signatures[pairs[:, 0]] == signatures[pairs[:, 1]]).mean(axis=1) if len(pairs) else np.empty(0)
+    pairs = pairs[similarity >= threshold]
+
+    graph = sparse.coo_matrix((np.ones(len(pairs)), (pairs[:, 0], pairs[:, 1])), shape=(len(data), len(data)))
+    _, clusters = connected_components(graph, directed=False)
+    clusters = pd.Series(clusters, index=data.index, name='DuplicateCluster')
+
+    sizes = clusters.map(clusters.value_counts())
+    print(f"Near-duplicates: {int((sizes > 1).sum())} papers in {clusters[sizes > 1].nunique()} clusters")
+    return clusters
+
+# Keep one paper per cluster: the most cited version, and the first one on ties
+def collapse_duplicates(data, clusters):
+    cited = pd.to_numeric(data['Cited by'], errors='coerce').fillna(-1)
+    order = cited.sort_values(ascending=False, kind='stable').index
+    keep = ~clusters.loc[order].duplicated()
+    return data.loc[order[keep.to_numpy()]].sort_index()
@@ -1,46 +1,102 @@
+import os
+
 import pandas as pd
 
-def get_cleaned_dataframe_from_csv(csv_file_path, start_year=2012):
-    # Load the dataset
-    data = pd.read_csv(csv_file_path)
+# Define agriculture-related keywords; a tuple, so that a custom list is always passed explicitly rather than patched in
+AGRICULTURE_KEYWORDS = (
+    "agriculture", "farming", "agritech", "precision agriculture", "smart agriculture",
+    "crop monitoring", "crop prediction", "crop disease", "crop yield forecasting",
+    "precision farming", "precision agriculture", "site-specific crop management", "variable rate technology",
+    "sustainable farming", "conservation agriculture", "agroecology", "organic farming",
+    "livestock management", "animal health monitoring", "dairy farming technology", "poultry monitoring",
+    "soil health monitoring", "irrigation management", "water usage efficiency", "nutrient management",
+    "agricultural drones", "farm robotics", "automated harvesting", "robotic weeding",
+    "climate-smart agriculture", "agricultural adaptation to climate change", "weather prediction for farming",
+    "agri-food supply chain", "food traceability", "agricultural logistics", "farm to table",
+    "pesticide application technology", "herbicide resistance management", "fertilizer optimization",
+    "agricultural big data", "farm data analytics", "agricultural informatics", "agricultural decision support systems"
+)
+AGRICULTURE_COLUMNS = ['Title', 'Abstract', 'Author Keywords', 'Index Keywords', 'Affiliations']
+
+# Flag the papers mentioning an agriculture keyword in any of the text columns, one vectorized search per column
+def classify_agriculture(data, keywords=AGRICULTURE_KEYWORDS):
+    # Compile a single string pattern for faster search
+    pattern = '|'.join(keywords)
+    is_agriculture = pd.Series(False, index=data.index)
+    for column in AGRICULTURE_COLUMNS:
+        is_agriculture |= data[column].astype('string').str.contains(pattern, case=False, na=False).astype(bool)
+    return is_agriculture
+
+# Raw exports kept in memory by the watch mode, keyed by absolute path, with the file state they were read at
+RESIDENT_EXPORTS = {}
+
+def _file_state(path):
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size
+
+# Read a CSV export and keep it in memory for the next analyses
+def keep_resident(csv_file_path):
+    path = os.path.abspath(csv_file_path)
+    state = _file_state(path)
+    data = pd.read_csv(path)
+    RESIDENT_EXPORTS[path] = (state, data)
+    return data
+
+# Read a CSV export, from memory when a resident copy of the unchanged file exists
+def read_export(csv_file_path):
+    path = os.path.abspath(csv_file_path)
+    resident = RESIDENT_EXPORTS.get(path)
+    if resident is not None and resident[0] == _file_state(path):
+        return resident[1].copy()
+    return pd.read_csv(csv_file_path)
 
-    # Pre-processing to filter data from 2012 onwards
+# Total and agriculture documents of a cleaned dataframe
+def document_counts(data):
+    return data.shape[0], int(data['IsAgriculture'].sum())
+
+# Cleaning shared by the whole export and its shards: numeric years, the optional collapse of near-duplicates, the
+# agriculture flag and the start_year filter. Also returns the document counts before the filter
+def clean_export(data, start_year=2012, deduplicate=False, keywords=AGRICULTURE_KEYWORDS):
+    # Pre-processing to filter data from start_year onwards
     data['Year'] = pd.to_numeric(data['Year'], errors='coerce')  # Ensure the 'Year' column is numeric
     data = data.dropna(subset=['Year'])  # Drop rows where Year is NaN
     data['Year'] = data['Year'].astype(int)  # Convert Year to integer
-    
-    # Define agriculture-related keywords
-    agriculture_keywords = [
-        "agriculture", "farming", "agritech", "precision agriculture", "smart agriculture",
-        "crop monitoring", "crop prediction", "crop disease", "crop yield forecasting",
-        "precision farming", "precision agriculture", "site-specific crop management", "variable rate technology",
-        "sustainable farming", "conservation agriculture", "agroecology", "organic farming",
-        "livestock management", "animal health monitoring", "dairy farming technology", "poultry monitoring",
-        "soil health monitoring", "irrigation management", "water usage efficiency", "nutrient management",
-        "agricultural drones", "farm robotics", "automated harvesting", "robotic weeding",
-        "climate-smart agriculture", "agricultural adaptation to climate change", "weather prediction for farming",
-        "agri-food supply chain", "food traceability", "agricultural logistics", "farm to table",
-        "pesticide application technology", "herbicide resistance management", "fertilizer optimization",
-        "agricultural big data", "farm data analytics", "agricultural informatics", "agricultural decision support systems"
-    ]
-    
-    # Compile a single string pattern for faster search
-    pattern = '|'.join(agriculture_keywords)
-    
+
+    # Optionally collapse near-duplicate versions of the same work (preprint, conference and journal versions)
+    if deduplicate:
+        from .deduplication import find_near_duplicates, collapse_duplicates
+        data = collapse_duplicates(data, find_near_duplicates(data))
+
     # Calculate the agriculture mask
-    data['IsAgriculture'] = data[['Title', 'Abstract', 'Author Keywords', 'Index Keywords', 'Affiliations']].apply(
-        lambda x: x.str.contains(pattern, case=False, na=False).any(), axis=1)
-    
-    # Count total documents, agriculture, and non-agriculture documents
-    print(f"Stats in general: Total documents {data.shape[0]}, Agriculture documents {data['IsAgriculture'].sum()}, Non-agriculture documents {data[~data['IsAgriculture']].shape[0]}")
-    
-    # Return the modified dataframe
-    start_year = 2012
-    data = data[data['Year'] >= start_year]
-    print(f"Stats after filtering from {start_year} onwards: Total documents {data.shape[0]}, Agriculture documents {data['IsAgriculture'].sum()}, Non-agriculture documents {data[~data['IsAgriculture']].shape[0]}")
-    
-    # Print data column names as JSON
-    print(data.columns.to_list())
+    data['IsAgriculture'] = classify_agriculture(data, keywords)
+    loaded = document_counts(data)
+
+    # start_year=None keeps every year
+    if start_year is not None:
+        data = data[data['Year'] >= start_year]
+    return data, loaded
+
+# Print the (total, agriculture) documents before and after the start_year filter, then the column names
+def print_cleaning_stats(loaded, kept, start_year, columns):
+    total, agriculture = loaded
+    print(f"Stats in general: Total documents {total}, Agriculture documents {agriculture}, Non-agriculture documents {total - agriculture}")
+    if start_year is not None:
+        total, agriculture = kept
+        print(f"Stats after filtering from {start_year} onwards: Total documents {total}, Agriculture documents {agriculture}, Non-agriculture documents {total - agriculture}")
+    print(columns)
+
+def get_cleaned_dataframe_from_csv(csv_file_path, start_year=2012, deduplicate=False, sample_fraction=None, random_state=None, keywords=AGRICULTURE_KEYWORDS):
+    # Preview mode: a stratified sample drawn while streaming the CSV, weighted back to the full corpus
+    if sample_fraction is not None:
+        from .sampling import stratified_reservoir_sample
+        data = stratified_reservoir_sample(csv_file_path, sample_fraction, start_year, random_state=random_state, keywords=keywords)
+        print(f"Stats of the {sample_fraction:.1%} preview sample: Total documents {data.shape[0]}, Agriculture documents {data['IsAgriculture'].sum()}, "
+              f"Non-agriculture documents {data[~data['IsAgriculture']].shape[0]}, estimated corpus size {data['SampleWeight'].sum():.0f}")
+        return data
+
+    # Load and clean the dataset
+    data, loaded = clean_export(read_export(csv_file_path), start_year, deduplicate, keywords)
+    print_cleaning_stats(loaded, document_counts(data), start_year, data.columns.to_list())
 
     return data
 
@@ -0,0 +1,98 @@
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from .keywords import explode_keywords
+
+# Binary paper x keyword incidence matrix in CSR format
+def paper_keyword_matrix(data, min_occurrences=1):
+    expanded_data = explode_keywords(data)
+    occurrences = expanded_data['Keyword'].value_counts()
+    kept = occurrences[occurrences >= min_occurrences].index
+    expanded_data = expanded_data[expanded_data['Keyword'].isin(kept)]
+
+    paper_codes, _ = pd.factorize(expanded_data['Paper'])
+    keyword_codes, keywords = pd.factorize(expanded_data['Keyword'], sort=True)
+    incidence = sparse.csr_matrix(
+        (np.ones(len(paper_codes), dtype=np.float32), (paper_codes, keyword_codes)),
+        shape=(paper_codes.max() + 1 if len(paper_codes) else 0, len(keywords)),
+    )
+    return incidence, pd.Index(keywords, name='Keyword')
+
+# Keyword x keyword co-occurrence counts as the sparse product of the incidence matrix with itself
+def cooccurrence_matrix(incidence):
+    cooccurrences = (incidence.T @ incidence).tocsr()
+    occurrences = cooccurrences.diagonal()
+    cooccurrences.setdiag(0)
+    cooccurrences.eliminate_zeros()
+    return cooccurrences, occurrences
+
+# Association strength normalization: observed co-occurrences over those expected from the occurrences
+def association_strength(cooccurrences, occurrences, n_papers):
+    coo = cooccurrences.tocoo()
+    values = coo.data * n_papers / (occurrences[coo.row] * occurrences[coo.col])
+    return sparse.coo_matrix((values, (coo.row, coo.col)), shape=cooccurrences.shape)
+
+# Weighted label propagation on a sparse symmetric graph; half of the nodes are updated per round to avoid oscillations
+def label_propagation(weights, max_iterations=50, random_state=None):
+    rng = np.random.default_rng(random_state)
+    n_nodes = weights.shape[0]
+    labels = np.arange(n_nodes)
+    has_neighbours = np.diff(weights.indptr) > 0
+
+    for _ in range(max_iterations):
+        label_matrix = sparse.csr_matrix((np.ones(n_nodes), (np.arange(n_nodes), labels)), shape=(n_nodes, n_nodes))
+        scores = (weights @ label_matrix).tocsr()
+        # A tiny random jitter breaks ties between equally weighted labels
+        scores.data += rng.random(len(scores.data)) * 1e-9
+        best = np.asarray(scores.argmax(axis=1)).ravel()
+
+        # Stop only once no node would take a new label, not just the nodes drawn for this round
+        changed = has_neighbours & (best != labels)
+        update = has_neighbours & (rng.random(n_nodes) < 0.5)
+        labels = np.where(update, best, labels)
+        if not changed.any():
+            break
+
+    # Renumber communities from the largest to the smallest
+    _, codes, sizes = np.unique(labels, return_inverse=True, return_counts=True)
+    rank = np.empty_like(sizes)
+    rank[np.argsort(-sizes, kind='stable')] = np.arange(len(sizes))
+    return rank[codes]
+
+# Pruned keyword network with its topic clusters, exported as node and edge tables
+def build_keyword_network(data, min_occurrences=5, min_cooccurrences=2, min_association=0.0, random_state=0):
+    incidence, keywords = paper_keyword_matrix(data, min_occurrences)
+    cooccurrences, occurrences = cooccurrence_matrix(incidence)
+
+    # Keep the edges that pass both thresholds, on the upper triangle so that each pair appears once
+    coo = sparse.triu(cooccurrences, k=1).tocoo()
+    edge_strength = association_strength(coo, occurrences, incidence.shape[0]).tocoo().data
+    keep = (coo.data >= min_cooccurrences) & (edge_strength >= min_association)
+    rows, cols, counts, edge_strength = coo.row[keep], coo.col[keep], coo.data[keep], edge_strength[keep]
+
+    graph = sparse.coo_matrix((edge_strength, (rows, cols)), shape=cooccurrences.shape)
+    graph = (graph + graph.T).tocsr()
+    clusters = label_propagation(graph, random_state=random_state)
+
+    nodes = pd.DataFrame({
+        'Keyword': keywords,
+        'occurrences': occurrences.astype(int),
+        'degree': np.diff(graph.indptr),
+        'weighted_degree': np.asarray(graph.sum(axis=1)).ravel(),
+        'cluster': clusters,
+    })
+    edges = pd.DataFrame({
+        'source': keywords[rows],
+        'target': keywords[cols],
+        'cooccurrences': counts.astype(int),
+        'association_strength': edge_strength,
+    }).sort_values('cooccurrences', ascending=False, ignore_index=True)
+    return nodes.sort_values(['cluster', 'occurrences'], ascending=[True, False], ignore_index=True), edges
+
+# Keyword networks of the agriculture and non-agriculture publications
+def build_keyword_networks_by_category(data, **kwargs):
+    return {
+        'Agriculture': build_keyword_network(data[data['IsAgriculture']], **kwargs),
+        'Non-Agriculture': build_keyword_network(data[~data['IsAgriculture']], **kwargs),
+    }
@@ -0,0 +1,13 @@
+KEYWORD_COLUMNS = ['Author Keywords', 'Index Keywords']
+
+# One row per (paper, normalized keyword), merging author and index keywords without duplicates per paper
+def explode_keywords(data, keyword_columns=KEYWORD_COLUMNS, columns=('Year', 'IsAgriculture')):
+    joined = data[keyword_columns[0]].fillna('')
+    for column in keyword_columns[1:]:
+        joined = joined + ';' + data[column].fillna('')
+    keywords = joined.str.lower().str.split(';')
+    expanded_data = data[list(columns)].assign(Keyword=keywords).explode('Keyword')
+    expanded_data['Keyword'] = expanded_data['Keyword'].str.strip()
+    expanded_data = expanded_data[expanded_data['Keyword'] != '']
+    expanded_data = expanded_data.rename_axis('Paper').reset_index()
+    return expanded_data.drop_duplicates(subset=['Paper', 'Keyword'], ignore_index=True)
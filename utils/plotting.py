@@ -0,0 +1,67 @@
+from functools import lru_cache
+
+import numpy as np
+from matplotlib.collections import PathCollection
+from matplotlib.font_manager import FontProperties
+from matplotlib.lines import Line2D
+from matplotlib.patches import PathPatch
+from matplotlib.path import Path
+from matplotlib.textpath import TextPath, text_to_path
+from matplotlib.transforms import Affine2D
+
+# All the bars of a series as one compound path patch, with the legend entry and autoscaling of ax.bar / ax.barh
+def draw_bars(ax, positions, values, width=0.8, horizontal=False, color=None, label=None, **kwargs):
+    positions = np.asarray(positions, dtype=float)
+    values = np.asarray(values, dtype=float)
+    low, high = positions - width / 2, positions + width / 2
+    zeros = np.zeros_like(values)
+    if horizontal:
+        corners = [(zeros, low), (zeros, high), (values, high), (values, low), (zeros, low)]
+    else:
+        corners = [(low, zeros), (high, zeros), (high, values), (low, values), (low, zeros)]
+    vertices = np.stack([np.column_stack(corner) for corner in corners], axis=1)
+    codes = np.tile([Path.MOVETO, Path.LINETO, Path.LINETO, Path.LINETO, Path.CLOSEPOLY], len(values))
+
+    patch = PathPatch(Path(vertices.reshape(-1, 2), codes), facecolor=color, edgecolor='none', label=label, **kwargs)
+    # Like bars, the axis stops at the baseline instead of adding a margin below it
+    (patch.sticky_edges.x if horizontal else patch.sticky_edges.y).append(0)
+    ax.add_artist(patch)
+    ax.update_datalim(vertices.reshape(-1, 2))
+    ax.autoscale_view()
+    return patch
+
+# All the markers of a series as one scatter artist; size and edgewidth follow the markersize / markeredgewidth of ax.plot
+def draw_markers(ax, x, y, marker='_', size=15, edgewidth=3, color='k', zorder=2, **kwargs):
+    return ax.scatter(x, y, marker=marker, s=np.square(size), linewidths=edgewidth, color=color, zorder=zorder, **kwargs)
+
+# Outline of a label in points, aligned on its anchor with the text layout metrics used by plt.text
+@lru_cache(maxsize=4096)
+def _label_path(label, fontsize, ha, va):
+    prop = FontProperties(size=fontsize)
+    width, height, descent = text_to_path.get_text_width_height_descent(label, prop, ismath=False)
+    dx = {'left': 0, 'center': -width / 2, 'right': -width}[ha]
+    dy = {'baseline': 0, 'bottom': descent, 'center': descent - height / 2, 'top': descent - height}[va]
+    return TextPath((dx, dy), label, prop=prop)
+
+# All the text labels of a series as one path collection, placed at data coordinates and shifted by offset points
+def draw_labels(ax, x, y, labels, color='k', fontsize=None, ha='center', va='baseline', offset=(0, 0), zorder=3):
+    fontsize = FontProperties(size=fontsize).get_size_in_points()
+    collection = PathCollection(
+        [_label_path(str(label), fontsize, ha, va) for label in labels],
+        offsets=np.column_stack([np.asarray(x, dtype=float), np.asarray(y, dtype=float)]),
+        offset_transform=ax.transData,
+        transform=Affine2D().translate(*offset).scale(1 / 72) + ax.figure.dpi_scale_trans,
+        facecolors=color,
+        edgecolors='none',
+        clip_on=False,
+        zorder=zorder,
+    )
+    # Like text, the labels do not take part in the autoscaling of the axes
+    ax.add_collection(collection, autolim=False)
+    return collection
+
+# Legend of the bars completed with a proxy entry for the markers
+def legend_with_marker(ax, label='H-index', marker='_', color='k', markersize=10):
+    handles, _ = ax.get_legend_handles_labels()
+    handles.append(Line2D([0], [0], color=color, marker=marker, linestyle='None', markersize=markersize, label=label))
+    return ax.legend(handles=handles)
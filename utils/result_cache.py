@@ -0,0 +1,96 @@
+import hashlib
+import json
+import os
+import pickle
+import tempfile
+
+from .get_cleaned_dataframe_from_csv import AGRICULTURE_KEYWORDS
+
+# Content hash of the CSV export and of the data files the analysis reads besides it (e.g. the known institutions),
+# together with the cleaning parameters that shape the dataset
+def dataset_fingerprint(csv_file_path, start_year=2012, keywords=AGRICULTURE_KEYWORDS, data_files=(), chunk_size=1 << 20):
+    digest = hashlib.sha256()
+    for path in [csv_file_path, *data_files]:
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(chunk_size), b''):
+                digest.update(chunk)
+    digest.update(json.dumps({'start_year': start_year, 'keywords': sorted(keywords)}).encode())
+    return digest.hexdigest()
+
+# Disk-backed cache of analysis outputs, keyed by dataset fingerprint, function name, version and parameters.
+# The version of a function must be bumped whenever the layout or content of its output changes
+class ResultCache:
+    def __init__(self, cache_dir='../data/.cache', max_size_bytes=512 * 1024 * 1024, enabled=True):
+        self.cache_dir = cache_dir
+        self.max_size_bytes = max_size_bytes
+        self.enabled = enabled
+        if enabled:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    def key(self, function_name, fingerprint, params=None, version=1):
+        payload = json.dumps({'fingerprint': fingerprint, 'params': params or {}, 'version': version}, sort_keys=True, default=str)
+        return f"{function_name}-{hashlib.sha256(payload.encode()).hexdigest()}"
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.pkl")
+
+    def get(self, key):
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                value = pickle.load(f)
+        except (FileNotFoundError, EOFError, pickle.UnpicklingError):
+            return False, None
+        # Touch the entry so that eviction sees it as recently used
+        os.utime(path)
+        return True, value
+
+    def put(self, key, value):
+        # Write to a temporary file first so that an interrupted run never leaves a truncated entry
+        fd, temp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_path, self._path(key))
+        self.evict()
+
+    def get_or_compute(self, function_name, fingerprint, params, compute, version=1):
+        if not self.enabled:
+            return compute()
+        key = self.key(function_name, fingerprint, params, version)
+        hit, value = self.get(key)
+        if hit:
+            print(f"Cache hit for {function_name} {params}")
+            return value
+        value = compute()
+        self.put(key, value)
+        return value
+
+    def _entries(self):
+        entries = []
+        if not os.path.isdir(self.cache_dir):
+            return entries
+        for name in os.listdir(self.cache_dir):
+            if name.endswith('.pkl'):
+                stat = os.stat(os.path.join(self.cache_dir, name))
+                entries.append((stat.st_mtime, stat.st_size, name))
+        return entries
+
+    # Drop the least recently used entries until the cache fits in its size budget
+    def evict(self):
+        entries = sorted(self._entries())
+        total_size = sum(size for _, size, _ in entries)
+        for _, size, name in entries:
+            if total_size <= self.max_size_bytes:
+                break
+            os.remove(os.path.join(self.cache_dir, name))
+            total_size -= size
+
+    # Remove every entry, or only those of one function
+    def clear(self, function_name=None):
+        removed = 0
+        for _, _, name in self._entries():
+            if function_name is None or name.startswith(f"{function_name}-"):
+                os.remove(os.path.join(self.cache_dir, name))
+                removed += 1
+        print(f"Removed {removed} cached results from {self.cache_dir}")
+        return removed
@@ -0,0 +1,140 @@
+import os
+import tempfile
+
+import pandas as pd
+
+from .citation_metrics import SCOPES, METRICS
+
+# Version of the layout of the exported tables, bumped whenever a column is renamed, retyped or removed
+SCHEMA_VERSION = 1
+RESULTS_DIRECTORY = 'results'
+SCOPE_DESCRIPTIONS = {'total': 'all papers', 'agric': 'agriculture papers', 'non_agric': 'non-agriculture papers'}
+METRIC_FIELDS = {
+    'publications': ('int64', 'publications'),
+    'citations': ('float64', 'sum of the citations'),
+    'h_index': ('int64', 'H-index'),
+    'g_index': ('int64', 'G-index'),
+    'i10_index': ('int64', 'number of papers with at least 10 citations'),
+    'm_quotient': ('float64', 'H-index divided by the years since the first publication'),
+    'normalized_citations': ('float64', 'mean citations relative to papers of the same year and category'),
+    'top10_share': ('float64', 'percentage of papers in the top 10% most cited of their year and category'),
+}
+
+# Rank and citation metrics of the top entities of a column, one column per (scope, metric) as in compute_citation_metrics
+def _entity_metric_fields(entity):
+    fields = [('entity', 'string', entity), ('rank', 'int64', 'rank by total publications, from 1')]
+    for scope in SCOPES:
+        for metric in METRICS:
+            arrow_type, description = METRIC_FIELDS[metric]
+            fields.append((scope if metric == 'publications' else f'{scope}_{metric}', arrow_type, f'{description}, {SCOPE_DESCRIPTIONS[scope]}'))
+    return fields
+
+def _centrality_fields():
+    descriptions = {
+        'degree': ('float64', 'number of co-authors'),
+        'strength': ('float64', 'collaboration strength, each paper adding 1 / (authors - 1) per co-author'),
+        'pagerank': ('float64', 'weighted PageRank in the co-authorship graph'),
+        'betweenness': ('float64', 'normalized betweenness estimated from sampled sources'),
+    }
+    return [(f'{scope}_{name}', arrow_type, f'{description}, {SCOPE_DESCRIPTIONS[scope]} (null without such papers)')
+            for scope in SCOPES for name, (arrow_type, description) in descriptions.items()]
+
+# Columns of every exported table as (name, Arrow type, description)
+TABLE_SCHEMAS = {
+    'yearly_volume': [
+        ('year', 'int64', 'publication year'),
+        ('total', 'int64', 'publications'),
+        ('agric', 'int64', 'agriculture publications'),
+        ('non_agric', 'int64', 'non-agriculture publications'),
+    ],
+    'yearly_citations': [
+        ('year', 'int64', 'publication year'),
+        ('category', 'string', 'General, Agriculture or Non-Agriculture'),
+        ('mean_citations', 'float64', "mean of 'Cited by' over the papers with a citation count"),
+        ('documents', 'int64', "papers with a citation count"),
+        ('mean_low', 'float64', 'lower bound of the bootstrap confidence interval of the mean'),
+        ('mean_high', 'float64', 'upper bound of the bootstrap confidence interval of the mean'),
+    ],
+    'top_authors': _entity_metric_fields('author name as written in the Authors column') + _centrality_fields(),
+    'top_sources': _entity_metric_fields('source title'),
+    'top_institutions': _entity_metric_fields('institution name, truncated to 50 characters'),
+    'top_countries_publications': [
+        ('entity', 'string', 'country name'),
+        ('rank', 'int64', 'rank by total publications, from 1'),
+        ('total', 'int64', 'publications'),
+        ('agric', 'int64', 'agriculture publications'),
+        ('non_agric', 'int64', 'non-agriculture publications'),
+        ('top10_share', 'float64', 'percentage of papers in the top 10% most cited of their year and category'),
+    ],
+    'top_countries_citations': [
+        ('entity', 'string', 'country name'),
+        ('rank', 'int64', 'rank by total citations, from 1'),
+        ('total', 'float64', 'sum of the citations'),
+        ('agric', 'float64', 'sum of the citations of agriculture papers'),
+        ('non_agric', 'float64', 'sum of the citations of non-agriculture papers'),
+    ],
+    'top_countries_combined': [
+        ('entity', 'string', 'country name'),
+        ('rank', 'int64', 'rank by total of the measure, from 1'),
+        ('measure', 'string', 'publications or citations'),
+        ('total', 'float64', 'total of the measure'),
+        ('agric', 'float64', 'agriculture part of the measure'),
+        ('non_agric', 'float64', 'non-agriculture part of the measure'),
+        ('agric_ratio', 'float64', 'percentage of the total from agriculture'),
+        ('non_agric_ratio', 'float64', 'percentage of the total from non-agriculture'),
+        ('top10_share', 'float64', 'percentage of papers in the top 10% most cited (publications rows only)'),
+        ('citations_per_publication', 'float64', 'citations per publication (citations rows only)'),
+    ],
+}
+
+# Arrow schema of a table, with the description of every column and the schema version in the metadata
+def table_schema(name):
+    import pyarrow as pa
+
+    fields = [pa.field(column, pa.type_for_alias(arrow_type), metadata={'description': description})
+              for column, arrow_type, description in TABLE_SCHEMAS[name]]
+    return pa.schema(fields, metadata={'table': name, 'schema_version': str(SCHEMA_VERSION)})
+
+# Table of the {entity: {column: value}} layout of the top-N aggregations, ranked in their order
+def entity_table(top_data):
+    table = pd.DataFrame.from_dict(top_data, orient='index')
+    table.insert(0, 'rank', range(1, len(table) + 1))
+    return table.rename_axis('entity').reset_index()
+
+def _write_atomically(path, write):
+    # Write to a temporary file first so that readers never map a truncated table
+    fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+    os.close(fd)
+    write(temp_path)
+    os.replace(temp_path, path)
+
+# Write a result table as an uncompressed Arrow IPC file, which readers can memory-map without copies, and as Parquet.
+# Columns follow the documented schema: missing ones are null and extra ones are dropped
+def export_result_table(name, frame, output_path, formats=('arrow', 'parquet')):
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        print(f"pyarrow is not installed, the {name} result table is not exported")
+        return None
+
+    schema = table_schema(name)
+    table = pa.Table.from_pandas(frame.reset_index(drop=True).reindex(columns=schema.names), schema=schema, preserve_index=False)
+    directory = os.path.join(output_path, RESULTS_DIRECTORY)
+    os.makedirs(directory, exist_ok=True)
+
+    def write_arrow(path):
+        with pa.OSFile(path, 'wb') as sink, pa.ipc.new_file(sink, schema) as writer:
+            writer.write_table(table)
+
+    writers = {'arrow': write_arrow, 'parquet': lambda path: pq.write_table(table, path)}
+    for extension in formats:
+        _write_atomically(os.path.join(directory, f"{name}.{extension}"), writers[extension])
+    print(f"Result table {name} ({table.num_rows} rows) written to {directory}")
+    return table
+
+# Memory-mapped read of an exported Arrow IPC table; the columns point into the mapped file
+def read_result_table(path):
+    import pyarrow as pa
+
+    return pa.ipc.open_file(pa.memory_map(path)).read_all()
@@ -0,0 +1,135 @@
+import math
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from .citation_metrics import explode_entities
+from .get_cleaned_dataframe_from_csv import AGRICULTURE_KEYWORDS, classify_agriculture
+
+STRATA = ['Year', 'IsAgriculture']
+
+# Number of rows a stratum keeps: the final sample size, plus a safety margin while the stratum is still growing
+def _capacity(population, fraction, margin=True):
+    size = np.minimum(np.maximum(np.round(population * fraction), 1), population)
+    if margin:
+        size = np.minimum(size + np.ceil(3 * np.sqrt(size)) + 10, population)
+    return size
+
+# Keep, in every stratum, the rows with the smallest random keys up to the stratum capacity
+def _trim(reservoir, capacity):
+    reservoir = reservoir.sort_values([*STRATA, 'SampleKey'], kind='stable')
+    rank = reservoir.groupby(STRATA, sort=False).cumcount().to_numpy()
+    limit = capacity.reindex(pd.MultiIndex.from_frame(reservoir[STRATA])).to_numpy()
+    return reservoir[rank < limit]
+
+# Stratified sample by (Year, IsAgriculture) drawn while streaming the CSV. Each stratum is a bottom-k reservoir of
+# uniform random keys, so the final sample is a uniform draw of round(fraction * stratum size) rows of every stratum
+def stratified_reservoir_sample(csv_file_path, fraction, start_year=2012, chunk_size=50_000, random_state=None, keywords=AGRICULTURE_KEYWORDS):
+    rng = np.random.default_rng(random_state)
+    population = reservoir = None
+
+    for chunk in pd.read_csv(csv_file_path, chunksize=chunk_size):
+        chunk['Year'] = pd.to_numeric(chunk['Year'], errors='coerce')
+        chunk = chunk.dropna(subset=['Year'])
+        chunk['Year'] = chunk['Year'].astype(int)
+        if start_year is not None:
+            chunk = chunk[chunk['Year'] >= start_year]
+        chunk['IsAgriculture'] = classify_agriculture(chunk, keywords)
+        chunk['SampleKey'] = rng.random(len(chunk))
+
+        counts = chunk.groupby(STRATA).size()
+        population = counts if population is None else population.add(counts, fill_value=0)
+        reservoir = chunk if reservoir is None else pd.concat([reservoir, chunk])
+        reservoir = _trim(reservoir, _capacity(population, fraction))
+
+    # Final sample sizes, and the weight that scales every sampled paper back to its stratum
+    sample = _trim(reservoir, _capacity(population, fraction, margin=False)).sort_index()
+    sizes = sample.groupby(STRATA).size()
+    weights = (population / sizes).reindex(pd.MultiIndex.from_frame(sample[STRATA])).to_numpy()
+    return sample.drop(columns='SampleKey').assign(SampleWeight=weights)
+
+# Population size, sample size and code of the stratum of every sampled paper
+def _strata(sample):
+    codes, strata = pd.MultiIndex.from_frame(sample[STRATA]).factorize()
+    strata = pd.MultiIndex.from_tuples(strata, names=STRATA)
+    sample_sizes = np.bincount(codes, minlength=len(strata)).astype(float)
+    population = np.bincount(codes, weights=sample.get('SampleWeight', pd.Series(1.0, index=sample.index)).to_numpy(dtype=float), minlength=len(strata))
+    return codes, strata, population, sample_sizes
+
+# Variance of the sample mean of every stratum, with the finite population correction
+def _mean_variance(population, sample_sizes, variances):
+    finite_population = np.where(population > 0, 1 - sample_sizes / np.maximum(population, 1), 0)
+    return finite_population * variances / np.maximum(sample_sizes, 1)
+
+# Estimated publications per year and category, with margins; they are exact since the sample is stratified by year
+def estimate_yearly_volume(sample):
+    _, strata, population, _ = _strata(sample)
+    volume = pd.Series(population, index=strata).unstack('IsAgriculture', fill_value=0)
+    volume = volume.reindex(columns=[True, False], fill_value=0).rename(columns={True: 'agric', False: 'non_agric'})
+    volume['total'] = volume['agric'] + volume['non_agric']
+    volume['margin'] = 0.0
+    return volume[['total', 'agric', 'non_agric', 'margin']].round().astype({'total': int, 'agric': int, 'non_agric': int})
+
+# Estimated mean citations per year and category, with the margin of error of the stratified mean
+def estimate_yearly_citations(sample, z=1.96):
+    _, strata, population, _ = _strata(sample)
+    citations = pd.to_numeric(sample['Cited by'], errors='coerce')
+    stats = citations.groupby([sample[column] for column in STRATA]).agg(['count', 'mean', 'var']).fillna({'var': 0})
+    stats = stats[stats['count'] > 0]
+    stats['population'] = pd.Series(population, index=strata).reindex(stats.index)
+
+    rows = []
+    for category, in_category in {'General': [True, False], 'Agriculture': [True], 'Non-Agriculture': [False]}.items():
+        selected = stats[stats.index.get_level_values('IsAgriculture').isin(in_category)]
+        for year, year_stats in selected.groupby(level='Year'):
+            share = year_stats['population'] / year_stats['population'].sum()
+            variance = (share ** 2 * _mean_variance(year_stats['population'], year_stats['count'], year_stats['var'])).sum()
+            rows.append({'Year': year, 'Category': category, 'mean': (share * year_stats['mean']).sum(), 'margin': z * math.sqrt(variance)})
+    return pd.DataFrame(rows).pivot(index='Year', columns='Category')
+
+# Estimated publications of every entity of a column, with the margin of error of the stratified total
+def estimate_entity_totals(sample, entity_column, z=1.96):
+    codes, strata, population, sample_sizes = _strata(sample)
+    expanded_data = explode_entities(sample.assign(Stratum=codes), entity_column, columns=('Stratum',))
+    expanded_data = expanded_data.reset_index().drop_duplicates()
+
+    # Papers of every (entity, stratum) cell, kept sparse
+    entity_codes, entities = pd.factorize(expanded_data['Entity'], sort=True)
+    cells = sparse.coo_matrix((np.ones(len(entity_codes)), (entity_codes, expanded_data['Stratum'].to_numpy())),
+                              shape=(len(entities), len(strata))).tocsr().tocoo()
+    proportion = cells.data / sample_sizes[cells.col]
+    sample_variance = proportion * (1 - proportion) * sample_sizes[cells.col] / np.maximum(sample_sizes[cells.col] - 1, 1)
+
+    estimate = np.bincount(cells.row, weights=population[cells.col] * proportion, minlength=len(entities))
+    variance = np.bincount(cells.row, weights=population[cells.col] ** 2 * _mean_variance(population[cells.col], sample_sizes[cells.col], sample_variance), minlength=len(entities))
+    margin = z * np.sqrt(variance)
+    return pd.DataFrame({
+        'estimate': estimate, 'margin': margin, 'low': np.maximum(estimate - margin, 0), 'high': estimate + margin,
+        'sampled': np.bincount(cells.row, weights=cells.data, minlength=len(entities)).astype(int),
+    }, index=pd.Index(entities, name=entity_column)).sort_values('estimate', ascending=False, kind='stable')
+
+# Share of Poisson-bootstrap replicates of the sample in which each estimated top-N entity stays in the top N
+def top_n_stability(sample, entity_column, top_n=10, n_replicates=200, candidates=5, random_state=None):
+    totals = estimate_entity_totals(sample, entity_column)
+    pool = totals.index[:top_n * candidates]
+
+    # Sampled paper x candidate entity incidence, weighted by the sampling weight of the paper
+    expanded_data = explode_entities(sample.assign(Row=np.arange(len(sample))), entity_column, columns=('Row',))
+    expanded_data = expanded_data[expanded_data['Entity'].isin(pool)].drop_duplicates()
+    weights = sample.get('SampleWeight', pd.Series(1.0, index=sample.index)).to_numpy(dtype=float)
+    incidence = sparse.csr_matrix(
+        (weights[expanded_data['Row'].to_numpy()], (expanded_data['Row'].to_numpy(), pool.get_indexer(expanded_data['Entity']))),
+        shape=(len(sample), len(pool)),
+    )
+
+    # Each replicate reweights every sampled paper by a Poisson(1) draw; all the replicates are one matrix product
+    rng = np.random.default_rng(random_state)
+    replicates = (incidence.T @ rng.poisson(1.0, (len(sample), n_replicates))).T
+    kept = min(top_n, len(pool))
+    thresholds = -np.sort(-replicates, axis=1)[:, kept - 1:kept] if kept else np.zeros((n_replicates, 1))
+    stability = (replicates >= thresholds).mean(axis=0)
+
+    top = totals.head(top_n).copy()
+    top['stability'] = stability[:len(top)]
+    return top
@@ -0,0 +1,311 @@
+import io
+import os
+from multiprocessing import Pool
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from .citation_metrics import SCOPES, explode_entities, entity_metrics_table
+from .coauthorship import coauthorship_split_counts, weighted_graph, centrality_by_scope
+from .extract_countries import extract_countries
+from .get_cleaned_dataframe_from_csv import AGRICULTURE_KEYWORDS, clean_export, print_cleaning_stats
+
+# Entity columns aggregated for every analysis the sharded mode reproduces
+SHARDED_ANALYSES = {'volume': (), 'citations': (), 'authors': ('Authors',), 'sources': ('Source title',), 'countries': ('Country',)}
+# Columns read as text in every shard, so that a shard holding only numbers or blanks in them is parsed like the whole file
+TEXT_COLUMNS = ['Authors', 'Title', 'Source title', 'Affiliations', 'Abstract', 'Author Keywords', 'Index Keywords']
+PAPER_KEYS = ['Year', 'IsAgriculture', 'Cited by']
+ENTITY_KEYS = ['Entity', *PAPER_KEYS]
+# Most cited papers of every (Year, IsAgriculture) group a shard keeps for the highly cited papers of citations_per_year
+CANDIDATE_PAPERS = 3
+
+# Header and byte ranges of about equal size of a CSV export, each starting at a record boundary. Quoted fields
+# (abstracts, affiliations) may hold newlines, so a newline only ends a record after an even number of quotes
+def csv_shards(csv_file_path, n_shards, block_size=1 << 22):
+    size = os.path.getsize(csv_file_path)
+    with open(csv_file_path, 'rb') as f:
+        header = f.readline()
+        boundaries = [f.tell()]
+        position, quotes = f.tell(), 0
+        for target in (boundaries[0] + (size - boundaries[0]) * i // n_shards for i in range(1, n_shards)):
+            if target <= boundaries[-1]:
+                continue
+            while position < target:
+                block = f.read(min(block_size, target - position))
+                quotes += block.count(b'"')
+                position += len(block)
+
+            # First newline outside quotes from the target on
+            while position < size:
+                block = f.read(block_size)
+                offset = 0
+                newline = block.find(b'\n')
+                while newline >= 0:
+                    quotes += block.count(b'"', offset, newline)
+                    offset = newline + 1
+                    if quotes % 2 == 0:
+                        break
+                    newline = block.find(b'\n', offset)
+                if newline >= 0:
+                    position += offset
+                    f.seek(position)
+                    break
+                quotes += block.count(b'"', offset)
+                position += len(block)
+            if boundaries[-1] < position < size:
+                boundaries.append(position)
+    return header, list(zip(boundaries, boundaries[1:] + [size]))
+
+# Records of one byte range of the export, parsed with the header of the file
+def read_csv_shard(csv_file_path, header, start, end):
+    with open(csv_file_path, 'rb') as f:
+        f.seek(start)
+        body = f.read(end - start)
+    return pd.read_csv(io.BytesIO(header + body), dtype={column: str for column in TEXT_COLUMNS})
+
+def _histogram(frame, keys):
+    return frame.groupby(keys, sort=False, dropna=False, observed=True).size().rename('count').reset_index()
+
+# Sum the counters of several histograms; entities go back from the categoricals of the shards to plain labels
+def _merge_histograms(histograms, keys):
+    merged = pd.concat(histograms, ignore_index=True)
+    if 'Entity' in merged:
+        merged['Entity'] = merged['Entity'].astype(object)
+    return merged.groupby(keys, sort=False, dropna=False)['count'].sum().reset_index()
+
+# Papers of every (entity, Year, IsAgriculture, citations), the entity kept as a categorical to stay compact in transit
+def _entity_histogram(data, entity_column):
+    expanded_data = explode_entities(data, entity_column, columns=('Year', 'Cited by', 'IsAgriculture'))
+    expanded_data['Entity'] = pd.Categorical(expanded_data['Entity'])
+    expanded_data['Cited by'] = expanded_data['Cited by'].fillna(0).astype(float)
+    return _histogram(expanded_data, ENTITY_KEYS)
+
+# Co-authorship counts of several parts moved to the codes of another author index and added up, size by size
+def _add_counts(parts, authors):
+    added = {}
+    for part_authors, counts in parts:
+        codes = authors.get_indexer(part_authors)
+        for size, matrix in counts.items():
+            matrix = matrix.tocoo()
+            matrix = sparse.csr_matrix((matrix.data, (codes[matrix.row], codes[matrix.col])), shape=(len(authors), len(authors)))
+            added[size] = added[size] + matrix if size in added else matrix
+    return added
+
+# Co-authorship counts of a split over the sorted union of the authors of the shards
+def _merge_counts(parts, scope):
+    authors = pd.Index(sorted(set().union(*(part.counts[scope][0] for part in parts))), name='Authors')
+    return authors, _add_counts([part.counts[scope] for part in parts], authors)
+
+# Mergeable partial aggregates of some rows of the export: counters of papers per (Year, IsAgriculture, citations),
+# the same counters per entity of the authors, sources and countries, the co-authorship counts of every split and the most
+# cited papers of every group. Merged across the shards, they give the same tables as the analyses on the whole dataset
+class ShardAggregates:
+    def __init__(self, columns, loaded, papers, entities=None, missing=None, counts=None, candidates=None, cited_dtype=float, start_year=2012):
+        self.columns = columns
+        self.loaded = loaded
+        self.papers = papers
+        self.entities = entities or {}
+        self.missing = missing if missing is not None else pd.DataFrame(index=[False, True])
+        self.counts = counts or {}
+        self.candidates = candidates
+        self.cited_dtype = cited_dtype
+        self.start_year = start_year
+
+    # Map step: clean the rows with the cleaning of get_cleaned_dataframe_from_csv and count them
+    @classmethod
+    def from_data(cls, data, analyses, start_year=2012, keywords=AGRICULTURE_KEYWORDS):
+        cited_dtype = data['Cited by'].dtype
+        data, loaded = clean_export(data, start_year, keywords=keywords)
+        if 'countries' in analyses:
+            data['Country'] = data['Affiliations'].apply(extract_countries)
+
+        # Papers left out of the entity aggregations, without the entity or without the entity or citations
+        is_agri = data['IsAgriculture'].to_numpy(dtype=bool)
+        missing = pd.DataFrame(index=[False, True])
+        entity_columns = [column for analysis in analyses for column in SHARDED_ANALYSES[analysis]]
+        for column in entity_columns:
+            no_entity = data[column].isna().to_numpy()
+            missing[column] = np.bincount(is_agri[no_entity], minlength=2)
+            missing[f'{column} or Cited by'] = np.bincount(is_agri[no_entity | data['Cited by'].isna().to_numpy()], minlength=2)
+
+        columns = data.columns.drop('Country', errors='ignore').to_list()
+        data['Cited by'] = pd.to_numeric(data['Cited by'], errors='coerce')
+        papers = _histogram(data.assign(**{'Cited by': data['Cited by'].astype(float)}), PAPER_KEYS)
+        entities = {column: _entity_histogram(data, column) for column in entity_columns}
+        counts = coauthorship_split_counts(data, ('agric', 'non_agric'))[1] if 'authors' in analyses else {}
+
+        candidates = None
+        if 'citations' in analyses:
+            cited = data[data['Cited by'] > 0]
+            rank = cited.groupby(['Year', 'IsAgriculture'])['Cited by'].rank(method='min', ascending=False)
+            candidates = cited.loc[rank <= CANDIDATE_PAPERS, columns]
+        return cls(columns, np.array(loaded), papers, entities, missing, counts, candidates, cited_dtype, start_year)
+
+    # Merge the partial aggregates of several shards, given in the order of the rows
+    @classmethod
+    def merge(cls, parts):
+        first = parts[0]
+        entities = {column: _merge_histograms([part.entities[column] for part in parts], ENTITY_KEYS) for column in first.entities}
+        counts = {scope: _merge_counts(parts, scope) for scope in first.counts}
+        candidates = pd.concat([part.candidates for part in parts]) if first.candidates is not None else None
+        return cls(
+            first.columns, sum(part.loaded for part in parts), _merge_histograms([part.papers for part in parts], PAPER_KEYS),
+            entities, sum(part.missing for part in parts), counts, candidates,
+            np.result_type(*(part.cited_dtype for part in parts)), first.start_year,
+        )
+
+    # Same statistics as get_cleaned_dataframe_from_csv prints
+    def print_stats(self):
+        counts = self.papers.groupby('IsAgriculture')['count'].sum()
+        print_cleaning_stats(self.loaded, (int(counts.sum()), int(counts.get(True, 0))), self.start_year, self.columns)
+
+    # Papers of an agriculture split left out of an entity aggregation, as (agriculture, non-agriculture) counts
+    def ignored(self, entity_column, require_citations=True):
+        counts = self.missing[f'{entity_column} or Cited by' if require_citations else entity_column]
+        return int(counts[True]), int(counts[False])
+
+    # Reduce steps
+    def yearly_volume(self):
+        counts = self.papers.groupby(['Year', 'IsAgriculture'])['count'].sum().unstack(fill_value=0)
+        counts = counts.reindex(columns=[True, False], fill_value=0)
+        counts.columns = ['agric', 'non_agric']
+        counts.insert(0, 'total', counts['agric'] + counts['non_agric'])
+        return counts.sort_index()
+
+    # Mean citations and document counts per year, as sums over the citation counters of the papers with 'Cited by'
+    def yearly_citations(self):
+        papers = self.papers.dropna(subset=['Cited by'])
+        grouped = papers.assign(citations=papers['Cited by'] * papers['count']).groupby(['Year', 'IsAgriculture'])[['count', 'citations']].sum()
+        years = grouped.groupby('Year').sum()
+
+        yearly_data = (grouped['citations'] / grouped['count']).unstack(fill_value=0)
+        yearly_data = yearly_data.reindex(columns=[False, True], fill_value=0)
+        yearly_data.columns = ['Non-Agriculture', 'Agriculture']
+        yearly_data['General'] = years['citations'] / years['count']
+
+        doc_counts = grouped['count'].unstack(fill_value=0)
+        doc_counts = doc_counts.reindex(columns=[False, True], fill_value=0)
+        doc_counts.columns = ['Non-Agriculture', 'Agriculture']
+        doc_counts['General'] = years['count']
+        return yearly_data, doc_counts
+
+    # Documents without 'Cited by' in total and per agriculture split
+    def missing_citations(self):
+        missing = self.papers[self.papers['Cited by'].isna()].groupby('IsAgriculture')['count'].sum()
+        return int(missing.sum()), int(missing.get(True, 0)), int(missing.get(False, 0))
+
+    # One row per paper with 'Cited by', rebuilt from the counters for the bootstrap intervals
+    def citation_values(self):
+        papers = self.papers.dropna(subset=['Cited by'])
+        return papers.loc[papers.index.repeat(papers['count']), PAPER_KEYS].reset_index(drop=True)
+
+    # Citation percentile, top 10% and top 1% flags and field-normalized citations of every counter row, from the
+    # (Year, IsAgriculture) groups of the citations with missing ones counted as 0, as in citation_percentiles
+    def citation_classes(self):
+        papers = _merge_histograms([self.papers.fillna({'Cited by': 0})], PAPER_KEYS).sort_values(PAPER_KEYS, ignore_index=True)
+        group_codes = papers.groupby(['Year', 'IsAgriculture'], sort=False).ngroup().to_numpy()
+        citations, counts = papers['Cited by'].to_numpy(), papers['count'].to_numpy()
+
+        sizes = np.bincount(group_codes, weights=counts).astype(np.int64)
+        cumulative = np.cumsum(counts)
+        starts = np.concatenate(([0], np.cumsum(sizes)[:-1]))
+        below = cumulative - counts - starts[group_codes]
+        percentile = (below + counts / 2) / sizes[group_codes] * 100
+
+        # Citations at the sorted position of the top 10% and top 1% thresholds of every group
+        thresholds = {}
+        for name, share in {'Top10': 0.1, 'Top1': 0.01}.items():
+            positions = starts + sizes - np.maximum(np.floor(share * sizes).astype(np.int64), 1)
+            thresholds[name] = citations[np.searchsorted(cumulative, positions, side='right')][group_codes]
+
+        expected = (np.bincount(group_codes, weights=citations * counts) / sizes)[group_codes]
+        return papers.assign(
+            CitationPercentile=percentile,
+            Top10=(citations >= thresholds['Top10']) & (citations > 0),
+            Top1=(citations >= thresholds['Top1']) & (citations > 0),
+            NormalizedCitations=np.where(expected > 0, citations / np.where(expected > 0, expected, 1), 0),
+        )
+
+    # Papers with citations and highly cited papers (top 10% of their year and category) per year and category
+    def cited_paper_counts(self):
+        classes = self.citation_classes()
+        classes = classes[classes['Cited by'] > 0].assign(highly_cited=lambda frame: frame['count'] * frame['Top10'])
+        grouped = classes.groupby(['Year', 'IsAgriculture'])[['count', 'highly_cited']].sum().rename(columns={'count': 'papers'})
+        is_agri = grouped.index.get_level_values('IsAgriculture').to_numpy(dtype=bool)
+        categories = {
+            'General': grouped.groupby('Year').sum(),
+            'Agriculture': grouped[is_agri].droplevel('IsAgriculture'),
+            'Non-Agriculture': grouped[~is_agri].droplevel('IsAgriculture'),
+        }
+        return pd.concat(categories, names=['Category']).swaplevel().sort_index()
+
+    # The most cited papers of every shard and group, with the percentile classes of the whole dataset, in the order of the rows
+    def highly_cited_candidates(self):
+        classes = self.citation_classes().set_index(PAPER_KEYS)[['CitationPercentile', 'Top10', 'Top1']]
+        candidates = self.candidates.reset_index(drop=True)
+        keys = pd.MultiIndex.from_arrays([candidates['Year'], candidates['IsAgriculture'], candidates['Cited by'].astype(float)])
+        # 'Cited by' gets the type pd.to_numeric gives the column of the whole file
+        candidates['Cited by'] = candidates['Cited by'].astype(self.cited_dtype if np.issubdtype(self.cited_dtype, np.number) else float)
+        return candidates.join(classes.reindex(keys).reset_index(drop=True))
+
+    # Entity counters with the classes of their citations, one row per (entity, Year, IsAgriculture, citations)
+    def _entity_classes(self, entity_column):
+        classes = self.citation_classes().drop(columns='count')
+        return self.entities[entity_column].merge(classes, on=PAPER_KEYS, how='left')
+
+    # Same table as compute_citation_metrics on the whole dataset, from one row per (paper, entity) rebuilt from the counters
+    def citation_metrics(self, entity_column, current_year=None):
+        if current_year is None:
+            current_year = int(self.papers['Year'].max())
+        entities = self._entity_classes(entity_column)
+        expanded_data = entities.loc[entities.index.repeat(entities['count'])].reset_index(drop=True)
+        return entity_metrics_table(expanded_data, entity_column, current_year)
+
+    # Papers, citation sums and top 10% papers of every (entity, category)
+    def entity_totals(self, entity_column):
+        entities = self._entity_classes(entity_column)
+        entities = entities.assign(citations=entities['Cited by'] * entities['count'], top10=entities['Top10'] * entities['count'])
+        totals = entities.groupby(['Entity', 'IsAgriculture'])[['count', 'citations', 'top10']].sum().rename(columns={'count': 'papers'})
+        if np.issubdtype(self.cited_dtype, np.number):
+            totals['citations'] = totals['citations'].astype(self.cited_dtype)
+        return totals.rename_axis([entity_column, 'IsAgriculture'])
+
+    # Same table as coauthorship_centrality on the whole dataset, from the merged co-authorship counts of the splits
+    def coauthorship_centrality(self, n_samples=128, workers=None, random_state=0):
+        publications = self.entities['Authors'].groupby(['Entity', 'IsAgriculture'])['count'].sum().unstack(fill_value=0)
+        publications = publications.reindex(columns=[False, True], fill_value=0).sort_index()
+        authors = pd.Index(publications.index, name='Authors')
+        members = {'total': np.ones(len(authors), dtype=bool), 'agric': publications[True].to_numpy() > 0, 'non_agric': publications[False].to_numpy() > 0}
+
+        # The counts of the whole corpus are those of both splits added up
+        graphs = {}
+        for scope in SCOPES:
+            scope_authors = authors[members[scope]]
+            counts = _add_counts([self.counts[split] for split in (['agric', 'non_agric'] if scope == 'total' else [scope])], scope_authors)
+            graphs[scope] = (scope_authors, weighted_graph(counts, len(scope_authors)))
+        return centrality_by_scope(authors, graphs, n_samples, workers, random_state)
+
+def _aggregate_shard(task):
+    csv_file_path, header, start, end, analyses, start_year, keywords = task
+    return ShardAggregates.from_data(read_csv_shard(csv_file_path, header, start, end), analyses, start_year, keywords)
+
+# Split the export into n_shards byte ranges, aggregate them in a pool of processes and merge their partial aggregates.
+# Parsing, cleaning, classification, country extraction and the author explode all run in the workers
+def aggregate_csv_shards(csv_file_path, analyses, n_shards, start_year=2012, workers=None, keywords=AGRICULTURE_KEYWORDS):
+    unknown = set(analyses) - SHARDED_ANALYSES.keys()
+    if unknown:
+        raise ValueError(f"Unknown sharded analyses {sorted(unknown)}, expected some of {list(SHARDED_ANALYSES)}")
+    header, ranges = csv_shards(csv_file_path, n_shards)
+    tasks = [(csv_file_path, header, start, end, tuple(analyses), start_year, list(keywords)) for start, end in ranges]
+    workers = min(workers or os.cpu_count() or 1, len(tasks))
+
+    if workers > 1:
+        with Pool(workers) as pool:
+            parts = pool.map(_aggregate_shard, tasks, chunksize=1)
+    else:
+        parts = [_aggregate_shard(task) for task in tasks]
+    aggregates = ShardAggregates.merge(parts)
+    print(f"Aggregated {len(ranges)} shards of {csv_file_path} with {workers} processes")
+    aggregates.print_stats()
+    return aggregates
@@ -0,0 +1,159 @@
+import json
+import os
+import re
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+TEXT_COLUMNS = ['Title', 'Abstract', 'Author Keywords']
+# Version of the tokenization and weighting, bumped whenever they change so that persisted indexes are rebuilt
+INDEX_VERSION = 1
+STOPWORDS = {
+    'a', 'about', 'above', 'after', 'all', 'also', 'an', 'and', 'any', 'are', 'as', 'at', 'be', 'been', 'being', 'between',
+    'both', 'but', 'by', 'can', 'could', 'did', 'do', 'does', 'during', 'each', 'for', 'from', 'had', 'has', 'have', 'having',
+    'here', 'how', 'if', 'in', 'into', 'is', 'it', 'its', 'may', 'more', 'most', 'much', 'no', 'not', 'of', 'on', 'one', 'only',
+    'or', 'other', 'our', 'over', 'such', 'than', 'that', 'the', 'their', 'them', 'then', 'there', 'these', 'they', 'this',
+    'those', 'through', 'to', 'two', 'under', 'up', 'used', 'using', 'very', 'was', 'we', 'were', 'what', 'when', 'where',
+    'which', 'while', 'who', 'will', 'with', 'within', 'without', 'would',
+}
+
+# Tokens of every text with a single regex pass, with the position of the text each token comes from
+def tokenize(texts):
+    texts = pd.Series(texts, dtype=object).fillna('').astype(str).str.replace('\n', ' ')
+    tokens = np.array(re.findall(r'[a-z][a-z0-9]+|\n', '\n'.join(texts).lower() + '\n'), dtype=object)
+    is_separator = tokens == '\n'
+    return np.cumsum(is_separator)[~is_separator], tokens[~is_separator]
+
+# Term counts of every text as a CSR matrix, tokenizing chunk by chunk so that only one chunk of tokens is held in memory
+def count_terms(texts, chunk_size=20_000):
+    texts = pd.Series(texts, dtype=object).reset_index(drop=True)
+    vocabulary = {}
+    data, indices, indptr = [], [], [np.zeros(1, dtype=np.int64)]
+    for start in range(0, len(texts), chunk_size):
+        chunk = texts.iloc[start:start + chunk_size]
+        documents, tokens = tokenize(chunk)
+        codes, terms = pd.factorize(tokens)
+        term_ids = np.array([vocabulary.setdefault(term, len(vocabulary)) for term in terms], dtype=np.int64)
+        counts = sparse.csr_matrix((np.ones(len(codes), dtype=np.float32), (documents, term_ids[codes])), shape=(len(chunk), len(vocabulary)))
+        counts.sum_duplicates()
+        data.append(counts.data)
+        indices.append(counts.indices)
+        indptr.append(counts.indptr[1:] + indptr[-1][-1])
+    counts = sparse.csr_matrix((np.concatenate(data or [np.empty(0, dtype=np.float32)]), np.concatenate(indices or [np.empty(0, dtype=np.int32)]), np.concatenate(indptr)),
+                               shape=(len(texts), len(vocabulary)))
+    return counts, np.array(list(vocabulary), dtype=object)
+
+# Sublinear term frequencies weighted by idf, each row scaled to unit length so that dot products are cosine similarities
+def _weight_rows(matrix, idf):
+    matrix = matrix.tocsr().astype(np.float32)
+    matrix.sum_duplicates()
+    matrix.data = (1 + np.log(matrix.data)) * idf[matrix.indices].astype(np.float32)
+    norms = np.sqrt(np.bincount(np.repeat(np.arange(matrix.shape[0]), np.diff(matrix.indptr)), weights=matrix.data ** 2, minlength=matrix.shape[0]))
+    matrix.data /= np.repeat(np.where(norms > 0, norms, 1), np.diff(matrix.indptr)).astype(np.float32)
+    return matrix
+
+# TF-IDF index of the papers over their title, abstract and author keywords, answering nearest-neighbour queries
+# from the term-major copy of the matrix, i.e. by scanning the posting lists of the query terms only
+class SimilarityIndex:
+    def __init__(self, matrix, vocabulary, idf, papers):
+        self.matrix = matrix.tocsr()
+        self.postings = self.matrix.tocsc()
+        self.vocabulary = pd.Index(vocabulary)
+        self.idf = np.asarray(idf, dtype=np.float32)
+        self.papers = pd.Index(papers)
+
+    # Terms kept in at least min_df papers and at most a max_df share of them
+    @classmethod
+    def build(cls, data, columns=TEXT_COLUMNS, min_df=2, max_df=0.5):
+        text = data[columns[0]].fillna('').astype(str)
+        for column in columns[1:]:
+            text = text + ' ' + data[column].fillna('').astype(str)
+        counts, terms = count_terms(text)
+
+        kept = ~np.isin(terms, list(STOPWORDS))
+        document_frequency = np.bincount(counts.indices, minlength=len(terms))
+        kept &= (document_frequency >= min_df) & (document_frequency <= max_df * len(data))
+
+        counts = counts[:, np.flatnonzero(kept)]
+        idf = np.log((1 + len(data)) / (1 + document_frequency[kept])) + 1
+        return cls(_weight_rows(counts, idf), terms[kept], idf, data.index)
+
+    # Unit TF-IDF vectors of free texts in the term space of the index; unknown terms are ignored
+    def vectorize(self, texts):
+        documents, tokens = tokenize(texts)
+        term_codes = self.vocabulary.get_indexer(tokens)
+        known = term_codes >= 0
+        counts = sparse.csr_matrix((np.ones(known.sum()), (documents[known], term_codes[known])), shape=(len(texts), len(self.vocabulary)))
+        return _weight_rows(counts, self.idf)
+
+    # Top-k cosine similarities of every query row, in batches so that the dense score block stays small
+    def _top_k(self, queries, k=10, exclude=None, batch_size=32):
+        queries = queries.tocsr()
+        n_papers = self.matrix.shape[0]
+        k = min(k, n_papers)
+        rows = []
+        for start in range(0, queries.shape[0], batch_size):
+            batch = queries[start:start + batch_size]
+            terms = np.unique(batch.indices)
+            # One row of scores per query, laid out contiguously for the partial sort
+            scores = np.ascontiguousarray((self.postings[:, terms] @ batch[:, terms].T.toarray()).T)
+            if exclude is not None:
+                scores[np.arange(batch.shape[0]), exclude[start:start + batch_size]] = -np.inf
+
+            top = np.argpartition(scores, n_papers - k, axis=1)[:, n_papers - k:]
+            top_scores = np.take_along_axis(scores, top, axis=1)
+            order = np.argsort(-top_scores, axis=1, kind='stable')
+            top, top_scores = np.take_along_axis(top, order, axis=1), np.take_along_axis(top_scores, order, axis=1)
+
+            rows.append(pd.DataFrame({
+                'Query': np.repeat(np.arange(start, start + batch.shape[0]), k),
+                'Rank': np.tile(np.arange(1, k + 1), batch.shape[0]),
+                'Paper': self.papers[top.ravel()],
+                'Similarity': top_scores.ravel(),
+            }))
+        results = pd.concat(rows, ignore_index=True) if rows else pd.DataFrame(columns=['Query', 'Rank', 'Paper', 'Similarity'])
+        return results[results['Similarity'] > 0].reset_index(drop=True)
+
+    # Papers most similar to each seed paper (index labels of the indexed data), the seed itself excluded
+    def similar_papers(self, seeds, k=10):
+        positions = self.papers.get_indexer(seeds)
+        if (positions < 0).any():
+            raise KeyError(f"Papers not in the similarity index: {list(pd.Index(seeds)[positions < 0])}")
+        results = self._top_k(self.matrix[positions], k, exclude=positions)
+        results.insert(0, 'Seed', pd.Index(seeds)[results.pop('Query')])
+        return results
+
+    # Papers most similar to each free-text query
+    def search(self, texts, k=10):
+        return self._top_k(self.vectorize(texts), k)
+
+    def save(self, path, fingerprint=''):
+        np.savez(path, data=self.matrix.data, indices=self.matrix.indices, indptr=self.matrix.indptr, shape=self.matrix.shape,
+                 vocabulary=np.asarray(self.vocabulary, dtype=str), idf=self.idf, papers=np.asarray(self.papers), fingerprint=fingerprint)
+
+    # The index stored at path, or None when it is missing or was built from another dataset
+    @classmethod
+    def load(cls, path, fingerprint=''):
+        if not os.path.exists(path):
+            return None
+        with np.load(path) as stored:
+            if str(stored['fingerprint']) != fingerprint:
+                return None
+            matrix = sparse.csr_matrix((stored['data'], stored['indices'], stored['indptr']), shape=tuple(stored['shape']))
+            return cls(matrix, stored['vocabulary'], stored['idf'], stored['papers'])
+
+# Tag stored with a persisted index: the dataset fingerprint with the parameters the index was built with
+def index_tag(fingerprint, columns=TEXT_COLUMNS, min_df=2, max_df=0.5):
+    parameters = {'columns': list(columns), 'min_df': min_df, 'max_df': max_df, 'version': INDEX_VERSION}
+    return f"{fingerprint}:{json.dumps(parameters, sort_keys=True)}"
+
+# Load the persisted index of a dataset, or build and persist it when the dataset or the build parameters changed
+def load_or_build_similarity_index(data, index_path, fingerprint, columns=TEXT_COLUMNS, min_df=2, max_df=0.5):
+    tag = index_tag(fingerprint, columns, min_df, max_df)
+    index = SimilarityIndex.load(index_path, tag)
+    if index is None:
+        index = SimilarityIndex.build(data, columns, min_df, max_df)
+        index.save(index_path, tag)
+        print(f"Built the similarity index of {index.matrix.shape[0]} papers over {len(index.vocabulary)} terms in {index_path}")
+    return index
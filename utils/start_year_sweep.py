@@ -0,0 +1,109 @@
+import numpy as np
+import pandas as pd
+
+from .citation_metrics import explode_entities
+
+SPLITS = ('total', 'agric', 'non_agric')
+
+# Per-year publications, citation sums and cited publications of every agriculture split, over a continuous timeline
+def yearly_base_aggregates(data):
+    years = data['Year'].to_numpy(dtype=np.int64)
+    first_year, last_year = int(years.min()), int(years.max())
+    codes = years - first_year
+    n_years = last_year - first_year + 1
+
+    citations = pd.to_numeric(data['Cited by'], errors='coerce')
+    cited = citations.notna().to_numpy()
+    citations = citations.fillna(0).to_numpy(dtype=float)
+    is_agriculture = data['IsAgriculture'].to_numpy(dtype=bool)
+    masks = {'total': np.ones(len(data), dtype=bool), 'agric': is_agriculture, 'non_agric': ~is_agriculture}
+
+    base = {}
+    for split, mask in masks.items():
+        base[split] = np.bincount(codes[mask], minlength=n_years)
+        base[f'{split}_citations'] = np.bincount(codes[mask], weights=citations[mask], minlength=n_years)
+        base[f'{split}_cited'] = np.bincount(codes[mask & cited], minlength=n_years)
+    return pd.DataFrame(base, index=pd.RangeIndex(first_year, last_year + 1, name='Year'))
+
+# Totals from every row to the end, plus a trailing row of zeros for start years after the last year
+def suffix_sums(values):
+    values = np.asarray(values)
+    sums = np.cumsum(values[::-1], axis=0)[::-1]
+    return np.concatenate([sums, np.zeros((1,) + values.shape[1:], dtype=sums.dtype)])
+
+# Position of the first maximum of values[i:] for every i, along the first axis
+def suffix_argmax(values):
+    reversed_values = np.asarray(values)[::-1]
+    running_max = np.maximum.accumulate(reversed_values, axis=0)
+    positions = np.arange(len(reversed_values)).reshape((-1,) + (1,) * (reversed_values.ndim - 1))
+    # On ties the earliest year wins, i.e. the latest position of the reversed scan
+    latest = np.maximum.accumulate(np.where(reversed_values == running_max, positions, 0), axis=0)
+    return (len(reversed_values) - 1 - latest)[::-1]
+
+# Volume, citation and growth statistics for every start year, derived from one pass over the yearly aggregates
+def sweep_start_years(data, start_years):
+    base = yearly_base_aggregates(data)
+    years = base.index.to_numpy()
+    start_years = np.asarray(sorted(start_years))
+    positions = np.searchsorted(years, start_years)
+
+    sums = suffix_sums(base.to_numpy(dtype=float))
+    results = pd.DataFrame(sums[positions], columns=base.columns, index=pd.Index(start_years, name='StartYear'))
+
+    counts = base[list(SPLITS)].to_numpy(dtype=float)
+    peaks = suffix_argmax(counts)
+    in_range = positions < len(years)
+
+    # Year-over-year growth, counted from the year after the start year like the pct_change of volume_per_year
+    with np.errstate(divide='ignore', invalid='ignore'):
+        growth = np.where(counts[:-1] > 0, np.diff(counts, axis=0) / counts[:-1], 0.0) * 100
+    growth_sums = suffix_sums(np.concatenate([np.zeros((1, len(SPLITS))), growth]))
+    active_years = suffix_sums((counts > 0).astype(float))
+
+    for index, split in enumerate(SPLITS):
+        results[split] = results[split].astype(int)
+        results[f'{split}_citations'] = results[f'{split}_citations'].round().astype(int)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            results[f'{split}_mean_citations'] = results[f'{split}_citations'] / results.pop(f'{split}_cited')
+            results[f'{split}_average_growth'] = growth_sums[np.minimum(positions + 1, len(years)), index] / active_years[positions, index]
+        peak_positions = peaks[np.minimum(positions, len(years) - 1), index]
+        results[f'{split}_peak_year'] = np.where(in_range, years[peak_positions], -1)
+        results[f'{split}_peak_count'] = np.where(in_range, counts[peak_positions, index], 0).astype(int)
+
+    results['agric_share'] = results['agric'] / results['total'].replace(0, np.nan) * 100
+    return results
+
+# Top entities of a column for every start year, from suffix sums of the (entity x year) publication counts
+def sweep_top_entities(data, entity_column, start_years, top_n=10):
+    expanded_data = explode_entities(data, entity_column, columns=('Year', 'IsAgriculture'))
+    first_year, last_year = int(data['Year'].min()), int(data['Year'].max())
+    n_years = last_year - first_year + 1
+
+    entity_codes, entities = pd.factorize(expanded_data['Entity'], sort=True)
+    cells = entity_codes * n_years + (expanded_data['Year'].to_numpy(dtype=np.int64) - first_year)
+    size = len(entities) * n_years
+    total = np.bincount(cells, minlength=size).reshape(len(entities), n_years)
+    agric = np.bincount(cells, weights=expanded_data['IsAgriculture'].to_numpy(dtype=float), minlength=size).reshape(len(entities), n_years)
+    total_sums, agric_sums = suffix_sums(total.T), suffix_sums(agric.T)
+
+    rows = []
+    for start_year in sorted(start_years):
+        position = min(max(start_year - first_year, 0), n_years)
+        totals = total_sums[position]
+        # Every entity tied with the N-th largest total is a candidate, then ties are broken by name
+        kept = min(top_n, len(totals))
+        threshold = np.partition(totals, len(totals) - kept)[len(totals) - kept] if kept else 1
+        top = np.flatnonzero((totals >= threshold) & (totals > 0))
+        top = top[np.lexsort((entities[top], -totals[top]))][:top_n]
+        rows.append(pd.DataFrame({
+            'StartYear': start_year,
+            'Column': entity_column,
+            'Rank': np.arange(1, len(top) + 1),
+            'Entity': entities[top],
+            'total': totals[top].astype(int),
+            'agric': agric_sums[position, top].round().astype(int),
+        }))
+
+    top_entities = pd.concat(rows, ignore_index=True)
+    top_entities['non_agric'] = top_entities['total'] - top_entities['agric']
+    return top_entities
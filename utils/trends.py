@@ -0,0 +1,78 @@
+import numpy as np
+import pandas as pd
+
+from .citation_metrics import explode_entities
+from .keywords import explode_keywords
+
+# Build the (entity x year) publication count matrix of an entity column, or of normalized keywords
+def entity_year_matrix(data, entity_column, start_year=None, end_year=None):
+    if entity_column == 'Keyword':
+        expanded_data = explode_keywords(data).rename(columns={'Keyword': 'Entity'})
+    else:
+        expanded_data = explode_entities(data, entity_column, columns=('Year',))
+
+    start_year = int(data['Year'].min()) if start_year is None else start_year
+    end_year = int(data['Year'].max()) if end_year is None else end_year
+    expanded_data = expanded_data[expanded_data['Year'].between(start_year, end_year)]
+
+    entity_codes, entities = pd.factorize(expanded_data['Entity'], sort=True)
+    years = np.arange(start_year, end_year + 1)
+    year_codes = expanded_data['Year'].to_numpy(dtype=np.int64) - start_year
+
+    n_years = len(years)
+    counts = np.bincount(entity_codes * n_years + year_codes, minlength=len(entities) * n_years)
+    return pd.Index(entities, name=entity_column), years, counts.reshape(len(entities), n_years)
+
+# Least-squares trend, r², CAGR and growth statistics for every row of a count matrix at once
+def compute_trends(counts, years, window=3):
+    counts = np.asarray(counts, dtype=float)
+    years = np.asarray(years, dtype=float)
+    n_rows, n_years = counts.shape
+
+    # Closed-form simple linear regression against the centered years
+    x = years - years.mean()
+    y_mean = counts.mean(axis=1)
+    y = counts - y_mean[:, None]
+    sxx = (x ** 2).sum()
+    sxy = y @ x
+    syy = (y ** 2).sum(axis=1)
+    slope = sxy / sxx
+    intercept = y_mean - slope * years.mean()
+    with np.errstate(divide='ignore', invalid='ignore'):
+        r_squared = np.where(syy > 0, sxy ** 2 / (sxx * syy), 0.0)
+
+    # Compound annual growth between the first year with publications and the last year
+    has_publications = counts > 0
+    first = np.where(has_publications.any(axis=1), has_publications.argmax(axis=1), n_years - 1)
+    first_value = counts[np.arange(n_rows), first]
+    span = (n_years - 1) - first
+    with np.errstate(divide='ignore', invalid='ignore'):
+        cagr = np.where((span > 0) & (first_value > 0), (counts[:, -1] / first_value) ** (1 / span) - 1, np.nan) * 100
+
+        # Mean of the year-over-year changes, over the years that follow a year with publications
+        previous = counts[:, :-1]
+        yearly_growth = np.where(previous > 0, np.diff(counts, axis=1) / previous, np.nan) * 100
+        defined = ~np.isnan(yearly_growth)
+        average_growth = np.where(defined.any(axis=1), np.nansum(yearly_growth, axis=1) / defined.sum(axis=1), np.nan)
+
+        # Growth of the last window of years over the window before it
+        recent = counts[:, -window:].sum(axis=1)
+        earlier = counts[:, -2 * window:-window].sum(axis=1)
+        window_growth = np.where(earlier > 0, (recent - earlier) / earlier, np.nan) * 100
+
+    return pd.DataFrame({
+        'total': counts.sum(axis=1).astype(int),
+        'slope': slope,
+        'intercept': intercept,
+        'r_squared': r_squared,
+        'cagr': cagr,
+        'average_growth': average_growth,
+        'window_growth': window_growth,
+    })
+
+# Trend statistics of every entity of a column, sorted from the fastest-growing
+def entity_trends(data, entity_column, start_year=None, end_year=None, window=3, min_publications=5, sort_by='slope'):
+    entities, years, counts = entity_year_matrix(data, entity_column, start_year, end_year)
+    trends = compute_trends(counts, years, window).set_index(entities)
+    trends = trends[trends['total'] >= min_publications]
+    return trends.sort_values(sort_by, ascending=False)
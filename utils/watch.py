@@ -0,0 +1,152 @@
+import hashlib
+import os
+import time
+import traceback
+
+import pandas as pd
+
+from .affiliations import reload_institutions
+from .extract_countries import INSTITUTIONS_FILE
+from .get_cleaned_dataframe_from_csv import AGRICULTURE_COLUMNS, AGRICULTURE_KEYWORDS, classify_agriculture, keep_resident
+
+# Every analysis on the cleaned dataset depends on the year filter and on the agriculture classification
+CLEANED = ('Year', 'IsAgriculture')
+# Marker of an analysis that copies the whole raw export and depends on every column of it
+ALL_COLUMNS = ('*',)
+# Marker of the known institutions file, read by every analysis that parses countries or institutions from the affiliations
+INSTITUTIONS = 'Institutions'
+
+# Columns read by every cli subcommand the watch mode can re-run
+ANALYSIS_COLUMNS = {
+    'volume': CLEANED,
+    'citations': (*CLEANED, 'Cited by', 'Title', 'Authors'),
+    'authors': (*CLEANED, 'Authors', 'Cited by'),
+    'sources': (*CLEANED, 'Source title', 'Cited by'),
+    'countries': (*CLEANED, 'Affiliations', INSTITUTIONS, 'Cited by'),
+    'institutions': (*CLEANED, 'Affiliations', INSTITUTIONS, 'Cited by'),
+    'contributors': ('Affiliations', 'Authors', 'Source title', 'Title', 'Abstract', 'Author Keywords', 'Index Keywords'),
+    'linked-authors': (*CLEANED, 'Authors'),
+    'dashboard': (*CLEANED, 'Affiliations', INSTITUTIONS, 'Authors', 'Source title', 'Cited by'),
+    'trends': (*CLEANED, 'Affiliations', INSTITUTIONS, 'Authors', 'Source title', 'Author Keywords', 'Index Keywords'),
+    'bursts': (*CLEANED, 'Author Keywords', 'Index Keywords'),
+    'keyword-clusters': (*CLEANED, 'Author Keywords', 'Index Keywords'),
+    'collaboration': (*CLEANED, 'Affiliations', INSTITUTIONS),
+    'sweep': (*CLEANED, 'Cited by', 'Authors', 'Source title', 'Affiliations', INSTITUTIONS),
+    'laws': (*CLEANED, 'Authors', 'Source title'),
+    'duplicates': ALL_COLUMNS,
+}
+
+# Agriculture keywords of a configuration file, one per line; blank lines and # comments are ignored
+def read_keywords(path):
+    with open(path) as f:
+        return [line.strip() for line in f if line.strip() and not line.lstrip().startswith('#')]
+
+def _content_hash(values):
+    return hashlib.sha256(pd.util.hash_pandas_object(values, index=True).to_numpy().tobytes()).hexdigest()
+
+# Content hash of every column of the export, to tell which columns a new export changed
+def column_hashes(data):
+    return {column: _content_hash(data[column]) for column in data.columns}
+
+# Analyses reading at least one of the changed columns
+def stale_analyses(changed_columns, analyses=ANALYSIS_COLUMNS):
+    if not changed_columns:
+        return []
+    export_columns = changed_columns - {'IsAgriculture', INSTITUTIONS}
+    return [name for name, columns in analyses.items() if (export_columns if columns == ALL_COLUMNS else changed_columns.intersection(columns))]
+
+# Polls the CSV export, the keyword list and the known institutions file, keeps the export in memory and re-runs the
+# analyses whose inputs changed, passing them the current keyword list
+class DatasetWatcher:
+    def __init__(self, csv_file_path, keywords_path=None, analyses=None, interval=2.0, keywords=AGRICULTURE_KEYWORDS):
+        unknown = set(analyses or []) - ANALYSIS_COLUMNS.keys()
+        if unknown:
+            raise ValueError(f"Unknown analyses {sorted(unknown)}, expected some of {list(ANALYSIS_COLUMNS)}")
+        self.csv_file_path = csv_file_path
+        self.keywords_path = keywords_path
+        self.analyses = {name: ANALYSIS_COLUMNS[name] for name in (analyses or ANALYSIS_COLUMNS)}
+        self.interval = interval
+        self.keywords = list(keywords)
+        self.data = None
+        self.hashes = {}
+        self.states = {}
+
+    # Modification time and size of every watched file, None while it does not exist
+    def _states(self):
+        states = {}
+        for path in filter(None, [self.csv_file_path, self.keywords_path, INSTITUTIONS_FILE]):
+            stat = os.stat(path) if os.path.exists(path) else None
+            states[path] = (stat.st_mtime_ns, stat.st_size) if stat else None
+        return states
+
+    # Reload the modified inputs and return the columns whose content changed, IsAgriculture and Institutions included
+    def refresh(self):
+        states = self._states()
+        changed = set()
+        keywords_changed = False
+
+        if self.keywords_path and states[self.keywords_path] and states[self.keywords_path] != self.states.get(self.keywords_path):
+            keywords = read_keywords(self.keywords_path)
+            if keywords != self.keywords:
+                self.keywords = keywords
+                keywords_changed = True
+                print(f"Loaded {len(keywords)} agriculture keywords from {self.keywords_path}")
+
+        if states[self.csv_file_path] and states[self.csv_file_path] != self.states.get(self.csv_file_path):
+            self.data = keep_resident(self.csv_file_path)
+            hashes = column_hashes(self.data)
+            changed = {column for column in hashes.keys() | self.hashes.keys() - {'IsAgriculture'} if hashes.get(column) != self.hashes.get(column)}
+            self.hashes = {**hashes, 'IsAgriculture': self.hashes.get('IsAgriculture')}
+
+        # A new institutions file changes the countries and institutions parsed from every affiliation
+        if self.states and states[INSTITUTIONS_FILE] and states[INSTITUTIONS_FILE] != self.states.get(INSTITUTIONS_FILE):
+            reload_institutions()
+            changed.add(INSTITUTIONS)
+            print(f"Reloaded the known institutions from {INSTITUTIONS_FILE}")
+
+        # The classification only changes with the keywords or with the text columns it searches
+        if self.data is not None and (keywords_changed or changed.intersection(AGRICULTURE_COLUMNS) or self.hashes['IsAgriculture'] is None):
+            classification_hash = _content_hash(classify_agriculture(self.data, self.keywords))
+            if classification_hash != self.hashes['IsAgriculture']:
+                changed.add('IsAgriculture')
+                self.hashes['IsAgriculture'] = classification_hash
+
+        self.states = states
+        return changed
+
+    # Re-run the analyses made stale by the latest changes, as run_analysis(name, keywords); a failing analysis does not
+    # stop the others
+    def update(self, run_analysis):
+        changed = self.refresh()
+        if self.data is None:
+            print(f"Waiting for {self.csv_file_path}")
+            return []
+        stale = stale_analyses(changed, self.analyses)
+        print(f"\nChanged columns: {sorted(changed) or 'none'}; stale analyses: {stale or 'none'}")
+        for name in stale:
+            start = time.perf_counter()
+            try:
+                run_analysis(name, self.keywords)
+                print(f"Re-ran {name} in {time.perf_counter() - start:.1f} s")
+            except Exception:
+                traceback.print_exc()
+                print(f"Analysis {name} failed, its outputs were not updated")
+        return stale
+
+    # Run the stale analyses once, then every time a watched file settles after a change
+    def run(self, run_analysis, iterations=None):
+        self.update(run_analysis)
+        polls = 0
+        try:
+            while iterations is None or polls < iterations:
+                polls += 1
+                time.sleep(self.interval)
+                states = self._states()
+                if states == self.states:
+                    continue
+                # Wait until the file stops changing, e.g. while a new export is still being copied
+                time.sleep(self.interval)
+                if self._states() == states:
+                    self.update(run_analysis)
+        except KeyboardInterrupt:
+            print("Stopped watching")